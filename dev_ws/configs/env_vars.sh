@@ -2,6 +2,7 @@
 
 export AUDIO_TRACK="track_1.mp3"                    # [string]: File name of audio track to use in video
 export DEBUG_LEVEL=3                                # [int]: 0 - debug, 1 - info, 2 - warning, 3 - error, 4 - faltal
+export LOG_THREAD=0                                 # [bool]: Enable/Disable writing log messages from a background thread
 
 export CONFIGS_PATH="/workspace/dev_ws/configs"                 # [string]: path to configs file
 export PREDICTOR_NAME="predictor_landmarks.dat"                 # [string]: file name of predictor for facial landmarks
@@ -11,11 +12,36 @@ export DOWNLOAD_EXAMPLE_DATASET=1                               # [bool]: Enable
 export DOWNLOAD_EXAMPLE_ID=1Oiq0NQUqQqk3kY8sOVHL1p0bMc1HQcSa    # [string]: sample dataset id 
 
 export PREVISUALIZE_FACE_CORRECTION=1 # [bool]: Enable/Disable face correction pre-visualization
+export FACE_DETECTION_UPSAMPLE="1"    # [string]: comma separated face detector upsamples, the next is tried only if no face is found, "0,1" - coarse to fine detection (faster)
+export FACE_DETECTION_SCALE=1.0       # [float]: scale of the image given to the face detector, landmarks are predicted in full size
+export FACE_TRACKING=0                # [bool]: Enable/Disable looking for the face around the previous image face first
+export FACE_TRACKING_PADDING=0.5      # [float]: padding of the tracking window around the previous face, relative to its size
+export FACE_SELECTION="largest"       # [string]: face taken when more than one is detected: largest, central, score (detector score), previous (closest to the previous image face)
+export FACE_DETECTOR="hog"            # [string]: face detector backend: hog (dlib), haar (OpenCV Haar cascades), dnn (OpenCV DNN), calibrate.py picks one
+export FACE_DETECTOR_MODEL=""         # [string]: face detector model file in CONFIGS_PATH, the Haar cascade or DNN weights (res10_300x300_ssd_iter_140000.caffemodel)
+export FACE_DETECTOR_CONFIG=""        # [string]: face detector model description file in CONFIGS_PATH, for DNN models that need it (deploy.prototxt)
+
+export CACHE_PATH="/workspace/dev_ws/cache"     # [string]: path to cache files (landmarks, dataset index)
+export LANDMARKS_CACHE=1                        # [bool]: Enable/Disable face landmarks cache between exportations
+export DATASET_INDEX=1                          # [int]: 0 - no dataset index, 1 - only subfolders modified since the last load are listed again, 2 - strict, the files of unchanged subfolders are stat too, to notice files edited in place
+
+export QUALITY_GATE=0                   # [bool]: Enable/Disable skipping blurry, dark or blown-out images before looking for their faces, measures are cached
+export QUALITY_MIN_SHARPNESS=15.0       # [float]: minimum variance of the Laplacian of the image thumbnail (160 pixels width), 0 to accept blurry images
+export QUALITY_MIN_LUMINANCE=30.0       # [float]: minimum mean luminance of the image [0-255]
+export QUALITY_MAX_LUMINANCE=225.0      # [float]: maximum mean luminance of the image [0-255]
+export QUALITY_MAX_CLIPPING=0.6         # [float]: maximum fraction of pixels in the darkest and brightest histogram bins, 1 to accept any
+
+export DEDUPE=0                         # [bool]: Enable/Disable keeping a single image of every burst of near-identical shots, hashes are cached
+export DEDUPE_DISTANCE=6                # [int]: maximum different bits (out of 64) between the perceptual hashes of duplicated images
+export DEDUPE_WINDOW=600                # [float]: seconds after the first image of a burst that its duplicates can be taken, never from another day
 
 export WIN_NAME="every_day_studio"  # [string]: studio window name
 export WIN_WIDTH=640                # [int][pixels]: studio window width
 export WIN_HEIGHT=480               # [int][pixels]: studio window height
 export WIN_TIME=-1                  # [int][mili-seconds]: studio window wait time, -1 wait until key
+export STUDIO_CACHE_MB=256          # [int][MB]: memory for decoded studio images, 0 - no cache
+export STUDIO_PREFETCH=3            # [int]: images loaded in background ahead of the current one
+export STUDIO_LAYERS=16             # [int]: images with landmarks and face correction kept to show again
 
 export VIDEO_WIDTH=640      # [int][pixels]: width of output video & to resize images 
 export VIDEO_HEIGHT=360     # [int][pixels]: height of output video & to resize images
@@ -26,3 +52,15 @@ export VIDEO_EXPORT_GRAY=0                      # [bool]: Enable/Disable gray co
 export VIDEO_EXPORT_VISUALS=1                   # [bool]: Enable/Disable face visuals exportation
 export VIDEO_EXPORT_PREVISUALIZATION=1          # [bool]: Enable/Disable export previsuzalitation
 export VIDEO_EXPORT_DATE=0                      # [bool]: Enable/Disable export date overlayed over final video
+export VIDEO_EXPORT_WORKERS=1                   # [int]: exportation worker processes, 1 - no workers, 0 - one per cpu core
+export VIDEO_EXPORT_PIPELINE=0                  # [bool]: Enable/Disable decoding, face alignment and encoding in separated threads
+export VIDEO_EXPORT_QUEUE_SIZE=8                # [int]: maximum images waiting between exportation threads/stages
+export VIDEO_ENCODER="opencv"                   # [string]: opencv - MJPG avi, audio added after, ffmpeg - images streamed to ffmpeg, audio added in the same pass, needs ffmpeg
+export VIDEO_CODEC="h264"                       # [string]: ffmpeg encoder video codec, h264 or h265
+export VIDEO_CRF=23                             # [int]: ffmpeg encoder constant rate factor, lower is better quality and bigger file
+export VIDEO_PRESET="medium"                    # [string]: ffmpeg encoder preset, ultrafast ... veryslow, slower compresses better
+export VIDEO_EXPORT_INCREMENTAL=0               # [bool]: Enable/Disable rendering only the dataset subfolders new or changed since the last exportation, needs ffmpeg
+export VIDEO_EXPORT_SEGMENTED=0                 # [bool]: Enable/Disable rendering and encoding a chunk of the video in every worker process, chunks are concatenated after, needs ffmpeg
+export VIDEO_RENDITIONS=""                      # [string]: videos exported in a single pass, "name:WIDTHxHEIGHT[:option=value]" separated by spaces, options: codec, crf, gray, visuals, date (default the settings above), as "720p:1280x720 preview:320x180:gray=1:visuals=0", needs ffmpeg
+export VIDEO_EXPORT_TWO_PASS=0                  # [bool]: Enable/Disable getting the landmarks of every image first, then aligning all of them with the same eyes distance
+export VIDEO_EYES_DISTANCE=0                    # [float]: pixels between the eyes outer corners in two pass exportations, 0 - dataset median
@@ -0,0 +1,2 @@
+from .synthetic import get_face_template, make_dataset, render_face, train_predictor
+from .bench import compare_results, run_benchmark
@@ -0,0 +1,85 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+
+Headless benchmark of the every day studio on a synthetic dataset:
+
+    python3 dev_ws/src/everyday_studio/benchmark --images 200 \
+        --output bench.json --baseline previous_bench.json
+
+Exits with status 1 if a stage is slower than the baseline by more than
+the tolerance.
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import argparse
+import json
+import os
+import sys
+
+# studio modules are imported by name, from the folder of this package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark.bench import compare_results, run_benchmark
+from utils import printlog
+
+# =============================================================================
+# MAIN FUNCTION - MAIN FUNCTION - MAIN FUNCTION - MA[-IN FUNCTION - MAIN FUNCTI
+# =============================================================================
+if __name__ == "__main__":
+
+    def size(value: str) -> tuple:
+        return tuple(int(side) for side in value.lower().split("x"))
+
+    parser = argparse.ArgumentParser(description="every day studio benchmark")
+    parser.add_argument("--work-path", default="/tmp/everyday_studio_benchmark")
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--folders", type=int, default=6)
+    parser.add_argument("--image-size", type=size, default=(1920, 1080))
+    parser.add_argument("--video-size", type=size, default=(640, 360))
+    parser.add_argument(
+        "--predictor",
+        default=os.path.join(
+            os.getenv("CONFIGS_PATH", default=""),
+            os.getenv("PREDICTOR_NAME", default=""),
+        ),
+        help="landmarks weights, a tiny predictor is trained if it doesn't exist",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--seed-landmarks",
+        action="store_true",
+        help="fill the landmarks cache before exporting, to render every image",
+    )
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        work_path=args.work_path,
+        images=args.images,
+        folders=args.folders,
+        image_size=args.image_size,
+        video_size=args.video_size,
+        predictor_path=args.predictor,
+        repeat=args.repeat,
+        seed_landmarks=args.seed_landmarks,
+    )
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=4)
+    printlog(msg=f"benchmark results saved in {args.output}", msg_type="OKGREEN")
+
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            regressions = compare_results(
+                results=results, baseline=json.load(file), tolerance=args.tolerance
+            )
+        for regression in regressions:
+            printlog(msg=regression, msg_type="ERROR")
+        sys.exit(1 if regressions else 0)
+
+# =============================================================================
@@ -0,0 +1,305 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import json
+import os
+import platform
+import shutil
+import time
+
+import cv2
+import numpy as np
+
+from benchmark.synthetic import make_dataset, train_predictor
+from cache import LandmarksCache, normalize_shape
+from every_day_maker import DataSet, Studio
+from face import Face, FaceDetector
+from file_utils import Image
+from render import get_face_img_corrected
+from utils import printlog, profiler
+from utils.profiler import Profiler
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def bench_dataset_load(path: str, cache_path: str, size: tuple, repeat: int) -> dict:
+    """! Times loading the dataset without index, with a new index and
+    with an index up to date
+    @param path 'string' absolute path to the dataset
+    @param cache_path 'string' absolute path to the folder for the index
+    @param size 'tuple' (width, height) the images are loaded at
+    @param repeat 'int' times every load is timed
+    @return _ 'dict' profiler report, a stage per kind of load
+    """
+
+    timer = Profiler()
+    index_path = os.path.join(cache_path, "dataset.db")
+    for _ in range(repeat):
+        with timer.measure("no_index"):
+            DataSet(path=path, load_size=size)
+
+        if os.path.isfile(index_path):
+            os.remove(index_path)
+        with timer.measure("new_index"):
+            DataSet(path=path, index_path=index_path, load_size=size)
+        with timer.measure("indexed"):
+            DataSet(path=path, index_path=index_path, load_size=size)
+
+    return timer.report
+
+
+def bench_images(paths: list, size: tuple) -> dict:
+    """! Times decoding the images and resizing them to the video size
+    @param paths 'list' absolute paths to the images
+    @param size 'tuple' (width, height) of the video
+    @return _ 'dict' profiler report with decode and resize stages
+    """
+
+    profiler.reset()
+    for path in paths:
+        image = Image(path=path)
+        image.load(print_info=False, size=size)
+        image.get_data(size=size)
+    return profiler.report
+
+
+def bench_detection(paths: list, size: tuple, face_detector: FaceDetector) -> dict:
+    """! Times the face detection and landmarks prediction
+    @param paths 'list' absolute paths to the images
+    @param size 'tuple' (width, height) of the video
+    @param face_detector 'FaceDetector' face detector to time
+    @return _ 'dict' profiler report with the detection and shape
+        prediction stages, and the rate of images with a face found
+    """
+
+    imgs = []
+    for path in paths:
+        image = Image(path=path)
+        image.load(print_info=False, size=size)
+        imgs.append(image.get_data(size=size))
+
+    profiler.reset()
+    faces = sum(face_detector.predict(img=img) is not None for img in imgs)
+    report = profiler.report
+    report["detection_rate"] = faces / max(1, len(imgs))
+    return report
+
+
+def bench_render(
+    shapes: dict,
+    image_size: tuple,
+    size: tuple,
+    face_detector: FaceDetector,
+    visuals: bool,
+) -> dict:
+    """! Times the alignment of the images with their real landmarks
+    @param shapes 'dict' image path to its (68, 2) landmarks
+    @param image_size 'tuple' (width, height) of the dataset images
+    @param size 'tuple' (width, height) of the video
+    @param face_detector 'FaceDetector' detector to draw face visuals
+    @param visuals 'bool' draw face visuals in the aligned images
+    @return _ 'dict' profiler report with alignment and overlay stages
+    """
+
+    images = []
+    for path, shape in shapes.items():
+        image = Image(path=path)
+        image.load(print_info=False, size=size)
+        images.append((image.image, shape))
+
+    profiler.reset()
+    for img, shape in images:
+        get_face_img_corrected(
+            img=img,
+            face=Face(shape=np.rint(shape * np.float64(size) / image_size).astype(int)),
+            face_detector=face_detector,
+            visuals=visuals,
+            size=size,
+        )
+    return profiler.report
+
+
+def bench_export(env: dict, shapes: dict = None, image_size: tuple = None) -> dict:
+    """! Times a whole exportation of the dataset, without pre-visualization
+    nor audio
+    @param env 'dict' environment variables for the studio
+    @param shapes 'dict' image path to its (68, 2) landmarks, if given the
+        landmarks cache is filled with them, so every image is exported
+    @param image_size 'tuple' (width, height) of the dataset images
+    @return _ 'dict' exportation report, with its wall time
+    """
+
+    os.environ.update(env)
+    if shapes is not None:
+        cache = LandmarksCache(path=os.path.join(env["CACHE_PATH"], "landmarks.db"))
+        for path, shape in shapes.items():
+            stat = os.stat(path)
+            cache.put(
+                path=path,
+                size=stat.st_size,
+                mtime=stat.st_mtime,
+                value=normalize_shape(shape, image_size),
+            )
+        cache.close()
+
+    studio = Studio(headless=True)
+    start = time.perf_counter()
+    studio.export(record_audio=False)
+    elapsed = time.perf_counter() - start
+
+    with open(os.path.join(env["VIDEO_PATH"], f"{env['VIDEO_NAME']}.json")) as file:
+        report = json.load(file)
+    report["wall"] = elapsed
+    frames = report["stages"].get("write", {}).get("count", 0)
+    report["fps"] = frames / elapsed if elapsed > 0 else 0.0
+    return report
+
+
+def run_benchmark(
+    work_path: str,
+    images: int = 200,
+    folders: int = 6,
+    image_size: tuple = (1920, 1080),
+    video_size: tuple = (640, 360),
+    predictor_path: str = None,
+    repeat: int = 3,
+    seed_landmarks: bool = False,
+) -> dict:
+    """! Creates a synthetic dataset and times the studio stages on it,
+    without any window
+    @param work_path 'string' absolute path to a folder for the dataset,
+        caches and exported video, results of previous runs are removed
+    @param images 'int' number of images of the dataset
+    @param folders 'int' number of subfolders of the dataset
+    @param image_size 'tuple' (width, height) of the dataset images
+    @param video_size 'tuple' (width, height) of the video
+    @param predictor_path 'string' absolute path to the landmarks weights,
+        if None or it doesn't exist a tiny predictor is trained
+    @param repeat 'int' times the dataset loading is timed
+    @param seed_landmarks 'bool' fill the landmarks cache with the real
+        landmarks before the exportation, so every image is rendered
+    @return _ 'dict' benchmark results
+    """
+
+    dataset_path = os.path.join(work_path, "dataset")
+    cache_path = os.path.join(work_path, "cache")
+    for path in (dataset_path, cache_path, os.path.join(work_path, "export")):
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+    os.makedirs(cache_path)
+
+    printlog(msg=f"creating synthetic dataset of {images} images", msg_type="INFO")
+    shapes = make_dataset(
+        path=dataset_path, images=images, folders=folders, size=image_size
+    )
+
+    trained = predictor_path is None or not os.path.isfile(predictor_path)
+    if trained:
+        predictor_path = os.path.join(work_path, "predictor.dat")
+        printlog(msg="training a tiny landmarks predictor", msg_type="INFO")
+        train_predictor(path=predictor_path, size=video_size)
+
+    detector_args = {
+        "upsample_ladder": tuple(
+            int(up) for up in os.getenv("FACE_DETECTION_UPSAMPLE", "1").split(",")
+        ),
+        "detection_scale": float(os.getenv("FACE_DETECTION_SCALE", default=1.0)),
+    }
+    face_detector = FaceDetector(predictor_path=predictor_path, **detector_args)
+    paths = sorted(shapes)
+
+    results = {
+        "settings": {
+            "images": images,
+            "folders": folders,
+            "image_size": list(image_size),
+            "video_size": list(video_size),
+            "predictor": "tiny" if trained else predictor_path,
+            "seed_landmarks": seed_landmarks,
+            "detector_args": detector_args,
+            "workers": os.getenv("VIDEO_EXPORT_WORKERS", "1"),
+            "pipeline": os.getenv("VIDEO_EXPORT_PIPELINE", "0"),
+        },
+        "machine": {
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count(),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+        },
+    }
+
+    printlog(msg="timing dataset loading", msg_type="INFO")
+    results["dataset_load"] = bench_dataset_load(
+        path=dataset_path, cache_path=cache_path, size=video_size, repeat=repeat
+    )
+    printlog(msg="timing images decoding", msg_type="INFO")
+    results["images"] = bench_images(paths=paths, size=video_size)
+    printlog(msg="timing face detection", msg_type="INFO")
+    results["detection"] = bench_detection(
+        paths=paths, size=video_size, face_detector=face_detector
+    )
+    printlog(msg="timing face alignment", msg_type="INFO")
+    results["render"] = bench_render(
+        shapes=shapes,
+        image_size=image_size,
+        size=video_size,
+        face_detector=face_detector,
+        visuals=True,
+    )
+
+    printlog(msg="timing exportation", msg_type="INFO")
+    results["export"] = bench_export(
+        env={
+            "DATASET_PATH": dataset_path,
+            "CACHE_PATH": cache_path,
+            "CONFIGS_PATH": os.path.dirname(predictor_path),
+            "PREDICTOR_NAME": os.path.basename(predictor_path),
+            "VIDEO_PATH": os.path.join(work_path, "export"),
+            "VIDEO_NAME": "benchmark",
+            "VIDEO_WIDTH": str(video_size[0]),
+            "VIDEO_HEIGHT": str(video_size[1]),
+            "LANDMARKS_CACHE": "1",
+            "MEDIA_PATH": work_path,
+        },
+        shapes=shapes if seed_landmarks else None,
+        image_size=image_size,
+    )
+
+    return results
+
+
+def compare_results(results: dict, baseline: dict, tolerance: float = 0.2) -> list:
+    """! Compares benchmark results with previous ones, stage by stage
+    @param results 'dict' benchmark results
+    @param baseline 'dict' previous benchmark results
+    @param tolerance 'float' relative slow down allowed
+    @return _ 'list' strings describing the stages slower than the baseline
+        p50 by more than the tolerance
+    """
+
+    regressions = []
+    for section, report in results.items():
+        if not isinstance(report, dict) or "stages" not in report:
+            continue
+        base_stages = baseline.get(section, {}).get("stages", {})
+        for stage, stats in report["stages"].items():
+            base = base_stages.get(stage)
+            if base is None or base["p50"] <= 0:
+                continue
+            change = stats["p50"] / base["p50"] - 1.0
+            if change > tolerance:
+                regressions.append(
+                    f"{section}/{stage}: p50 {base['p50'] * 1000:.2f}ms -> "
+                    + f"{stats['p50'] * 1000:.2f}ms (+{change * 100:.0f}%)"
+                )
+    return regressions
+
+
+# =============================================================================
@@ -0,0 +1,204 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import os
+from datetime import datetime, timedelta
+
+import cv2
+import dlib
+import numpy as np
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def _ellipse(center: tuple, axes: tuple, angles: list) -> list:
+    """! Points of an ellipse at the given angles
+    @param center 'tuple' (x, y) ellipse center
+    @param axes 'tuple' (x, y) ellipse half axes
+    @param angles 'list' angles in degrees, counterclockwise from +x
+    @return _ 'list' (x, y) points, y grows downwards
+    """
+    return [
+        (
+            center[0] + axes[0] * np.cos(np.radians(angle)),
+            center[1] - axes[1] * np.sin(np.radians(angle)),
+        )
+        for angle in angles
+    ]
+
+
+def get_face_template() -> np.array:
+    """! Get the 68 landmarks (iBUG 300-W layout) of a frontal face, in
+    coordinates normalized to the face box: x from the jaw right side (0)
+    to its left side (1), y from the eyebrows (0) to the chin (1)
+    @return _ 'np.array' (68, 2) landmarks
+    """
+
+    # Jaw, from the right temple (image left) to the left one through the chin
+    shape = _ellipse((0.5, 0.25), (0.5, -0.75), np.linspace(180, 0, 17))
+    # Eyebrows
+    shape += [
+        (x, 0.14 - 0.05 * np.sin(np.pi * k / 4))
+        for k, x in enumerate(np.linspace(0.12, 0.42, 5))
+    ]
+    shape += [
+        (x, 0.14 - 0.05 * np.sin(np.pi * k / 4))
+        for k, x in enumerate(np.linspace(0.58, 0.88, 5))
+    ]
+    # Nose bridge and bottom
+    shape += [(0.5, y) for y in np.linspace(0.25, 0.52, 4)]
+    shape += [
+        (x, 0.58 + 0.02 * (1 - abs(x - 0.5) / 0.1)) for x in np.linspace(0.4, 0.6, 5)
+    ]
+    # Eyes, from the outer corner of the right eye and the inner of the left
+    shape += _ellipse((0.30, 0.28), (0.09, 0.035), (180, 120, 60, 0, -60, -120))
+    shape += _ellipse((0.70, 0.28), (0.09, 0.035), (180, 120, 60, 0, -60, -120))
+    # Mouth, outer and inner lips from the right corner
+    shape += _ellipse((0.5, 0.78), (0.16, 0.07), range(180, -180, -30))
+    shape += _ellipse((0.5, 0.78), (0.11, 0.025), range(180, -180, -45))
+
+    return np.float64(shape)
+
+
+def render_face(size: tuple, rng: np.random.RandomState) -> tuple:
+    """! Renders a face-like image, with the face in a random position,
+    size, rotation and colors
+    @param size 'tuple' (width, height) of the image
+    @param rng 'np.random.RandomState' random generator
+    @return _ 'tuple' (img, shape) BGR image and its (68, 2) landmarks
+    """
+
+    width, height = size
+
+    # Background, a gradient with noise
+    img = np.empty((height, width, 3), np.uint8)
+    gradient = np.linspace(0, 1, width)[None, :, None]
+    colors = rng.randint(40, 220, (2, 3))
+    img[:] = (colors[0] + (colors[1] - colors[0]) * gradient).astype(np.uint8)
+
+    # Face box and pose
+    face_width = min(size) * rng.uniform(0.25, 0.4)
+    face_height = face_width * 1.3
+    center = np.float64(size) / 2 + rng.uniform(-0.1, 0.1, 2) * np.float64(size)
+    M = cv2.getRotationMatrix2D(center=(0.0, 0.0), angle=rng.uniform(-12, 12), scale=1)
+    M = np.float64(M) @ np.float64([[face_width, 0, 0], [0, face_height, 0], [0, 0, 1]])
+    M[:, 2] = center - M[:, :2] @ (0.5, 0.55)
+
+    def transform(points):
+        return np.rint(cv2.transform(np.float64([points]), M)[0]).astype(np.int32)
+
+    template = get_face_template()
+    shape = transform(template)
+    head = transform(
+        np.vstack(
+            [template[:17], _ellipse((0.5, 0.25), (0.5, 0.35), range(0, 181, 15))]
+        )
+    )
+
+    tone = rng.uniform(0.35, 1.0)
+    skin = (int(60 + 120 * tone), int(80 + 120 * tone), int(130 + 110 * tone))
+    thickness = max(1, int(face_width / 40))
+    cv2.fillConvexPoly(img, cv2.convexHull(head), skin, cv2.LINE_AA)
+    for start, end in ((17, 22), (22, 27)):
+        cv2.polylines(
+            img, [shape[start:end]], False, (40, 40, 60), thickness, cv2.LINE_AA
+        )
+    for start in (36, 42):
+        eye = shape[start : start + 6]
+        cv2.fillPoly(img, [eye], (235, 235, 235), cv2.LINE_AA)
+        iris = tuple(int(c) for c in eye.mean(axis=0))
+        cv2.circle(
+            img, iris, max(1, int(face_width * 0.03)), (30, 30, 30), -1, cv2.LINE_AA
+        )
+    cv2.polylines(
+        img, [shape[27:31], shape[31:36]], False, (60, 60, 90), thickness, cv2.LINE_AA
+    )
+    cv2.fillPoly(img, [shape[48:60]], (70, 70, 170), cv2.LINE_AA)
+    cv2.fillPoly(img, [shape[60:68]], (40, 30, 60), cv2.LINE_AA)
+
+    # Camera blur and sensor noise
+    img = cv2.GaussianBlur(img, (0, 0), max(0.5, min(size) / 500))
+    noise = rng.normal(0, 4, img.shape)
+    img = np.clip(img + noise, 0, 255).astype(np.uint8)
+
+    return img, shape
+
+
+def make_dataset(
+    path: str,
+    images: int = 200,
+    folders: int = 6,
+    size: tuple = (1920, 1080),
+    seed: int = 0,
+) -> dict:
+    """! Creates a synthetic dataset of face-like JPEG images, one per day,
+    split in subfolders. Files modification dates are set to the image day,
+    as the dataset is sorted by them
+    @param path 'string' absolute path to the dataset folder
+    @param images 'int' number of images
+    @param folders 'int' number of subfolders the images are split in
+    @param size 'tuple' (width, height) of the images
+    @param seed 'int' random generator seed, same seed same dataset
+    @return _ 'dict' image path to its (68, 2) landmarks
+    """
+
+    rng = np.random.RandomState(seed)
+    start = datetime(2020, 1, 1, 8)
+    per_folder = int(np.ceil(images / max(1, folders)))
+
+    shapes = {}
+    for idx in range(images):
+        day = start + timedelta(days=idx)
+        folder = os.path.join(
+            path, f"{idx // per_folder:03d}_{day.year}_{day.month:02d}"
+        )
+        os.makedirs(folder, exist_ok=True)
+
+        img, shape = render_face(size=size, rng=rng)
+        file_path = os.path.join(folder, f"{day.strftime('%Y%m%d_%H%M%S')}.jpg")
+        cv2.imwrite(file_path, img, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        os.utime(file_path, (day.timestamp(), day.timestamp()))
+        shapes[file_path] = shape
+
+    return shapes
+
+
+def train_predictor(
+    path: str, images: int = 40, size: tuple = (640, 360), seed: int = 1
+) -> None:
+    """! Trains a tiny landmarks predictor with synthetic faces, for
+    benchmarking without the real predictor weights. It is fast to train
+    and small, so it is not representative of the real predictor accuracy
+    @param path 'string' absolute path to save the predictor weights
+    @param images 'int' number of synthetic faces to train with
+    @param size 'tuple' (width, height) of the training images
+    @param seed 'int' random generator seed
+    """
+
+    rng = np.random.RandomState(seed)
+    samples, objects = [], []
+    for _ in range(images):
+        img, shape = render_face(size=size, rng=rng)
+        x0, y0 = shape.min(axis=0)
+        x1, y1 = shape.max(axis=0)
+        rect = dlib.rectangle(int(x0), int(y0), int(x1), int(y1))
+        points = [dlib.point(int(x), int(y)) for x, y in shape]
+        samples.append(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY))
+        objects.append([dlib.full_object_detection(rect, points)])
+
+    options = dlib.shape_predictor_training_options()
+    options.tree_depth = 2
+    options.cascade_depth = 6
+    options.num_trees_per_cascade_level = 50
+    options.oversampling_amount = 5
+    options.num_threads = os.cpu_count() or 1
+    dlib.train_shape_predictor(samples, objects, options).save(path)
+
+
+# =============================================================================
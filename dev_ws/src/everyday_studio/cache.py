@@ -0,0 +1,382 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from file_utils import read_image_info
+from utils import printlog
+
+# =============================================================================
+# CLASSES - CLASSES - CLASSES - CLASSES - CLASSES - CLASSES  - CLASSES - CLASSE
+# =============================================================================
+class FilesCache:
+    # name of the cache for printings, its table, and the columns and types
+    # of the values kept for every file
+    NAME = "files cache"
+    TABLE = "files"
+    COLUMNS = ()
+
+    def __init__(self, path: str) -> None:
+        """!
+        Constructor for FilesCache class instances. The cache keeps values
+        of every dataset file in a sqlite database, keyed by the file
+        identity (path, size and modification date), so they are only
+        computed again for new or changed images. Subclasses set the table
+        and its value columns, and how values are encoded to them
+        @param path 'string' absolute path to the cache database file
+        """
+
+        self.path = path
+
+        # Check that the cache folder exits
+        if not os.path.isdir(os.path.dirname(self.path)):
+            os.makedirs(os.path.dirname(self.path))
+            printlog(
+                msg=f"path {os.path.dirname(self.path)} created",
+                msg_type="WARN",
+            )
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.TABLE} ("
+            + "path TEXT PRIMARY KEY, size INTEGER, mtime REAL, "
+            + ", ".join(f"{name} {kind}" for name, kind in self.COLUMNS)
+            + ")"
+        )
+        self._connection.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, value) -> tuple:
+        """!
+        @param value value of a file
+        @return _ 'tuple' value of every column
+        """
+        return (value,)
+
+    def decode(self, row: tuple):
+        """!
+        @param row 'tuple' value of every column
+        @return _ value of the file
+        """
+        return row[0]
+
+    def get(self, path: str, size: int, mtime: float) -> tuple:
+        """!
+        Look for the value of a file in the cache
+        @param path 'string' absolute path to the image file
+        @param size 'int' file size in bytes
+        @param mtime 'float' file's modification date stamp
+        @return _ 'tuple' (found, value) found is False if the file is not
+            in the cache or it changed, then value is None
+        """
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT size, mtime, "
+                + ", ".join(name for name, _ in self.COLUMNS)
+                + f" FROM {self.TABLE} WHERE path=?",
+                (path,),
+            ).fetchone()
+
+        if row is None or row[0] != size or row[1] != mtime:
+            self.misses += 1
+            return False, None
+
+        self.hits += 1
+        return True, self.decode(row[2:])
+
+    def put(self, path: str, size: int, mtime: float, value) -> None:
+        """!
+        Add or replace the value of a file in the cache
+        @param path 'string' absolute path to the image file
+        @param size 'int' file size in bytes
+        @param mtime 'float' file's modification date stamp
+        @param value value of the file
+        """
+
+        row = (path, size, mtime, *self.encode(value))
+        with self._lock:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {self.TABLE} VALUES "
+                + f"({', '.join('?' * len(row))})",
+                row,
+            )
+
+    def commit(self) -> None:
+        """!
+        Writes pending changes to the cache file
+        """
+        with self._lock:
+            self._connection.commit()
+
+    def close(self) -> None:
+        """!
+        Commits pending changes and closes the cache file
+        """
+        self.commit()
+        with self._lock:
+            self._connection.close()
+
+    def __str__(self):
+        """!
+        Get object instace string for printings
+        @return str_ 'string' string with object instance info
+        """
+        return f"{self.NAME} {self.path}, hits: {self.hits}, misses: {self.misses}"
+
+
+class LandmarksCache(FilesCache):
+    """!
+    The cache keeps the face landmarks of every dataset file, so the face
+    detector only runs for new or changed images. Landmarks are stored
+    normalized to the image size, so changing the video size does not
+    invalidate the cache. The value of a file is its (68, 2) normalized
+    landmarks array, or None if no face was detected in the image
+    """
+
+    NAME = "landmarks cache"
+    TABLE = "landmarks"
+    COLUMNS = (("shape", "BLOB"),)
+
+    def encode(self, value: np.array) -> tuple:
+        if value is None:
+            return (None,)
+        return (np.asarray(value, dtype=np.float32).tobytes(),)
+
+    def decode(self, row: tuple) -> np.array:
+        if row[0] is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.float32).reshape(-1, 2)
+
+
+class QualityCache(FilesCache):
+    """!
+    The cache keeps the quality measures of every dataset file. Measures are
+    kept instead of the verdicts, so changing the quality thresholds does
+    not invalidate the cache. The value of a file is its (sharpness,
+    luminance, clipping) measures
+    """
+
+    NAME = "quality cache"
+    TABLE = "quality"
+    COLUMNS = (("sharpness", "REAL"), ("luminance", "REAL"), ("clipping", "REAL"))
+
+    def encode(self, value: tuple) -> tuple:
+        return tuple(float(measure) for measure in value)
+
+    def decode(self, row: tuple) -> tuple:
+        return tuple(row)
+
+
+class HashCache(FilesCache):
+    """!
+    The cache keeps the perceptual hash of every dataset file, so the images
+    are only decoded to get their hash once. The value of a file is its 64
+    bits hash
+    """
+
+    NAME = "hash cache"
+    TABLE = "hashes"
+    COLUMNS = (("hash", "TEXT"),)
+
+    # hashes are kept as hex text, sqlite integers are signed
+    def encode(self, value: int) -> tuple:
+        return (f"{value:016x}",)
+
+    def decode(self, row: tuple) -> int:
+        return int(row[0], 16)
+
+
+class DataSetIndex:
+    def __init__(self, path: str, strict: bool = False) -> None:
+        """!
+        Constructor for DataSetIndex class instances. The index keeps the
+        properties of every dataset file (path, size, dates and image size)
+        in a sqlite database, with the modification date of every dataset
+        subfolder. Only subfolders modified since the last scan are listed
+        and their files stat again, so loading an unchanged dataset does
+        not touch its files.
+        @param path 'string' absolute path to the index database file
+        @param strict 'bool' stat the files of unchanged subfolders too, a
+            file edited in place doesn't change its subfolder date
+        """
+
+        self.path = path
+        self.strict = strict
+
+        # Check that the index folder exits
+        if not os.path.isdir(os.path.dirname(self.path)):
+            os.makedirs(os.path.dirname(self.path))
+            printlog(
+                msg=f"path {os.path.dirname(self.path)} created",
+                msg_type="WARN",
+            )
+
+        self._connection = sqlite3.connect(self.path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS folders (path TEXT PRIMARY KEY, mtime REAL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            + "path TEXT PRIMARY KEY, folder TEXT, size INTEGER, mtime REAL, "
+            + "ctime REAL, capture REAL, width INTEGER, height INTEGER)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS files_folder ON files (folder)"
+        )
+        self._connection.commit()
+
+        self.scanned_folders = 0
+
+    def scan(self, folders: list, extensions: tuple) -> dict:
+        """!
+        Gets the files of the dataset subfolders, rescanning only the
+        subfolders modified since the last scan, or with modified files in
+        strict mode
+        @param folders 'list' absolute paths of the dataset subfolders
+        @param extensions 'tuple' file extensions of the dataset files
+        @return _ 'dict' subfolder path to list of file rows
+            (path, size, mtime, ctime, capture, width, height)
+        """
+
+        self.scanned_folders = 0
+        indexed = dict(self._connection.execute("SELECT path, mtime FROM folders"))
+
+        files = {}
+        for folder in folders:
+            mtime = os.stat(folder).st_mtime
+            if indexed.get(folder) != mtime or (
+                self.strict and self._is_modified(folder=folder, extensions=extensions)
+            ):
+                self._scan_folder(folder=folder, mtime=mtime, extensions=extensions)
+            files[folder] = self._connection.execute(
+                "SELECT path, size, mtime, ctime, capture, width, height "
+                + "FROM files WHERE folder=?",
+                (folder,),
+            ).fetchall()
+
+        # Forget subfolders that don't exist anymore
+        for folder in set(indexed) - set(folders):
+            self._connection.execute("DELETE FROM files WHERE folder=?", (folder,))
+            self._connection.execute("DELETE FROM folders WHERE path=?", (folder,))
+
+        self._connection.commit()
+        return files
+
+    def _is_modified(self, folder: str, extensions: tuple) -> bool:
+        """!
+        Checks if the files of a dataset subfolder changed since the last
+        scan, stating them
+        @param folder 'string' absolute path of the subfolder
+        @param extensions 'tuple' file extensions of the dataset files
+        @return _ 'bool' whether a file was added, removed or modified
+        """
+
+        indexed = {
+            row[0]: row[1:]
+            for row in self._connection.execute(
+                "SELECT path, size, mtime FROM files WHERE folder=?", (folder,)
+            )
+        }
+        found = 0
+        for entry in os.scandir(folder):
+            if not entry.name.endswith(extensions) or not entry.is_file():
+                continue
+            stat = entry.stat()
+            if indexed.get(entry.path) != (stat.st_size, stat.st_mtime):
+                return True
+            found += 1
+        return found != len(indexed)
+
+    def _scan_folder(self, folder: str, mtime: float, extensions: tuple) -> None:
+        """!
+        Updates the index with the files of a dataset subfolder, headers
+        are only read for new or changed files
+        @param folder 'string' absolute path of the subfolder
+        @param mtime 'float' modification date stamp of the subfolder
+        @param extensions 'tuple' file extensions of the dataset files
+        """
+
+        self.scanned_folders += 1
+        indexed = {
+            row[0]: row[1:]
+            for row in self._connection.execute(
+                "SELECT path, size, mtime, capture, width, height "
+                + "FROM files WHERE folder=?",
+                (folder,),
+            )
+        }
+
+        rows = []
+        for entry in os.scandir(folder):
+            if not entry.name.endswith(extensions) or not entry.is_file():
+                continue
+            stat = entry.stat()
+            row = indexed.get(entry.path)
+            if row is None or row[0] != stat.st_size or row[1] != stat.st_mtime:
+                width, height, capture = read_image_info(entry.path)
+            else:
+                capture, width, height = row[2:]
+            rows.append(
+                (
+                    entry.path,
+                    folder,
+                    stat.st_size,
+                    stat.st_mtime,
+                    stat.st_ctime,
+                    capture,
+                    width,
+                    height,
+                )
+            )
+
+        self._connection.execute("DELETE FROM files WHERE folder=?", (folder,))
+        self._connection.executemany(
+            "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+        )
+        self._connection.execute(
+            "INSERT OR REPLACE INTO folders VALUES (?, ?)", (folder, mtime)
+        )
+
+    def close(self) -> None:
+        """!
+        Closes the index file
+        """
+        self._connection.close()
+
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def normalize_shape(shape: np.array, size: tuple) -> np.array:
+    """! Converts landmarks in pixels to resolution independent coordinates
+    @param shape 'np.array' (68, 2) landmarks in pixels
+    @param size 'tuple' (width, height) of the image where landmarks were found
+    @return _ 'np.array' (68, 2) landmarks in [0, 1] coordinates
+    """
+    return np.asarray(shape, dtype=np.float32) / np.float32(size)
+
+
+def denormalize_shape(shape: np.array, size: tuple) -> np.array:
+    """! Converts resolution independent landmarks to pixels
+    @param shape 'np.array' (68, 2) landmarks in [0, 1] coordinates
+    @param size 'tuple' (width, height) of the target image
+    @return _ 'np.array' (68, 2) landmarks in pixels
+    """
+    return np.rint(shape * np.float32(size)).astype(int)
+
+
+# =============================================================================
@@ -0,0 +1,209 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+
+Picks the face detector backend for the dataset. Every backend runs on a
+sample of the dataset images, and the fastest one that finds a face in at
+least the target rate of them is printed as the FACE_DETECTOR setting:
+
+    python3 dev_ws/src/everyday_studio/calibrate.py --samples 50 --rate 0.9
+
+Exit status: 0 backend found, 1 no backend reaches the target rate
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import argparse
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from detectors import BACKENDS
+from every_day_maker import DataSet
+from face import FaceDetector
+from utils import printlog
+from utils.profiler import Profiler
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def load_samples(dataset: DataSet, samples: int, size: tuple) -> list:
+    """! Decodes images spread along the whole dataset
+    @param dataset 'DataSet' dataset loaded
+    @param samples 'int' number of images
+    @param size 'tuple' (width, height) the images are used at
+    @return _ 'list' gray scale images of the sample
+    """
+
+    if dataset.data_values is None or not len(dataset.data_values):
+        return []
+
+    imgs = []
+    for idx in np.unique(
+        np.linspace(0, len(dataset.data_values) - 1, samples).astype(int)
+    ):
+        image = dataset.data_values[int(idx)]
+        image.load(print_info=False, size=size)
+        img = image.get_data(size=size)
+        if img is not None:
+            imgs.append(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY))
+    return imgs
+
+
+def calibrate(
+    imgs: list, predictor_path: str, detector_args: dict, backends: list
+) -> list:
+    """! Times every face detector backend on the sample images
+    @param imgs 'list' gray scale images of the sample
+    @param predictor_path 'string' absolute path to the landmarks weights
+    @param detector_args 'dict' FaceDetector arguments, but the backend
+    @param backends 'list' (name, model_path, config_path) of the backends
+    @return _ 'list' dicts with the name, detection rate and p50 detection
+        time of every backend that could be created
+    """
+
+    results = []
+    for name, model_path, config_path in backends:
+        try:
+            face_detector = FaceDetector(
+                predictor_path=predictor_path,
+                **dict(
+                    detector_args,
+                    backend=name,
+                    backend_model=model_path,
+                    backend_config=config_path,
+                ),
+            )
+        except Exception as e:
+            printlog(msg=f"face detector {name} skipped, error:{e}", msg_type="WARN")
+            continue
+
+        timer = Profiler()
+        faces = 0
+        for img in imgs:
+            with timer.measure("detection"):
+                faces += bool(len(face_detector.detect(img_gray=img)))
+
+        stats = timer.report["stages"]["detection"]
+        results.append(
+            {
+                "backend": name,
+                "rate": faces / len(imgs),
+                "p50": stats["p50"],
+                "fps": stats["fps"],
+            }
+        )
+    return results
+
+
+def select_backend(results: list, rate: float) -> dict:
+    """! Get the fastest backend that reaches the detection rate
+    @param results 'list' backends results of calibrate
+    @param rate 'float' target detection rate
+    @return _ 'dict' result of the backend selected, None if no one
+        reaches the rate
+    """
+    candidates = [result for result in results if result["rate"] >= rate]
+    return min(candidates, key=lambda result: result["p50"]) if candidates else None
+
+
+# =============================================================================
+# MAIN FUNCTION - MAIN FUNCTION - MAIN FUNCTION - MA[-IN FUNCTION - MAIN FUNCTI
+# IMPLEMENTATION EXAMPLE - IMPLEMENTATION EXAMPLE - IMPLEMENTATION EXAMPLE - IM
+# =============================================================================
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="face detector calibration")
+    parser.add_argument("--dataset", help="overwrites DATASET_PATH")
+    parser.add_argument("--samples", type=int, default=50, help="images to try")
+    parser.add_argument("--rate", type=float, default=0.9, help="target detection rate")
+    parser.add_argument(
+        "--backends",
+        default=",".join(BACKENDS),
+        help="comma separated backends to try",
+    )
+    parser.add_argument("--haar-model", help="Haar cascade file in CONFIGS_PATH")
+    parser.add_argument("--dnn-model", help="DNN weights file in CONFIGS_PATH")
+    parser.add_argument("--dnn-config", help="DNN description file in CONFIGS_PATH")
+    args = parser.parse_args()
+
+    configs_path = os.getenv("CONFIGS_PATH")
+    size = (
+        int(os.getenv("VIDEO_WIDTH", default=640)),
+        int(os.getenv("VIDEO_HEIGHT", default=360)),
+    )
+    dataset = DataSet(
+        path=args.dataset or os.getenv("DATASET_PATH"),
+        index_path=os.path.join(os.getenv("CACHE_PATH"), "dataset.db")
+        if int(os.getenv("DATASET_INDEX", default=1))
+        else None,
+        load_size=size,
+    )
+    imgs = load_samples(dataset=dataset, samples=args.samples, size=size)
+    if not imgs:
+        printlog(msg="no images to calibrate the face detector", msg_type="ERROR")
+        sys.exit(1)
+
+    # The backend in use takes its model files from the environment if they
+    # are not given
+    backend = os.getenv("FACE_DETECTOR", default="hog")
+    model_name = os.getenv("FACE_DETECTOR_MODEL", default="")
+    config_name = os.getenv("FACE_DETECTOR_CONFIG", default="")
+    models = {
+        "hog": ("", ""),
+        "haar": (args.haar_model or (model_name if backend == "haar" else ""), ""),
+        "dnn": (
+            args.dnn_model or (model_name if backend == "dnn" else ""),
+            args.dnn_config or (config_name if backend == "dnn" else ""),
+        ),
+    }
+    backends = []
+    for name in args.backends.split(","):
+        files = models.get(name, ("", ""))
+        backends.append(
+            (name, *(os.path.join(configs_path, fl) if fl else "" for fl in files))
+        )
+
+    # Tracking is disabled to time the detection in the whole images
+    results = calibrate(
+        imgs=imgs,
+        predictor_path=os.path.join(configs_path, os.getenv("PREDICTOR_NAME")),
+        detector_args={
+            "upsample_ladder": tuple(
+                int(up) for up in os.getenv("FACE_DETECTION_UPSAMPLE", "1").split(",")
+            ),
+            "detection_scale": float(os.getenv("FACE_DETECTION_SCALE", default=1.0)),
+        },
+        backends=backends,
+    )
+    # Results are printed at every DEBUG_LEVEL, they are what was asked for
+    for result in results:
+        printlog(
+            msg=f"{result['backend']}: detection rate {result['rate'] * 100:.1f}%, "
+            + f"p50 {result['p50'] * 1000:.2f}ms, {result['fps']:.1f} fps "
+            + f"({len(imgs)} images)",
+            msg_type="OKGREEN",
+        )
+
+    selected = select_backend(results=results, rate=args.rate)
+    if selected is None:
+        printlog(
+            msg=f"no face detector reaches {args.rate * 100:.0f}% detection rate",
+            msg_type="ERROR",
+        )
+        sys.exit(1)
+    model_name, config_name = models.get(selected["backend"], ("", ""))
+    printlog(
+        msg=f"face detector {selected['backend']} selected, set it with:\n"
+        + f'export FACE_DETECTOR="{selected["backend"]}"\n'
+        + f'export FACE_DETECTOR_MODEL="{model_name}"\n'
+        + f'export FACE_DETECTOR_CONFIG="{config_name}"',
+        msg_type="OKGREEN",
+    )
+    sys.exit(0)
+
+# =============================================================================
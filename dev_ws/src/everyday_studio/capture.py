@@ -6,10 +6,14 @@ Aka: @JohnBetaCode
 # =============================================================================
 # LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
 # =============================================================================
-from utils import printlog, try_catch_log
+from utils import printlog, profiler
 import cv2
 import numpy as np
 import os
+import queue
+import subprocess
+import threading
+from collections import deque
 
 # =============================================================================
 # CLASSES - CLASSES - CLASSES - CLASSES - CLASSES - CLASSES  - CLASSES - CLASSE
@@ -79,13 +83,15 @@ class VideoWriter:
             self.video_rate,
             (self.video_width, self.video_height),
         )
+        if not self.video_writer.isOpened():
+            self.video_writer = None
+            raise RuntimeError(f"video file {self.file_dir} can't be written")
 
         printlog(
             msg=f"{self.file_name} video file created, size:{self.video_width}X{self.video_height}, rate:{self.video_rate}",
             msg_type="INFO",
         )
 
-    @try_catch_log
     def write(self, img: np.ndarray) -> None:
         """!
         Writes the next image whenever the VideoWritter
@@ -100,9 +106,9 @@ class VideoWriter:
             self.start(img=img)
 
         # Writes the image into the video
-        self.video_writer.write(img)
+        with profiler.measure("write"):
+            self.video_writer.write(img)
 
-    @try_catch_log
     def close(self) -> None:
         """!
         Closes video capture object
@@ -110,6 +116,211 @@ class VideoWriter:
         """
         if self.video_writer is not None:
             self.video_writer.release()
+            self.video_writer = None
+
+
+class FFmpegVideoWriter:
+    def __init__(
+        self,
+        file_path: str,
+        file_name: str,
+        rate: int = 30,
+        codec: str = "libx264",
+        crf: int = 23,
+        preset: str = "medium",
+        audio_path: str = None,
+    ) -> None:
+        """!
+        Object class constructor for video writers that stream raw images
+        to a ffmpeg process through its stdin, which encodes them to H.264
+        or H.265 and adds the audio track in the same pass, so no
+        intermediate video file is written
+        @param file_path 'str' File path to write video
+        @param file_name 'str' File name to save video, without extension
+        @param rate 'int' Rate to write video (default: 30)
+        @param codec 'str' ffmpeg video encoder, libx264 or libx265
+        @param crf 'int' encoder constant rate factor, lower is better quality
+        @param preset 'str' encoder preset, slower presets compress better
+        @param audio_path 'str' absolute path to the audio track, None for
+            a video without audio. It can be changed before the first image
+        @return None
+        """
+
+        # ---------------------------------------------------------------------
+        # Video capture path variables
+        self.file_name = f"{file_name}.mp4"
+        self.file_path = file_path
+        self.file_dir = os.path.join(self.file_path, self.file_name)
+
+        # Encoder settings
+        self.video_rate = rate
+        self.codec = codec
+        self.crf = crf
+        self.preset = preset
+        self.audio_path = audio_path
+        self.video_width = None
+        self.video_height = None
+
+        # ffmpeg process and its last log lines, read in their own thread so
+        # the process never blocks writing them
+        self.video_writer = None
+        self._log = deque(maxlen=20)
+        self._log_thread = None
+
+    def start(self, img: np.ndarray) -> None:
+        """!
+        Starts the ffmpeg process
+        @param img: 'cv2.math' image to be recorded in
+                video capture. Its size defines the video size
+        @return None
+        """
+
+        self.video_width = img.shape[1]
+        self.video_height = img.shape[0]
+
+        # Check that path exits
+        if not os.path.isdir(self.file_path):
+            printlog(
+                msg=f"path {self.file_path} created",
+                msg_type="WARN",
+            )
+            os.makedirs(self.file_path)
+
+        command = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y"]
+        command += ["-f", "rawvideo", "-pix_fmt", "bgr24"]
+        command += ["-s", f"{self.video_width}x{self.video_height}"]
+        command += ["-r", str(self.video_rate), "-i", "-"]
+        if self.audio_path is not None:
+            command += ["-i", self.audio_path, "-map", "0:v", "-map", "1:a"]
+            command += ["-af", "apad", "-c:a", "aac", "-shortest"]
+        command += ["-c:v", self.codec, "-crf", str(self.crf)]
+        command += ["-preset", self.preset, "-pix_fmt", "yuv420p"]
+        command += ["-movflags", "+faststart", self.file_dir]
+
+        self._log.clear()
+        self.video_writer = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        self._log_thread = threading.Thread(target=self._read_log, daemon=True)
+        self._log_thread.start()
+
+        printlog(
+            msg=f"{self.file_name} video file created, size:{self.video_width}X{self.video_height}, rate:{self.video_rate}, codec:{self.codec}",
+            msg_type="INFO",
+        )
+
+    def _read_log(self) -> None:
+        """!
+        Keeps the last lines ffmpeg writes to its stderr
+        @return None
+        """
+        for line in self.video_writer.stderr:
+            self._log.append(line.decode(errors="replace").rstrip())
+
+    def _error(self, msg: str) -> RuntimeError:
+        """!
+        Get an exception with the ffmpeg log
+        @param msg 'str' error message
+        @return _ 'RuntimeError' exception to raise
+        """
+        return RuntimeError(f"{msg}: " + " | ".join(self._log))
+
+    def write(self, img: np.ndarray) -> None:
+        """!
+        Streams the next image to the encoder
+        @param img 'cv2.math' image to record in
+                video capture
+        @return None
+        """
+
+        if self.video_writer is None:
+            self.start(img=img)
+
+        with profiler.measure("write"):
+            try:
+                self.video_writer.stdin.write(img.tobytes())
+            except (BrokenPipeError, OSError):
+                self.video_writer.wait()
+                self._log_thread.join()
+                raise self._error(
+                    f"ffmpeg stopped with code {self.video_writer.returncode}"
+                )
+
+    def close(self) -> None:
+        """!
+        Finishes the video, waiting for ffmpeg to encode the last images
+        @return None
+        """
+
+        if self.video_writer is None:
+            return
+
+        video_writer, self.video_writer = self.video_writer, None
+        try:
+            video_writer.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        video_writer.wait()
+        self._log_thread.join()
+        if video_writer.returncode:
+            raise self._error(f"ffmpeg failed with code {video_writer.returncode}")
+
+
+class ThreadedVideoWriter:
+    def __init__(self, video_writer: VideoWriter, queue_size: int = 8) -> None:
+        """!
+        Object class constructor for a video writer that encodes images
+        in its own thread. Writing blocks only when queue_size images are
+        already waiting to be encoded.
+        @param video_writer 'VideoWriter' video writer to encode images with
+        @param queue_size 'int' maximum number of images waiting to be encoded
+        @return None
+        """
+
+        self.video_writer = video_writer
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        """!
+        Encodes the queued images until join is called. After an encoding
+        error the queued images are dropped, the error is raised by join
+        @return None
+        """
+        while True:
+            img = self._queue.get()
+            if img is None:
+                break
+            if self._error is not None:
+                continue
+            try:
+                self.video_writer.write(img=img)
+            except Exception as e:
+                self._error = e
+
+    def write(self, img: np.ndarray) -> None:
+        """!
+        Queues the next image to be encoded
+        @param img 'cv2.math' image to record in
+                video capture
+        @return None
+        """
+        if self._error is not None:
+            raise self._error
+        self._queue.put(img)
+
+    def join(self) -> None:
+        """!
+        Waits until every queued image is encoded and stops the
+        encoding thread, the video writer is not closed
+        @return None
+        """
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
 
 
 # =============================================================================
@@ -0,0 +1,147 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from cache import HashCache
+from quality import load_thumbnail
+from utils import printlog, profiler
+
+# =============================================================================
+# CLASSES - CLASSES - CLASSES - CLASSES - CLASSES - CLASSES  - CLASSES - CLASSE
+# =============================================================================
+class DuplicatesFilter:
+    # width of the thumbnail the hashes are computed from
+    THUMBNAIL_WIDTH = 32
+
+    def __init__(
+        self, cache: HashCache = None, distance: int = 6, window: float = 600.0
+    ) -> None:
+        """!
+        Constructor for DuplicatesFilter class instances. The filter keeps
+        a single image of every burst of near-identical shots: images whose
+        perceptual hashes (dHash) differ in a few bits from the hash of an
+        image taken a short time before, the same day, are skipped. As the
+        everyday photos have the same pose, shots of different days are
+        never taken as duplicates
+        @param cache 'HashCache' cache for the images hashes, None to get the
+            hashes every time
+        @param distance 'int' maximum number of different bits between the
+            hashes of duplicated images, out of 64
+        @param window 'float' seconds after the first image of a burst that
+            its duplicates can be taken, bursts end with the day anyway
+        """
+
+        self.cache = cache
+        self.distance = distance
+        self.window = window
+
+    def get_hash(self, image) -> int:
+        """!
+        Get the perceptual hash of an image, from the cache if it's there
+        @param image 'Image' dataset image
+        @return _ 'int' 64 bits hash, None if the image can't be decoded
+        """
+
+        if self.cache is not None:
+            found, image_hash = self.cache.get(
+                path=image.path, size=image.size, mtime=image.modified_date_stamp
+            )
+            if found:
+                return image_hash
+
+        with profiler.measure("hash"):
+            image_hash = get_dhash(
+                img_gray=load_thumbnail(path=image.path, width=self.THUMBNAIL_WIDTH)
+            )
+        if image_hash is not None and self.cache is not None:
+            self.cache.put(
+                path=image.path,
+                size=image.size,
+                mtime=image.modified_date_stamp,
+                value=image_hash,
+            )
+        return image_hash
+
+    def filter(self, images: list) -> list:
+        """!
+        Skips the duplicated images, the first image of every burst is kept.
+        Missing files and images that can't be decoded are kept for the
+        exportation to report them
+        @param images 'list' dataset Image objects in timestamp order
+        @return _ 'list' Image objects without duplicates, in the same order
+        """
+
+        passed = []
+        bursts = []  # (first image timestamp, day, hash) of the bursts in window
+        for idx in range(len(images)):
+            image = images[idx]
+            image_hash = self.get_hash(image=image) if image.isfile else None
+            if image_hash is None:
+                passed.append(image)
+                continue
+
+            stamp = image.modified_date_stamp
+            day = datetime.fromtimestamp(stamp).date()
+            bursts = [
+                burst
+                for burst in bursts
+                if stamp - burst[0] <= self.window and burst[1] == day
+            ]
+            if any(
+                bin(image_hash ^ burst_hash).count("1") <= self.distance
+                for _, _, burst_hash in bursts
+            ):
+                profiler.skip(reason="duplicate")
+                continue
+            bursts.append((stamp, day, image_hash))
+            passed.append(image)
+
+        if self.cache is not None:
+            self.cache.commit()
+            printlog(msg=self.cache, msg_type="INFO")
+        printlog(
+            msg=f"{len(images) - len(passed)} of {len(images)} images skipped "
+            + "as duplicates",
+            msg_type="INFO",
+        )
+        return passed
+
+    def __str__(self):
+        """!
+        Get object instace string for printings
+        @return str_ 'string' string with object instance info
+        """
+        return (
+            f"duplicates filter, distance<={self.distance} bits, "
+            + f"window: {self.window}s"
+        )
+
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def get_dhash(img_gray: np.array) -> int:
+    """! Get the difference hash of an image: the image is reduced to 9x8
+    pixels and every bit tells if a pixel is brighter than its left neighbor
+    @param img_gray 'np.array' gray scale image, a thumbnail
+    @return _ 'int' 64 bits hash, None if there's no image
+    """
+
+    if img_gray is None:
+        return None
+    img = cv2.resize(img_gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (img[:, 1:] > img[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+# =============================================================================
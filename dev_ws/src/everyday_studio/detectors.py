@@ -0,0 +1,167 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+
+Face detector backends, all of them return dlib rectangles so the faces
+found feed the same landmarks shape predictor
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import os
+
+import cv2
+import dlib
+import numpy as np
+
+# =============================================================================
+# CLASSES - CLASSES - CLASSES - CLASSES - CLASSES - CLASSES  - CLASSES - CLASSE
+# =============================================================================
+class HogDetector:
+    def __init__(self) -> None:
+        """!
+        Constructor for the dlib HOG face detector backend
+        """
+        self._detector = dlib.get_frontal_face_detector()
+
+    def detect(self, img_gray: np.array, upsample: int) -> tuple:
+        """!
+        Detects faces rectangles
+        @param img_gray 'np.array' gray scale image for detection
+        @param upsample 'int' times the image is upsampled to find smaller
+            faces
+        @return _ 'tuple' (rects, scores) dlib.rectangle of faces found and
+            their detector scores
+        """
+        rects, scores, _ = self._detector.run(img_gray, upsample, 0.0)
+        return list(rects), list(scores)
+
+
+class HaarDetector:
+    def __init__(self, model_path: str = "", min_neighbors: int = 5) -> None:
+        """!
+        Constructor for the OpenCV Haar cascade face detector backend
+        @param model_path 'string' absolute path to the cascade file, if
+            empty the frontal face cascade that ships with OpenCV is used
+        @param min_neighbors 'int' neighbor detections a face needs
+        """
+
+        if not hasattr(cv2, "CascadeClassifier"):
+            raise RuntimeError("this OpenCV build has no Haar cascades support")
+        if not model_path:
+            model_path = os.path.join(
+                cv2.data.haarcascades, "haarcascade_frontalface_default.xml"
+            )
+        if not os.path.isfile(model_path):
+            raise FileNotFoundError(f"no Haar cascade file {model_path}")
+
+        self._detector = cv2.CascadeClassifier(model_path)
+        self.min_neighbors = min_neighbors
+
+    def detect(self, img_gray: np.array, upsample: int) -> tuple:
+        """!
+        Detects faces rectangles
+        @param img_gray 'np.array' gray scale image for detection
+        @param upsample 'int' the smallest face searched is halved for every
+            upsample, as the dlib detector does upsampling the image
+        @return _ 'tuple' (rects, scores) dlib.rectangle of faces found and
+            their cascade level weights
+        """
+
+        min_side = max(12, 48 >> upsample)
+        boxes, _, weights = self._detector.detectMultiScale3(
+            img_gray,
+            scaleFactor=1.1,
+            minNeighbors=self.min_neighbors,
+            minSize=(min_side, min_side),
+            outputRejectLevels=True,
+        )
+        rects = [
+            dlib.rectangle(int(x), int(y), int(x + w), int(y + h))
+            for x, y, w, h in boxes
+        ]
+        return rects, [float(weight) for weight in np.ravel(weights)]
+
+
+class DnnDetector:
+    def __init__(
+        self, model_path: str, config_path: str = "", confidence: float = 0.5
+    ) -> None:
+        """!
+        Constructor for the OpenCV DNN face detector backend, a single shot
+        detector as the res10_300x300_ssd_iter_140000 caffe model
+        @param model_path 'string' absolute path to the model weights
+        @param config_path 'string' absolute path to the model description
+            (deploy.prototxt for caffe models), empty if not needed
+        @param confidence 'float' minimum confidence of a face
+        """
+
+        if not model_path:
+            raise ValueError("the dnn face detector needs a model file")
+        if not os.path.isfile(model_path):
+            raise FileNotFoundError(f"no face detector model {model_path}")
+        self._net = cv2.dnn.readNet(model_path, config_path)
+        self.confidence = confidence
+
+    def detect(self, img_gray: np.array, upsample: int) -> tuple:
+        """!
+        Detects faces rectangles
+        @param img_gray 'np.array' gray scale image for detection
+        @param upsample 'int' the network input is 300 pixels, and 600 if
+            upsample is more than 0, to find smaller faces
+        @return _ 'tuple' (rects, scores) dlib.rectangle of faces found and
+            their confidences
+        """
+
+        height, width = img_gray.shape[:2]
+        side = 600 if upsample else 300
+        self._net.setInput(
+            cv2.dnn.blobFromImage(
+                cv2.cvtColor(img_gray, cv2.COLOR_GRAY2BGR),
+                1.0,
+                (side, side),
+                (104.0, 177.0, 123.0),
+            )
+        )
+        detections = self._net.forward().reshape(-1, 7)
+        detections = detections[detections[:, 2] >= self.confidence]
+
+        boxes = np.clip(detections[:, 3:7], 0.0, 1.0)
+        boxes *= (width, height, width, height)
+        rects = [dlib.rectangle(*(int(c) for c in box)) for box in boxes]
+        return rects, detections[:, 2].tolist()
+
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+# Face detector backends by name
+BACKENDS = {"hog": HogDetector, "haar": HaarDetector, "dnn": DnnDetector}
+
+
+def get_detector_backend(
+    name: str = "hog", model_path: str = "", config_path: str = ""
+):
+    """! Creates a face detector backend
+    @param name 'string' backend name: hog (dlib), haar (OpenCV Haar
+        cascades) or dnn (OpenCV DNN)
+    @param model_path 'string' absolute path to the backend model, the Haar
+        cascade or the DNN weights
+    @param config_path 'string' absolute path to the DNN model description
+    @return _ backend object with a detect(img_gray, upsample) method
+    """
+
+    if name not in BACKENDS:
+        raise ValueError(
+            f"invalid face detector {name}, options: {', '.join(BACKENDS)}"
+        )
+    if name == "hog":
+        return HogDetector()
+    elif name == "haar":
+        return HaarDetector(model_path=model_path)
+    return DnnDetector(model_path=model_path, config_path=config_path)
+
+
+# =============================================================================
@@ -7,31 +7,87 @@ Aka: @JohnBetaCode
 # =============================================================================
 # LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
 # =============================================================================
-import operator
 import os
+import shutil
+import subprocess
+import threading
+from collections import OrderedDict
 
 import cv2
 import numpy as np
-import math
 
 from tqdm import tqdm
 from face import Face, FaceDetector
-from capture import VideoWriter
-from file_utils import Image, get_files_names, get_sub_folders
-from utils import printlog, try_catch_log, print_text_list
+from cache import (
+    DataSetIndex,
+    HashCache,
+    LandmarksCache,
+    QualityCache,
+    normalize_shape,
+    denormalize_shape,
+)
+from capture import FFmpegVideoWriter, ThreadedVideoWriter, VideoWriter
+from dedupe import DuplicatesFilter
+from parallel import (
+    analyze_parallel,
+    export_frames_parallel,
+    export_frames_transformed,
+    export_segments_parallel,
+)
+from pipeline import ExportPipeline
+from quality import QualityGate
+from render import (
+    apply_face_transform,
+    get_aligned_face,
+    get_face_img_corrected,
+    get_face_transforms,
+    get_rendition_img,
+)
+from renditions import get_aligned_size, parse_renditions
+from segments import (
+    SegmentsIndex,
+    concat_segments,
+    get_segment_key,
+    split_chunks,
+    split_segments,
+)
+from file_utils import FileColumns, Image, get_sub_folders
+from frame_cache import Frame, FrameCache
+from utils import printlog, profiler, try_catch_log, print_text_list
 
 
 # =============================================================================
 # CLASSES - CLASSES - CLASSES - CLASSES - CLASSES - CLASSES  - CLASSES - CLASSE
 # =============================================================================
 class DataSet:
-    def __init__(self, path: str = "") -> None:
+    def __init__(
+        self,
+        path: str = "",
+        index_path: str = None,
+        load_size: tuple = (),
+        strict_index: bool = False,
+    ) -> None:
         """!
         Constructor for dataset class instances
         @param path 'string' absolute path to the dataset
+        @param index_path 'string' absolute path to the dataset index file,
+            if None the dataset files are listed and stat on every load
+        @param load_size 'tuple' (width, height) images are used at, they are
+            decoded at the smallest scale bigger than it. Empty to decode
+            images at their original size
+        @param strict_index 'bool' the index stats the files of unchanged
+            subfolders too, to notice files edited in place
         """
 
         self.path = path
+        self.load_size = load_size
+        self.frame_cache = None
+        self._loaded_idx = 0
+        self._index = (
+            DataSetIndex(path=index_path, strict=strict_index)
+            if index_path is not None
+            else None
+        )
 
         self.idx = 0
 
@@ -87,14 +143,30 @@ class DataSet:
         """
 
         if self.data_values is not None:
-            if idx >= 0 or idx < len(self.data_values):
+            if not 0 <= idx < len(self.data_values):
+                printlog(msg=f"idx {idx} out of the dataset", msg_type="WARN")
+            else:
 
                 # Asssing new index
-                self.idx = idx
+                direction = 1 if idx >= self._loaded_idx else -1
+                self.idx = self._loaded_idx = idx
+
+                # Get image from frames cache, and load its neighbors
+                if self.frame_cache is not None:
+                    frame = self.frame_cache.get(idx=self.idx)
+                    if frame is None:
+                        printlog(msg=f"no frame for idx {idx}", msg_type="ERROR")
+                        self.idx_img = None
+                        return
+                    self.idx_img = frame.image
+                    self.frame_cache.prefetch(idx=self.idx, direction=direction)
+                    if print_info:
+                        print(self.idx_img)
+                    return
 
                 # Create new image from dataset index
-                self.idx_img = Image(path=self.data_values[self.idx].path)
-                self.idx_img.load(print_info=print_info)
+                self.idx_img = self.data_values[self.idx]
+                self.idx_img.load(print_info=print_info, size=self.load_size)
 
         else:
             self.idx_img = None
@@ -112,34 +184,56 @@ class DataSet:
             printlog(msg=f"invalid path {path}", msg_type="WARN")
             return
 
-        # load dataset as subfolders and files
-        self.data_files = {
-            sub_folder: get_files_names(
-                folder=sub_folder, extensions=self.data_extensions
+        if self._index is not None:
+            self._load_from_index()
+        else:
+            # load dataset as subfolders and files, every file is stat once
+            sub_folders = get_sub_folders(folder=self.path)
+            self.data_values = FileColumns.from_folders(
+                folders=sub_folders, extensions=self.data_extensions
             )
-            for sub_folder in get_sub_folders(folder=self.path)
-        }
+            self.data_files = {sub_folder: [] for sub_folder in sub_folders}
+            for path in self.data_values.paths:
+                self.data_files[os.path.dirname(path)].append(os.path.basename(path))
 
-        # Load dataset as images & file properties
-        self.data_values = [
-            Image(
-                path=os.path.join(sub_folder, file_name),
-                load=False,
-            )
-            for sub_folder, files_in_sub in self.data_files.items()
-            for file_name in files_in_sub
-        ]
-
-        # order list by timestamp of time creation
-        self.data_values = sorted(
-            self.data_values, key=operator.attrgetter("modified_date_stamp")
-        )
+        # order list by timestamp of time modification
+        self.data_values = self.data_values.sorted_by_mtime()
 
         # go to the first index of the dataset
         if len(self.data_values):
             self.idx = len(self.data_values) - 1
             self.goto_idx(idx=self.idx)
 
+    def _load_from_index(self) -> None:
+        """!
+        loads the dataset subfolders and files from the dataset index,
+        only subfolders modified since the last load are listed again
+        """
+
+        files = self._index.scan(
+            folders=get_sub_folders(folder=self.path),
+            extensions=self.data_extensions,
+        )
+        printlog(
+            msg=f"dataset index loaded, {self._index.scanned_folders} "
+            + f"of {len(files)} subfolders scanned",
+            msg_type="INFO",
+        )
+
+        self.data_files = {
+            sub_folder: [os.path.basename(row[0]) for row in rows]
+            for sub_folder, rows in files.items()
+        }
+
+        rows = [row for rows in files.values() for row in rows]
+        self.data_values = FileColumns(
+            paths=[row[0] for row in rows],
+            sizes=[row[1] for row in rows],
+            mtimes=[row[2] for row in rows],
+            ctimes=[row[3] for row in rows],
+            headers=[(row[5], row[6], row[4]) for row in rows],
+        )
+
     def __str__(self):
         """!
         Get object instace string for printings
@@ -172,11 +266,15 @@ class DataSet:
 
 
 class Studio:
-    def __init__(self) -> None:
+    def __init__(self, headless: bool = False) -> None:
         """!
         Constructor for every day studio instance
+        @param headless 'bool' studio without windows, only for exportations,
+            there's no pre-visualization nor frames cache for navigation
         """
 
+        self._HEADLESS = headless
+
         # ---------------------------------------------------------------------
         self._DEBUG_LEVEL = int(os.getenv("DEBUG_LEVEL", default=1))
 
@@ -185,27 +283,86 @@ class Studio:
         self._PREVISUALIZE_FACE_CORRECTION = int(
             os.getenv("PREVISUALIZE_FACE_CORRECTION", default=1)
         )
-        self._face_detector = FaceDetector(
-            predictor_path=os.path.join(
-                os.getenv("CONFIGS_PATH"), os.getenv("PREDICTOR_NAME")
+        self._PREDICTOR_PATH = os.path.join(
+            os.getenv("CONFIGS_PATH"), os.getenv("PREDICTOR_NAME")
+        )
+        upsample_ladder = os.getenv("FACE_DETECTION_UPSAMPLE", default="1")
+        # face detector model files are in the configs folder too
+        backend_model, backend_config = (
+            os.path.join(os.getenv("CONFIGS_PATH"), name) if name else ""
+            for name in (
+                os.getenv("FACE_DETECTOR_MODEL", default=""),
+                os.getenv("FACE_DETECTOR_CONFIG", default=""),
             )
         )
+        self._FACE_DETECTOR_ARGS = {
+            "upsample_ladder": tuple(int(up) for up in upsample_ladder.split(",")),
+            "detection_scale": float(os.getenv("FACE_DETECTION_SCALE", default=1.0)),
+            "tracking": int(os.getenv("FACE_TRACKING", default=0)),
+            "tracking_padding": float(os.getenv("FACE_TRACKING_PADDING", default=0.5)),
+            "selection": os.getenv("FACE_SELECTION", default="largest"),
+            "backend": os.getenv("FACE_DETECTOR", default="hog"),
+            "backend_model": backend_model,
+            "backend_config": backend_config,
+        }
+        self._face_detector = FaceDetector(
+            predictor_path=self._PREDICTOR_PATH, **self._FACE_DETECTOR_ARGS
+        )
+        # the face detector is shared with the frames prefetching thread
+        self._detector_lock = threading.Lock()
         self.face = None
 
+        # ---------------------------------------------------------------------
+        # instancite landmarks cache object
+        self._CACHE_PATH = os.getenv("CACHE_PATH", default="/workspace/dev_ws/cache")
+        self._LANDMARKS_CACHE = int(os.getenv("LANDMARKS_CACHE", default=1))
+        self._landmarks_cache = (
+            LandmarksCache(path=os.path.join(self._CACHE_PATH, "landmarks.db"))
+            if self._LANDMARKS_CACHE
+            else None
+        )
+
+        # ---------------------------------------------------------------------
+        # instancite quality gate to skip blurry, dark or blown-out images
+        self._QUALITY_GATE = int(os.getenv("QUALITY_GATE", default=0))
+        self._quality_gate = (
+            QualityGate(
+                cache=QualityCache(path=os.path.join(self._CACHE_PATH, "quality.db")),
+                min_sharpness=float(os.getenv("QUALITY_MIN_SHARPNESS", default=15.0)),
+                min_luminance=float(os.getenv("QUALITY_MIN_LUMINANCE", default=30.0)),
+                max_luminance=float(os.getenv("QUALITY_MAX_LUMINANCE", default=225.0)),
+                max_clipping=float(os.getenv("QUALITY_MAX_CLIPPING", default=0.6)),
+            )
+            if self._QUALITY_GATE
+            else None
+        )
+
+        # ---------------------------------------------------------------------
+        # instancite duplicates filter to keep one image of every burst
+        self._DEDUPE = int(os.getenv("DEDUPE", default=0))
+        self._duplicates_filter = (
+            DuplicatesFilter(
+                cache=HashCache(path=os.path.join(self._CACHE_PATH, "hashes.db")),
+                distance=int(os.getenv("DEDUPE_DISTANCE", default=6)),
+                window=float(os.getenv("DEDUPE_WINDOW", default=600.0)),
+            )
+            if self._DEDUPE
+            else None
+        )
+
         # ---------------------------------------------------------------------
         # instancite of video capture/recorder
         self._EXPORT_PATH = os.getenv("VIDEO_PATH", default="/workspace/dev_ws/export")
         self._EXPORT_VIDEO_NAME = os.getenv("VIDEO_NAME", default="every_day")
-        self._video_capture = VideoWriter(
-            file_path=self._EXPORT_PATH,
-            file_name=self._EXPORT_VIDEO_NAME,
-            rate=int(os.getenv("VIDEO_RATE", default=30)),
+        self._VIDEO_RATE = int(os.getenv("VIDEO_RATE", default=30))
+        self._VIDEO_ENCODER = os.getenv("VIDEO_ENCODER", default="opencv")
+        self._VIDEO_CODEC = os.getenv("VIDEO_CODEC", default="h264")
+        self._VIDEO_CRF = int(os.getenv("VIDEO_CRF", default=23))
+        self._VIDEO_PRESET = os.getenv("VIDEO_PRESET", default="medium")
+        self._video_capture = self._new_video_capture(
+            file_path=self._EXPORT_PATH, file_name=self._EXPORT_VIDEO_NAME
         )
 
-        # ---------------------------------------------------------------------
-        # instancite dataset detector object
-        self.dataset = DataSet(path=os.getenv("DATASET_PATH"))
-
         # ---------------------------------------------------------------------
         # window properties
         self._WIN_NAME = os.getenv("WIN_NAME", default="every_day_studio")
@@ -218,10 +375,69 @@ class Studio:
         self._VIDEO_HEIGHT = int(os.getenv("VIDEO_HEIGHT", default=360))
         self._VIDEO_EXPORT_GRAY = int(os.getenv("VIDEO_EXPORT_GRAY", default=1))
         self._VIDEO_EXPORT_VISUALS = int(os.getenv("VIDEO_EXPORT_VISUALS", default=1))
-        self._VIDEO_EXPORT_PREVISUALIZATION = int(
-            os.getenv("VIDEO_EXPORT_PREVISUALIZATION", default=1)
+        self._VIDEO_EXPORT_PREVISUALIZATION = (
+            int(os.getenv("VIDEO_EXPORT_PREVISUALIZATION", default=1))
+            if not self._HEADLESS
+            else 0
         )
         self._VIDEO_EXPORT_DATE = int(os.getenv("VIDEO_EXPORT_DATE", default=1))
+        self._VIDEO_EXPORT_WORKERS = int(os.getenv("VIDEO_EXPORT_WORKERS", default=1))
+        if self._VIDEO_EXPORT_WORKERS <= 0:
+            self._VIDEO_EXPORT_WORKERS = os.cpu_count() or 1
+        self._VIDEO_EXPORT_PIPELINE = int(os.getenv("VIDEO_EXPORT_PIPELINE", default=0))
+        self._VIDEO_EXPORT_QUEUE_SIZE = int(
+            os.getenv("VIDEO_EXPORT_QUEUE_SIZE", default=8)
+        )
+        self._VIDEO_EXPORT_INCREMENTAL = int(
+            os.getenv("VIDEO_EXPORT_INCREMENTAL", default=0)
+        )
+        self._VIDEO_EXPORT_SEGMENTED = int(
+            os.getenv("VIDEO_EXPORT_SEGMENTED", default=0)
+        )
+        self._VIDEO_EXPORT_TWO_PASS = int(
+            os.getenv("VIDEO_EXPORT_TWO_PASS", default=0)
+        )
+        self._VIDEO_EYES_DISTANCE = float(os.getenv("VIDEO_EYES_DISTANCE", default=0))
+        self._video_renditions = parse_renditions(
+            value=os.getenv("VIDEO_RENDITIONS", default=""),
+            defaults={
+                "codec": self._VIDEO_CODEC,
+                "crf": self._VIDEO_CRF,
+                "gray": self._VIDEO_EXPORT_GRAY,
+                "visuals": self._VIDEO_EXPORT_VISUALS,
+                "date": self._VIDEO_EXPORT_DATE,
+            },
+        )
+
+        # ---------------------------------------------------------------------
+        # instancite dataset detector object
+        self._DATASET_INDEX = int(os.getenv("DATASET_INDEX", default=1))
+        self.dataset = DataSet(
+            path=os.getenv("DATASET_PATH"),
+            index_path=os.path.join(self._CACHE_PATH, "dataset.db")
+            if self._DATASET_INDEX
+            else None,
+            load_size=(self._VIDEO_WIDTH, self._VIDEO_HEIGHT),
+            strict_index=self._DATASET_INDEX > 1,
+        )
+
+        # ---------------------------------------------------------------------
+        # instancite frames cache for the studio navigation
+        self._STUDIO_CACHE_MB = int(os.getenv("STUDIO_CACHE_MB", default=256))
+        self._STUDIO_PREFETCH = int(os.getenv("STUDIO_PREFETCH", default=3))
+        self._frame_cache = None
+        if self._STUDIO_CACHE_MB > 0 and not self._HEADLESS:
+            self._frame_cache = FrameCache(
+                load=self._load_frame,
+                max_bytes=self._STUDIO_CACHE_MB * 2**20,
+                prefetch=self._STUDIO_PREFETCH,
+            )
+            self.dataset.frame_cache = self._frame_cache
+
+        # studio layers memoized per dataset index, and last index shown
+        self._STUDIO_LAYERS = int(os.getenv("STUDIO_LAYERS", default=16))
+        self._layers = OrderedDict()
+        self._render_key = None
 
         # Other constans and variables
         self._MEDIA_PATH = os.getenv("MEDIA_PATH")
@@ -299,6 +515,8 @@ class Studio:
         # If pressed C/c key then create/export video
         elif key in key2code["c"]:
             self.export_video()
+            # exportation pre-visualization uses the studio windows
+            self._render_key = None
         # If pressed no key defined then print message
         else:
             printlog(msg=f"{key} key action no defined", msg_type="WARN")
@@ -315,63 +533,126 @@ class Studio:
         print(self.shortcuts)
         while True:
 
-            try:
-                # Check that the current sample has data
-                if self.dataset.idx_img is not None and self.dataset.idx_img.isfile:
+            # Recompose the windows only when the index or settings change
+            render_key = (
+                self.dataset.idx,
+                self.dataset.idx_img.path if self.dataset.idx_img is not None else None,
+                self._studio_settings,
+            )
+            if render_key != self._render_key:
+                self._render_key = render_key
+                self._render_studio()
 
-                    # get current idx dataset image
-                    idx_img = self.dataset.idx_img.get_data(
-                        size=(self._VIDEO_WIDTH, self._VIDEO_HEIGHT)
-                    )
+            self.cb_key_event(key=cv2.waitKeyEx(self._WIN_TIME))
 
-                    # Inference with face detector and check for face in image
-                    self.face = self._face_detector.predict(img=idx_img)
-                    if self.face is None:
-                        printlog(
-                            msg="No face detected in image sample", msg_type="WARN"
-                        )
-                    else:
-                        idx_img = self._face_detector.visualize_landmarks(
-                            img=idx_img, face=self.face
-                        )
-                        if self._PREVISUALIZE_FACE_CORRECTION:
-                            cv2.imshow(
-                                f"{self._WIN_NAME}_FACE_CORRECTION",
-                                self.get_face_img_corrected(
-                                    img=self.dataset.idx_img.get_data(
-                                        size=(self._VIDEO_WIDTH, self._VIDEO_HEIGHT)
-                                    ),
-                                    face=self.face,
-                                    visuals=True,
-                                ),
-                            )
-                else:
-                    idx_img = np.zeros(
-                        (self._VIDEO_WIDTH, self._VIDEO_HEIGHT, 3), np.uint8
-                    )
-            except Exception as e:
-                printlog(msg=e, msg_type="ERROR")
-                idx_img = np.zeros((self._VIDEO_WIDTH, self._VIDEO_HEIGHT, 3), np.uint8)
+    @property
+    def _studio_settings(self) -> tuple:
+        """! Settings the studio layers depend on
+        @return _ 'tuple' window size, video size and pre-visualization flag
+        """
+        return (
+            self._WIN_WIDTH,
+            self._WIN_HEIGHT,
+            self._VIDEO_WIDTH,
+            self._VIDEO_HEIGHT,
+            self._PREVISUALIZE_FACE_CORRECTION,
+        )
 
-            cv2.imshow(
-                self._WIN_NAME,
-                self.draw_visuals(
-                    img=cv2.resize(
-                        idx_img,
-                        (self._WIN_WIDTH, self._WIN_HEIGHT),
-                        int(cv2.INTER_NEAREST),
-                    )
-                ),
-            )
-            self.cb_key_event(key=cv2.waitKeyEx(self._WIN_TIME))
+    def _render_studio(self) -> None:
+        """! Shows the current dataset index in the studio windows, from
+        its memoized layers
+        @return _ 'None'
+        """
+
+        try:
+            # Check that the current sample has data
+            if self.dataset.idx_img is not None and self.dataset.idx_img.isfile:
+                layers = self._get_layers(idx=self.dataset.idx)
+                self.face = layers["face"]
+                view = layers["view"]
+                if layers["correction"] is not None:
+                    cv2.imshow(f"{self._WIN_NAME}_FACE_CORRECTION", layers["correction"])
+            else:
+                view = np.zeros((self._WIN_HEIGHT, self._WIN_WIDTH, 3), np.uint8)
+        except Exception as e:
+            printlog(msg=e, msg_type="ERROR")
+            view = np.zeros((self._WIN_HEIGHT, self._WIN_WIDTH, 3), np.uint8)
+
+        # The layers are kept clean, info is drawn over a copy
+        cv2.imshow(self._WIN_NAME, self.draw_visuals(img=view.copy()))
+
+    def _get_layers(self, idx: int) -> dict:
+        """! Get the studio layers of a dataset index, detecting its face
+        and correcting it only the first time the index is shown
+        @param idx 'int' dataset index, self.dataset.idx_img has to be its image
+        @return _ 'dict' layers of the index: face, view (window sized image
+            with landmarks) and correction (face correction pre-visualization,
+            None if disabled or there's no face)
+        """
+
+        image = self.dataset.idx_img
+        layers_key = (image.path, self._studio_settings)
+        layers = self._layers.get(idx)
+        if layers is not None and layers["key"] == layers_key:
+            self._layers.move_to_end(idx)
+            return layers
+
+        if self._frame_cache is not None:
+            # get current idx image and face from the frames cache
+            frame = self._frame_cache.get(idx=idx)
+            idx_img = frame.img.copy()
+            face = frame.face
+        else:
+            # get current idx dataset image
+            idx_img = image.get_data(size=(self._VIDEO_WIDTH, self._VIDEO_HEIGHT))
+
+            # Inference with face detector
+            face = self.predict_face(image=image, img=idx_img, commit=True)
+
+        # check for face in image
+        correction = None
+        if face is None:
+            printlog(msg="No face detected in image sample", msg_type="WARN")
+        else:
+            idx_img = self._face_detector.visualize_landmarks(img=idx_img, face=face)
+            if self._PREVISUALIZE_FACE_CORRECTION:
+                correction = self.get_face_img_corrected(
+                    img=image.get_data(),
+                    face=face,
+                    visuals=True,
+                    size=(self._VIDEO_WIDTH, self._VIDEO_HEIGHT),
+                )
+
+        layers = {
+            "key": layers_key,
+            "face": face,
+            "view": cv2.resize(
+                idx_img, (self._WIN_WIDTH, self._WIN_HEIGHT), int(cv2.INTER_NEAREST)
+            ),
+            "correction": correction,
+        }
+        self._layers[idx] = layers
+        while len(self._layers) > self._STUDIO_LAYERS:
+            self._layers.popitem(last=False)
+
+        return layers
 
     @try_catch_log
     def export_video(self, record_audio: bool = True) -> None:
         """! export everyday video to folder and file specified in
-        video recorder constructor (self._video_capture)
+        video recorder constructor (self._video_capture), errors are logged
         @param record_audio 'bool' enable/disable audio export in video
         @return _ 'None'
         """
+        self.export(record_audio=record_audio)
+
+    def export(self, record_audio: bool = True) -> int:
+        """! export everyday video to folder and file specified in
+        video recorder constructor (self._video_capture)
+        @param record_audio 'bool' enable/disable audio export in video
+        @return frames 'int' number of frames exported, 0 if there were no
+            frames to export, None if the exportation was canceled
+        """
 
         if self._VIDEO_EXPORT_PREVISUALIZATION:
             printlog(
@@ -384,117 +665,776 @@ class Studio:
 
         # If there's no dataset
         if self.dataset.data_values is None:
-            return
+            return 0
 
         printlog(msg="stating video recorder\n", msg_type="INFO")
 
-        # rocord every frame or video
-        iterator = (
-            tqdm(range(len(self.dataset.data_values)))
-            if self._DEBUG_LEVEL >= 3
-            else range(len(self.dataset.data_values))
+        # the first image has no previous face to track
+        self._face_detector.reset_tracking()
+        profiler.reset()
+
+        # audio track to add to the video
+        audio_src_path = self._get_audio_path() if record_audio else None
+
+        # images that pass the quality gate and without duplicates, before
+        # looking for their faces
+        images = self.dataset.data_values
+        if self._quality_gate is not None:
+            printlog(msg=self._quality_gate, msg_type="INFO")
+            images = self._quality_gate.filter(images=images)
+        if self._duplicates_filter is not None:
+            printlog(msg=self._duplicates_filter, msg_type="INFO")
+            images = self._duplicates_filter.filter(images=images)
+
+        # rocord every frame or video, a video per rendition, or video
+        # segments concatenated after
+        video = os.path.join(self._EXPORT_PATH, f"{self._EXPORT_VIDEO_NAME}.mp4")
+        merge_audio = False
+        if self._video_renditions:
+            exported = self._export_renditions(images=images, audio_path=audio_src_path)
+            video = [
+                os.path.join(
+                    self._EXPORT_PATH, f"{self._EXPORT_VIDEO_NAME}_{rendition.name}.mp4"
+                )
+                for rendition in self._video_renditions
+            ]
+        elif self._VIDEO_EXPORT_INCREMENTAL or (
+            self._VIDEO_EXPORT_SEGMENTED and self._VIDEO_EXPORT_WORKERS > 1
+        ):
+            exported = self._export_segments(images=images, audio_path=audio_src_path)
+        else:
+            if self._VIDEO_ENCODER == "ffmpeg":
+                self._video_capture.audio_path = audio_src_path
+            else:
+                merge_audio = audio_src_path is not None
+            exported = self._write_frames(
+                frames=self._get_transformed_frames(images=images)
+                if self._VIDEO_EXPORT_TWO_PASS
+                else self._get_frames(images=images),
+                video_capture=self._video_capture,
+            )
+            video = self._video_capture.file_dir
+
+        # canceled or without frames, there's no video to report or add the
+        # audio to
+        if not exported:
+            if self._landmarks_cache is not None:
+                self._landmarks_cache.commit()
+            self.dataset.goto_idx(idx=current_idx)
+            return exported
+
+        # save landmarks found during the exportation
+        if self._landmarks_cache is not None:
+            self._landmarks_cache.commit()
+            printlog(msg=self._landmarks_cache, msg_type="INFO")
+
+        # save the exportation stages timing
+        printlog(msg=self.get_report, msg_type="INFO")
+        profiler.dump(
+            path=os.path.join(self._EXPORT_PATH, f"{self._EXPORT_VIDEO_NAME}.json"),
+            extra={
+                "video": video,
+                "size": [self._VIDEO_WIDTH, self._VIDEO_HEIGHT],
+                "workers": self._VIDEO_EXPORT_WORKERS,
+                "pipeline": self._VIDEO_EXPORT_PIPELINE,
+            },
         )
-        for idx_data in iterator:
 
-            try:
-                # go to index
-                self.dataset.goto_idx(idx=idx_data)
+        # concatenate audio, the ffmpeg encoder already added it
+        if merge_audio:
+            printlog(msg="\nadding audio to video", msg_type="INFO")
+            dst_path = os.path.join(self._EXPORT_PATH, f"{self._EXPORT_VIDEO_NAME}.mp4")
+            command = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y"]
+            command += ["-i", self._video_capture.file_dir, "-i", audio_src_path]
+            command += ["-af", "apad", "-map", "0:v", "-map", "1:a", "-c:v", "copy"]
+            command += ["-shortest", dst_path]
+            result = subprocess.run(
+                command, stdin=subprocess.DEVNULL, stderr=subprocess.PIPE
+            )
+            # the video without audio is kept if the audio can't be added
+            if result.returncode:
+                if os.path.isfile(dst_path):
+                    os.remove(dst_path)
+                raise RuntimeError(
+                    f"ffmpeg failed with code {result.returncode} adding audio "
+                    + f"to {self._video_capture.file_dir}: "
+                    + result.stderr.decode(errors="replace").strip()
+                )
+            os.remove(self._video_capture.file_dir)
 
-                # Check that the current sample has data
-                if self.dataset.idx_img is not None and self.dataset.idx_img.isfile:
-                    printlog(msg=self.dataset.idx_img.name, msg_type="DEBUG")
+        printlog(msg="video recorder finished", msg_type="OKGREEN")
 
-                    # get current idx dataset image
-                    idx_img = self.dataset.idx_img.get_data(
-                        size=(self._VIDEO_WIDTH, self._VIDEO_HEIGHT)
-                    )
+        # return to the previous index
+        self.dataset.goto_idx(idx=current_idx)
 
-                    # Inference with face detector and check for face in image
-                    self.face = self._face_detector.predict(img=idx_img)
-                    if self.face is None:
-                        continue
-                    else:
-                        idx_img = self._face_detector.visualize_landmarks(
-                            img=idx_img, face=self.face
-                        )
-                        idx_img = self.get_face_img_corrected(
-                            img=self.dataset.idx_img.get_data(
-                                size=(self._VIDEO_WIDTH, self._VIDEO_HEIGHT)
-                            ),
-                            face=self.face,
-                            visuals=self._VIDEO_EXPORT_VISUALS,
-                            exp_gray=self._VIDEO_EXPORT_GRAY,
-                        )
-                else:
+        return exported
+
+    def _get_frames(self, images: list, size: tuple = None, aligned: bool = False):
+        """! Get the exportation frames of dataset images, with the
+        workers, pipeline or in this process as configured
+        @param images 'list' dataset Image objects in timestamp order
+        @param size 'tuple' (width, height) of the frames, None for the
+            video size
+        @param aligned 'bool' get the aligned images in color and without
+            visuals with their aligned landmarks, to render renditions
+        @return _ 'generator' of (Image, frame) tuples in timestamp order,
+            frames are (image, landmarks) tuples if aligned
+        """
+
+        size = (self._VIDEO_WIDTH, self._VIDEO_HEIGHT) if size is None else size
+        process = self._render_aligned if aligned else self._render_frame
+        if self._VIDEO_EXPORT_WORKERS > 1:
+            return export_frames_parallel(
+                images=images,
+                predictor_path=self._PREDICTOR_PATH,
+                settings={
+                    "size": size,
+                    "exp_gray": self._VIDEO_EXPORT_GRAY and not aligned,
+                    "exp_visuals": self._VIDEO_EXPORT_VISUALS and not aligned,
+                    "aligned": aligned,
+                    "detector_args": self._FACE_DETECTOR_ARGS,
+                },
+                workers=self._VIDEO_EXPORT_WORKERS,
+                landmarks_cache=self._landmarks_cache,
+                face_detector=self._face_detector,
+                progress=self._DEBUG_LEVEL >= 3,
+            )
+        elif self._VIDEO_EXPORT_PIPELINE:
+            return iter(
+                ExportPipeline(
+                    images=images,
+                    size=size,
+                    process=process,
+                    queue_size=self._VIDEO_EXPORT_QUEUE_SIZE,
+                    progress=self._DEBUG_LEVEL >= 3,
+                )
+            )
+        else:
+            return self._export_frames(images=images, size=size, process=process)
+
+    def _analyze(self, images: list) -> np.array:
+        """! First pass of the two pass exportation, gets the landmarks of
+        every dataset image, from the landmarks cache or the face detector,
+        without rendering them
+        @param images 'list' dataset Image objects in timestamp order
+        @return shapes '(N, 68, 2) np.memmap' normalized landmarks of every
+            image, NaN for images without face, memory-mapped to the
+            <VIDEO_NAME>_landmarks.npy file in the cache folder
+        """
+
+        size = (self._VIDEO_WIDTH, self._VIDEO_HEIGHT)
+        if not os.path.isdir(self._CACHE_PATH):
+            os.makedirs(self._CACHE_PATH)
+        shapes = np.lib.format.open_memmap(
+            os.path.join(self._CACHE_PATH, f"{self._EXPORT_VIDEO_NAME}_landmarks.npy"),
+            mode="w+",
+            dtype=np.float32,
+            shape=(len(images), 68, 2),
+        )
+        shapes[:] = np.nan
+
+        if self._VIDEO_EXPORT_WORKERS > 1:
+            index = {image.path: idx for idx, image in enumerate(images)}
+            for image, shape in analyze_parallel(
+                images=images,
+                predictor_path=self._PREDICTOR_PATH,
+                settings={"size": size, "detector_args": self._FACE_DETECTOR_ARGS},
+                workers=self._VIDEO_EXPORT_WORKERS,
+                landmarks_cache=self._landmarks_cache,
+                face_detector=self._face_detector,
+                progress=self._DEBUG_LEVEL >= 3,
+            ):
+                shapes[index[image.path]] = shape
+        else:
+            iterator = tqdm(images) if self._DEBUG_LEVEL >= 3 else images
+            for idx, image in enumerate(iterator):
+                if not image.isfile:
                     printlog(
-                        msg=f"skyping image {self.dataset.idx_img.name}, file no found",
+                        msg=f"skyping image {image.name}, file no found",
                         msg_type="WARN",
                     )
+                    profiler.skip(reason="missing file")
                     continue
-            except Exception as e:
-                printlog(
-                    msg=f"skyping image {self.dataset.idx_img.name}, error:{e}",
-                    msg_type="ERROR",
+                try:
+                    image.load(print_info=False, size=size)
+                    img = image.get_data(size=size)
+                    face = self.predict_face(image=image, img=img)
+                except Exception as e:
+                    printlog(
+                        msg=f"skyping image {image.name}, error:{e}",
+                        msg_type="ERROR",
+                    )
+                    profiler.skip(reason="exception")
+                    continue
+                if face is None:
+                    profiler.skip(reason="no face")
+                    continue
+                shapes[idx] = normalize_shape(face.shape, size)
+
+        shapes.flush()
+        return shapes
+
+    def _get_transformed_frames(self, images: list):
+        """! Get the exportation frames of the two pass exportation: the
+        landmarks of all images are got first, then the transformations of
+        all of them are solved at once, with the eyes of every face at the
+        same distance, and images are only rendered with them. Render
+        workers don't need the face detector
+        @param images 'list' dataset Image objects in timestamp order
+        @return _ 'generator' of (Image, frame) tuples in timestamp order
+        """
+
+        size = (self._VIDEO_WIDTH, self._VIDEO_HEIGHT)
+        shapes = self._analyze(images=images)
+
+        # the landmarks stay in the memory-mapped file, only the landmarks
+        # the transformations are solved with are read for all images
+        with profiler.measure("transforms"):
+            M, eyes_distance = get_face_transforms(
+                shapes=shapes,
+                size=size,
+                eyes_distance=self._VIDEO_EYES_DISTANCE or None,
+                normalized=True,
+            )
+            faces = np.flatnonzero(np.isfinite(M).all(axis=(1, 2)))
+
+        printlog(
+            msg=f"{len(faces)} faces of {len(images)} images, "
+            + f"aligned with {eyes_distance:.1f} pixels between the eyes",
+            msg_type="INFO",
+        )
+
+        # the aligned landmarks are scaled and transformed image by image
+        tasks = []
+        for idx in faces:
+            aligned = None
+            if self._VIDEO_EXPORT_VISUALS:
+                shape = np.float64([shapes[idx] * np.float32(size)])
+                aligned = np.rint(cv2.transform(shape, M[idx, :2])[0]).astype(np.int32)
+            tasks.append((images[idx], M[idx], aligned))
+        if self._VIDEO_EXPORT_WORKERS > 1:
+            return export_frames_transformed(
+                tasks=tasks,
+                settings={"size": size, "exp_gray": self._VIDEO_EXPORT_GRAY},
+                workers=self._VIDEO_EXPORT_WORKERS,
+                progress=self._DEBUG_LEVEL >= 3,
+            )
+
+        transforms = {image.path: (M_face, shape) for image, M_face, shape in tasks}
+
+        def process(image: Image, img: np.array) -> np.array:
+            M_face, shape = transforms[image.path]
+            return apply_face_transform(
+                img=img if image.image is None else image.image,
+                M_face=M_face,
+                size=size,
+                exp_gray=self._VIDEO_EXPORT_GRAY,
+                face=None if shape is None else Face(shape=shape),
+                face_detector=self._face_detector,
+            )
+
+        images = [image for image, _, _ in tasks]
+        if self._VIDEO_EXPORT_PIPELINE:
+            return iter(
+                ExportPipeline(
+                    images=images,
+                    size=size,
+                    process=process,
+                    queue_size=self._VIDEO_EXPORT_QUEUE_SIZE,
+                    progress=self._DEBUG_LEVEL >= 3,
+                    resize=False,
                 )
-                continue
+            )
+        return self._export_frames(
+            images=images, size=size, process=process, resize=False
+        )
 
-            if self._VIDEO_EXPORT_DATE:
-                idx_img = print_text_list(
-                    img=idx_img,
-                    tex_list=[str(self.dataset.idx_img.modified_date)],
-                    color=(255, 255, 255),
-                    orig=(10, 25),
-                    fontScale=0.5,
-                    y_jump=23,
+    def _write_frames(self, frames, video_capture, renditions: list = None) -> int:
+        """! Writes exportation frames to a video, or to the video of every
+        rendition, videos are closed at the end
+        @param frames 'generator' of (Image, frame) tuples
+        @param video_capture 'VideoWriter' video writer to write frames with,
+            a list with the video writer of every rendition for renditions
+        @param renditions 'list' Rendition objects, if given frames are
+            (image, landmarks) aligned tuples rendered for every rendition
+        @return exported 'int' number of frames written, None if the
+            exportation was canceled
+        """
+
+        video_captures = video_capture if renditions else [video_capture]
+        video_writers = [
+            ThreadedVideoWriter(
+                video_writer=video_capture,
+                queue_size=self._VIDEO_EXPORT_QUEUE_SIZE,
+            )
+            if self._VIDEO_EXPORT_PIPELINE
+            else video_capture
+            for video_capture in video_captures
+        ]
+
+        def finish(raise_error: bool = True) -> None:
+            # wait for the last frames to be encoded, and finish the videos,
+            # every video is finished even if another one failed
+            errors = []
+            for video_writer, video_capture in zip(video_writers, video_captures):
+                for close in (
+                    video_writer.join if self._VIDEO_EXPORT_PIPELINE else None,
+                    video_capture.close,
+                ):
+                    try:
+                        if close is not None:
+                            close()
+                    except Exception as e:
+                        errors.append(e)
+            if errors and raise_error:
+                raise errors[0]
+
+        exported = 0
+        canceled = False
+        try:
+            for image, frame in frames:
+                canceled = self._write_frame(
+                    image=image,
+                    frame=frame,
+                    video_writers=video_writers,
+                    renditions=renditions,
                 )
+                if canceled:
+                    break
+                exported += 1
+        except BaseException:
+            # encoders are not left running and the frames sources are
+            # stopped, the error is the one of the exportation
+            frames.close()
+            finish(raise_error=False)
+            raise
+
+        if canceled:
+            printlog(msg="video creation process canceled", msg_type="WARN")
+            frames.close()
+        finish()
+
+        return None if canceled else exported
+
+    def _write_frame(
+        self, image: Image, frame, video_writers: list, renditions: list = None
+    ) -> bool:
+        """! Writes an exportation frame to the videos
+        @param image 'Image' dataset image of the frame
+        @param frame 'np.array' frame, (image, landmarks) aligned tuple for
+            renditions
+        @param video_writers 'list' video writer of the video, or of every
+            rendition
+        @param renditions 'list' Rendition objects, None to write the frame
+        @return _ 'bool' whether the exportation was canceled
+        """
 
-            # Write image to video capture
-            self._video_capture.write(img=idx_img)
-
-            if self._VIDEO_EXPORT_PREVISUALIZATION:
-                cv2.imshow(
-                    f"{self._WIN_NAME}_FACE_CORRECTION",
-                    print_text_list(
-                        img=cv2.resize(
-                            idx_img,
-                            (self._WIN_WIDTH, self._WIN_HEIGHT),
-                            int(cv2.INTER_NEAREST),
-                        ),
-                        tex_list=["Exporting ...", "C: to cancel"],
-                        color=(0, 0, 255),
+        # the detection and alignment are done once for all renditions
+        if renditions:
+            face = Face(shape=frame[1])
+            imgs = [
+                get_rendition_img(
+                    img=frame[0],
+                    face=face,
+                    face_detector=self._face_detector,
+                    size=rendition.size,
+                    exp_gray=rendition.gray,
+                    visuals=rendition.visuals,
+                )
+                for rendition in renditions
+            ]
+            dates = [rendition.date for rendition in renditions]
+        else:
+            imgs, dates = [frame], [self._VIDEO_EXPORT_DATE]
+
+        for idx, video_writer in enumerate(video_writers):
+            if dates[idx]:
+                with profiler.measure("overlay"):
+                    imgs[idx] = print_text_list(
+                        img=imgs[idx],
+                        tex_list=[str(image.modified_date)],
+                        color=(255, 255, 255),
                         orig=(10, 25),
-                        fontScale=0.7,
+                        fontScale=0.5,
                         y_jump=23,
+                    )
+
+            # Write image to video capture
+            video_writer.write(img=imgs[idx])
+
+        if self._VIDEO_EXPORT_PREVISUALIZATION:
+            cv2.imshow(
+                f"{self._WIN_NAME}_FACE_CORRECTION",
+                print_text_list(
+                    img=cv2.resize(
+                        imgs[0],
+                        (self._WIN_WIDTH, self._WIN_HEIGHT),
+                        int(cv2.INTER_NEAREST),
+                    ),
+                    tex_list=["Exporting ...", "C: to cancel"],
+                    color=(0, 0, 255),
+                    orig=(10, 25),
+                    fontScale=0.7,
+                    y_jump=23,
+                ),
+            )
+            if cv2.waitKey(10) in [69, 99]:
+                return True
+
+        return False
+
+    def _export_renditions(self, images: list, audio_path: str = None) -> int:
+        """! Exports a video per rendition in a single pass, every image is
+        loaded, detected and aligned once at the widest renditions width,
+        tall enough for all renditions, and then cropped and resized for
+        every rendition
+        @param images 'list' dataset Image objects in timestamp order
+        @param audio_path 'string' absolute path to the audio track, None
+            for videos without audio
+        @return exported 'int' number of frames of the videos, None if the
+            exportation was canceled
+        """
+
+        size = get_aligned_size(renditions=self._video_renditions)
+        printlog(
+            msg=f"exporting {len(self._video_renditions)} renditions, "
+            + f"aligned at {size[0]}X{size[1]}:\n\t"
+            + "\n\t".join(str(rendition) for rendition in self._video_renditions),
+            msg_type="INFO",
+        )
+
+        video_captures = []
+        for rendition in self._video_renditions:
+            video_capture = rendition.get_video_writer(
+                file_path=self._EXPORT_PATH,
+                file_name=self._EXPORT_VIDEO_NAME,
+                rate=self._VIDEO_RATE,
+                preset=self._VIDEO_PRESET,
+            )
+            video_capture.audio_path = audio_path
+            video_captures.append(video_capture)
+
+        return self._write_frames(
+            frames=self._get_frames(images=images, size=size, aligned=True),
+            video_capture=video_captures,
+            renditions=self._video_renditions,
+        )
+
+    def _export_segments(self, images: list, audio_path: str = None) -> int:
+        """! Exports the video by segments, then all of them are concatenated
+        without encoding again. In incremental exportations there's a
+        segment per run of images of the same dataset subfolder, segments
+        of previous exportations are kept and only segments whose images or
+        settings changed are rendered. Otherwise the images are split in a
+        chunk per worker. With workers every segment is rendered and encoded
+        in its own process
+        @param images 'list' dataset Image objects in timestamp order
+        @param audio_path 'string' absolute path to the audio track, None
+            for a video without audio
+        @return exported 'int' number of frames of the video, None if the
+            exportation was canceled
+        """
+
+        segments = SegmentsIndex(
+            path=os.path.join(self._EXPORT_PATH, f"{self._EXPORT_VIDEO_NAME}_segments")
+        )
+        settings = self._get_video_settings()
+        keys = [
+            (get_segment_key(images=segment_images, settings=settings), segment_images)
+            for segment_images in (
+                split_segments(images=images)
+                if self._VIDEO_EXPORT_INCREMENTAL
+                else split_chunks(images=images, chunks=self._VIDEO_EXPORT_WORKERS)
+            )
+        ]
+        missing = [(key, imgs) for key, imgs in keys if segments.get(key=key) is None]
+
+        if self._VIDEO_EXPORT_WORKERS > 1 and missing:
+            for (key, _), frames in zip(
+                missing,
+                export_segments_parallel(
+                    segments=[(segments.path, key, imgs) for key, imgs in missing],
+                    predictor_path=self._PREDICTOR_PATH,
+                    settings={
+                        "size": (self._VIDEO_WIDTH, self._VIDEO_HEIGHT),
+                        "exp_gray": self._VIDEO_EXPORT_GRAY,
+                        "exp_visuals": self._VIDEO_EXPORT_VISUALS,
+                        "exp_date": self._VIDEO_EXPORT_DATE,
+                        "detector_args": self._FACE_DETECTOR_ARGS,
+                        "video": self._get_encoder_settings(),
+                    },
+                    workers=self._VIDEO_EXPORT_WORKERS,
+                    landmarks_cache=self._landmarks_cache,
+                    face_detector=self._face_detector,
+                    progress=self._DEBUG_LEVEL >= 3,
+                ),
+            ):
+                segments.put(key=key, frames=frames)
+        else:
+            for key, segment_images in missing:
+                # Every segment starts with no previous face to track
+                self._face_detector.reset_tracking()
+                frames = self._write_frames(
+                    frames=self._get_frames(images=segment_images),
+                    video_capture=self._new_video_capture(
+                        file_path=segments.path, file_name=key, encoder="ffmpeg"
                     ),
                 )
-                if cv2.waitKey(10) in [69, 99]:
-                    printlog(msg="video creation process canceled", msg_type="WARN")
-                    self.dataset.goto_idx(idx=current_idx)
-                    return
+                if frames is None:
+                    segments.remove(key=key)
+                    return None
+                segments.put(key=key, frames=frames)
+
+        files, exported = [], 0
+        for key, _ in keys:
+            frames = segments.get(key=key)
+            if frames:
+                files.append(segments.get_file(key=key))
+                exported += frames
+
+        printlog(
+            msg=f"{segments.rendered} of {len(segments)} video segments rendered",
+            msg_type="INFO",
+        )
+        segments.save()
+
+        if exported:
+            concat_segments(
+                files=files,
+                file_dir=os.path.join(
+                    self._EXPORT_PATH, f"{self._EXPORT_VIDEO_NAME}.mp4"
+                ),
+                audio_path=audio_path,
+            )
+
+        # segments are only kept for the next incremental exportation
+        if not self._VIDEO_EXPORT_INCREMENTAL:
+            shutil.rmtree(segments.path)
+
+        return exported
+
+    def _get_video_settings(self) -> dict:
+        """! Get the settings the exported frames depend on
+        @return _ 'dict' video size, rate, encoder and rendering settings
+        """
+        return {
+            "size": [self._VIDEO_WIDTH, self._VIDEO_HEIGHT],
+            "rate": self._VIDEO_RATE,
+            "codec": self._VIDEO_CODEC,
+            "crf": self._VIDEO_CRF,
+            "preset": self._VIDEO_PRESET,
+            "gray": self._VIDEO_EXPORT_GRAY,
+            "visuals": self._VIDEO_EXPORT_VISUALS,
+            "date": self._VIDEO_EXPORT_DATE,
+            "detector_args": self._FACE_DETECTOR_ARGS,
+            "predictor": self._PREDICTOR_PATH,
+        }
+
+    def _get_encoder_settings(self) -> dict:
+        """! Get the ffmpeg encoder settings
+        @return _ 'dict' FFmpegVideoWriter rate, codec, crf and preset
+        """
+        return {
+            "rate": self._VIDEO_RATE,
+            "codec": {"h264": "libx264", "h265": "libx265"}.get(
+                self._VIDEO_CODEC, self._VIDEO_CODEC
+            ),
+            "crf": self._VIDEO_CRF,
+            "preset": self._VIDEO_PRESET,
+        }
+
+    def _new_video_capture(
+        self, file_path: str, file_name: str, encoder: str = None
+    ) -> VideoWriter:
+        """! Creates a video writer with the video settings
+        @param file_path 'string' path to write the video
+        @param file_name 'string' video name, without extension
+        @param encoder 'string' opencv or ffmpeg, None for VIDEO_ENCODER
+        @return _ 'VideoWriter' or 'FFmpegVideoWriter' video writer
+        """
+
+        encoder = self._VIDEO_ENCODER if encoder is None else encoder
+        if encoder == "ffmpeg":
+            return FFmpegVideoWriter(
+                file_path=file_path, file_name=file_name, **self._get_encoder_settings()
+            )
+        return VideoWriter(
+            file_path=file_path, file_name=file_name, rate=self._VIDEO_RATE
+        )
+
+    def _get_audio_path(self) -> str:
+        """! Get the audio track for the video
+        @return _ 'string' absolute path to the AUDIO_TRACK file in the
+            media sound folder, None if there's no audio track
+        """
 
-        # concatenate audio
         audio_src = os.getenv("AUDIO_TRACK", default=None)
-        if record_audio and audio_src is not None:
-            audio_src_path = os.path.join(self._MEDIA_PATH, "sound", audio_src)
-            if os.path.isfile(audio_src_path):
-                printlog(msg="\nadding audio to video", msg_type="INFO")
-                merge_audio_command = "ffmpeg -hide_banner -loglevel panic -y -i {src_path} -i {audio_src} -af apad -map 0:v -map 1:a -c:v copy -shortest {dst_path}".format(
-                    src_path=self._video_capture.file_dir,
-                    audio_src=audio_src_path,
-                    dst_path=f"{self._EXPORT_PATH}/{self._EXPORT_VIDEO_NAME}.mp4",
-                )
-                os.system(merge_audio_command)
-                os.remove(self._video_capture.file_dir)
-            else:
+        if audio_src is None:
+            return None
+
+        audio_src_path = os.path.join(self._MEDIA_PATH, "sound", audio_src)
+        if not os.path.isfile(audio_src_path):
+            printlog(
+                msg=f"no audio source {audio_src} in {self._MEDIA_PATH}",
+                msg_type="ERROR",
+            )
+            return None
+
+        return audio_src_path
+
+    def _export_frames(
+        self, images: list, size: tuple, process, resize: bool = True
+    ):
+        """! Generator that loads, detects and aligns dataset images one by
+        one in this process
+        @param images 'list' dataset Image objects in timestamp order
+        @param size 'tuple' (width, height) images are loaded at
+        @param process 'function' callable(image, img) returning the frame,
+            or None if there's no face
+        @param resize 'bool' give process the image resized to size, False
+            if process only samples the loaded image
+        @return _ 'generator' of (Image, frame) tuples in timestamp order
+        """
+
+        # Images are taken from the dataset directly, so the exportation
+        # does not go through the studio frames cache
+        for image in tqdm(images) if self._DEBUG_LEVEL >= 3 else images:
+            try:
+                # Check that the current sample has data
+                if image.isfile:
+                    image.load(print_info=False, size=size)
+                    printlog(msg=image.name, msg_type="DEBUG")
+
+                    # get current idx dataset image
+                    idx_img = image.get_data(size=size if resize else ())
+
+                    # Inference with face detector, center and align image
+                    idx_img = process(image, idx_img)
+                    if idx_img is None:
+                        profiler.skip(reason="no face")
+                        continue
+                else:
+                    printlog(
+                        msg=f"skyping image {image.name}, file no found",
+                        msg_type="WARN",
+                    )
+                    profiler.skip(reason="missing file")
+                    continue
+            except Exception as e:
                 printlog(
-                    msg=f"no audio source {audio_src} in {self._MEDIA_PATH}",
+                    msg=f"skyping image {image.name}, error:{e}",
                     msg_type="ERROR",
                 )
+                profiler.skip(reason="exception")
+                continue
 
-        printlog(msg="video recorder finished", msg_type="OKGREEN")
+            yield image, idx_img
 
-        # return to the previous index
-        self.dataset.goto_idx(idx=current_idx)
+    def _load_frame(self, idx: int) -> Frame:
+        """! Loads a dataset image at the video size and detects its face,
+        used by the frames cache of the studio
+        @param idx 'int' dataset index
+        @return _ 'Frame' frame of the dataset index, None if the index
+            is out of the dataset
+        """
+
+        if not 0 <= idx < self.dataset.len:
+            return None
+
+        image = self.dataset.data_values[idx]
+        image.load(print_info=False, size=(self._VIDEO_WIDTH, self._VIDEO_HEIGHT))
+        if image.image is None:
+            return Frame(image=image, img=None, face=None)
+
+        img = image.get_data(size=(self._VIDEO_WIDTH, self._VIDEO_HEIGHT))
+        face = self.predict_face(image=image, img=img, commit=True)
+        return Frame(image=image, img=img, face=face)
+
+    def _render_frame(self, image: Image, img: np.array) -> np.array:
+        """! Detects the face in a dataset image and centers and aligns
+        the image respect to it with the exportation settings
+        @param image 'Image' dataset image file where img data comes from,
+            if its data is loaded the frame is sampled from the original image
+        @param img 'np.array' image data resized to the video size
+        @return _ 'np.array' frame to export, None if there's no face
+        """
+
+        self.face = self.predict_face(image=image, img=img)
+        if self.face is None:
+            return None
+
+        return self.get_face_img_corrected(
+            img=img if image.image is None else image.image,
+            face=self.face,
+            visuals=self._VIDEO_EXPORT_VISUALS,
+            exp_gray=self._VIDEO_EXPORT_GRAY,
+            size=(self._VIDEO_WIDTH, self._VIDEO_HEIGHT),
+        )
+
+    def _render_aligned(self, image: Image, img: np.array) -> tuple:
+        """! Detects the face in a dataset image and centers and aligns
+        the image respect to it, in color and without visuals, to render
+        the renditions from it
+        @param image 'Image' dataset image file where img data comes from,
+            if its data is loaded the frame is sampled from the original image
+        @param img 'np.array' image data resized to the aligned image size
+        @return _ 'tuple' (image, landmarks) aligned image and its (68, 2)
+            landmarks, None if there's no face
+        """
+
+        face = self.predict_face(image=image, img=img)
+        if face is None:
+            return None
+
+        size = (img.shape[1], img.shape[0])
+        return (
+            self.get_face_img_corrected(
+                img=img if image.image is None else image.image, face=face, size=size
+            ),
+            get_aligned_face(face=face, size=size).shape,
+        )
+
+    def predict_face(self, image: Image, img: np.array, commit: bool = False) -> Face:
+        """! Get the face in a dataset image, first from the landmarks cache,
+        and if it's not there, from the face detector inference
+        @param image 'Image' dataset image file where img data comes from
+        @param img 'np.array' image data for prediction
+        @param commit 'bool' write new cache entries to disk right away
+        @return _ 'Face' face found in image, None if there's no face
+        """
+
+        if self._landmarks_cache is None:
+            with self._detector_lock:
+                return self._face_detector.predict(img=img)
+
+        size = (img.shape[1], img.shape[0])
+        file_size = image.size
+        file_mtime = image.modified_date_stamp
+
+        found, shape = self._landmarks_cache.get(
+            path=image.path, size=file_size, mtime=file_mtime
+        )
+        if found:
+            if shape is None:
+                return None
+            face = Face(shape=denormalize_shape(shape, size))
+            if self._face_detector.follows_previous:
+                with self._detector_lock:
+                    self._face_detector.track(face=face, size=size)
+            return face
+
+        with self._detector_lock:
+            face = self._face_detector.predict(img=img)
+        self._landmarks_cache.put(
+            path=image.path,
+            size=file_size,
+            mtime=file_mtime,
+            value=None if face is None else normalize_shape(face.shape, size),
+        )
+        if commit:
+            self._landmarks_cache.commit()
+
+        return face
 
     def draw_visuals(self, img: np.array) -> np.array:
         """! draw studio visuals and data info in image
@@ -515,6 +1455,10 @@ class Studio:
                 f"date modified:q {self.dataset.idx_img.modified_date}"
                 if self.dataset.idx_img is not None
                 else "",
+                f"date capture: {self.dataset.idx_img.captured_date}"
+                if self.dataset.idx_img is not None
+                and self.dataset.idx_img.captured_date is not None
+                else "",
                 f"size: {self.dataset.idx_img.width}x{self.dataset.idx_img.height}x{self.dataset.idx_img.channels}"
                 if self.dataset.idx_img is not None
                 else "",
@@ -528,7 +1472,12 @@ class Studio:
         return img
 
     def get_face_img_corrected(
-        self, img: np.array, face: Face, exp_gray: bool = False, visuals: bool = False
+        self,
+        img: np.array,
+        face: Face,
+        exp_gray: bool = False,
+        visuals: bool = False,
+        size: tuple = None,
     ) -> np.array:
         """!
         Center and align a image respect to a face components
@@ -536,67 +1485,26 @@ class Studio:
         @param face 'Face' face components to align image
         @param exp_gray 'bool' export result in gray scale
         @param visuals 'bool' print visuals in image result
+        @param size 'tuple' (width, height) of the image where face was found
+            and of the result, None to use img size
         @return img 'np.array' image centered and aligned respect with face
         """
-
-        # ------------------------------------------------------------------
-        img = (
-            img
-            if not exp_gray
-            else cv2.cvtColor(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR)
-        )
-
-        if visuals:
-            img = self._face_detector.visualize_landmarks(img=img, face=face)
-            cv2.line(
-                img,
-                tuple(face.left_eye[3]),
-                tuple(face.right_eye[0]),
-                (255, 255, 255),
-                1,
-            )
-
-        # ------------------------------------------------------------------
-        # Center and align image
-
-        dx = img.shape[1] // 2 - face.nose[2][0]
-        dy = img.shape[0] // 2 - face.nose[2][1]
-        cnt_pt = (img.shape[1] // 2, img.shape[0] // 2)
-        M = np.float32(
-            [
-                [1, 0, dx],
-                [0, 1, dy],
-            ]
-        )
-        img = cv2.warpAffine(img, M, (img.shape[1], img.shape[0]))
-
-        # ------------------------------------------------------------------
-        # Calculate angle to rate
-        angle = math.degrees(
-            math.atan2(
-                face.left_eye[3][1] - face.right_eye[0][1],
-                face.left_eye[3][0] - face.right_eye[0][0],
-            )
-        )
-
-        # Calculate resizing factor
-        len_scale = np.sqrt(
-            (face.left_eye[3][1] - face.right_eye[0][1]) ** 2
-            + (face.left_eye[3][0] - face.right_eye[0][0]) ** 2
+        return get_face_img_corrected(
+            img=img,
+            face=face,
+            face_detector=self._face_detector,
+            exp_gray=exp_gray,
+            visuals=visuals,
+            size=size,
         )
-        scale = 1.0 + (1.0 - len_scale / 150.0)
-
-        # Find trans formation matrix
-        M = cv2.getRotationMatrix2D(center=cnt_pt, angle=angle, scale=scale)
-        img = cv2.warpAffine(img, M, (img.shape[1], img.shape[0]))
-
-        if visuals:
-            cv2.circle(img, (img.shape[1] // 2, img.shape[0] // 2), 1, (0, 0, 255), -1)
-
-        return img
 
     def get_report(self) -> str:
-        return ""
+        """! Returns the timing of the processing stages since the last
+        exportation started (or the studio started)
+        @return str_ 'string' stages timing, skipped images and face
+            detector report
+        """
+        return f"{profiler}{self._face_detector.report}"
 
     @property
     def shortcuts(self) -> str:
@@ -0,0 +1,78 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+
+Exports the everyday video without any window, for servers and scheduled
+jobs. Settings come from the environment variables (env_vars.sh), some of
+them can be overwritten with arguments:
+
+    python3 dev_ws/src/everyday_studio/export.py --workers 0 --no-audio
+
+Exit status: 0 video exported, 1 error, 2 no frames to export
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import argparse
+import os
+import sys
+import traceback
+
+from every_day_maker import Studio
+from utils import printlog
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def export(record_audio: bool = True) -> int:
+    """! Exports the everyday video with a headless studio
+    @param record_audio 'bool' enable/disable audio export in video
+    @return _ 'int' exit status, 0 video exported, 1 error, 2 no frames
+    """
+
+    try:
+        studio = Studio(headless=True)
+        frames = studio.export(record_audio=record_audio)
+    except Exception as e:
+        printlog(msg=f"exportation failed, error:{e}", msg_type="FATAL")
+        traceback.print_exc()
+        return 1
+
+    if not frames:
+        printlog(msg="no frames exported", msg_type="ERROR")
+        return 2
+    printlog(msg=f"{frames} frames exported", msg_type="OKGREEN")
+    return 0
+
+
+# =============================================================================
+# MAIN FUNCTION - MAIN FUNCTION - MAIN FUNCTION - MA[-IN FUNCTION - MAIN FUNCTI
+# IMPLEMENTATION EXAMPLE - IMPLEMENTATION EXAMPLE - IMPLEMENTATION EXAMPLE - IM
+# =============================================================================
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="every day video exportation")
+    parser.add_argument("--dataset", help="overwrites DATASET_PATH")
+    parser.add_argument("--video-path", help="overwrites VIDEO_PATH")
+    parser.add_argument("--video-name", help="overwrites VIDEO_NAME")
+    parser.add_argument("--workers", help="overwrites VIDEO_EXPORT_WORKERS")
+    parser.add_argument("--pipeline", help="overwrites VIDEO_EXPORT_PIPELINE")
+    parser.add_argument("--no-audio", action="store_true", help="no audio track")
+    args = parser.parse_args()
+
+    # The studio reads its settings from the environment
+    for variable, value in (
+        ("DATASET_PATH", args.dataset),
+        ("VIDEO_PATH", args.video_path),
+        ("VIDEO_NAME", args.video_name),
+        ("VIDEO_EXPORT_WORKERS", args.workers),
+        ("VIDEO_EXPORT_PIPELINE", args.pipeline),
+    ):
+        if value is not None:
+            os.environ[variable] = value
+
+    sys.exit(export(record_audio=not args.no_audio))
+
+# =============================================================================
@@ -12,106 +12,180 @@ import dlib
 import numpy as np
 import os
 from collections import OrderedDict
-from utils import printlog
+from detectors import get_detector_backend
+from utils import printlog, profiler
+
+# Colors of the face components visuals
+LANDMARKS_COLORS = OrderedDict(
+    [
+        ("Mouth", (19, 199, 109)),
+        ("Right_Eyebrow", (79, 76, 240)),
+        ("Left_Eyebrow", (230, 159, 23)),
+        ("Right_Eye", (168, 100, 168)),
+        ("Left_Eye", (158, 163, 32)),
+        ("Nose", (163, 38, 32)),
+        ("Jaw", (180, 42, 220)),
+    ]
+)
 
 # =============================================================================
 # CLASSES - CLASSES - CLASSES - CLASSES - CLASSES - CLASSES  - CLASSES - CLASSE
 # =============================================================================
 class Face:
-    def __init__(self, shape: list) -> None:
+    # Every face is a single (68, 2) array, regions are views of it
+    __slots__ = ("shape",)
+
+    # define a dictionary that maps the indexes of the facial
+    # landmarks to specific face regions
+    FACIAL_LANDMARKS_INDEXES = OrderedDict(
+        [
+            ("Mouth", (48, 68)),
+            ("Right_Eyebrow", (17, 22)),
+            ("Left_Eyebrow", (22, 27)),
+            ("Right_Eye", (36, 42)),
+            ("Left_Eye", (42, 48)),
+            ("Nose", (27, 35)),
+            ("Jaw", (0, 17)),
+        ]
+    )
+    MOUTH = slice(*FACIAL_LANDMARKS_INDEXES["Mouth"])
+    RIGHT_EYEBROW = slice(*FACIAL_LANDMARKS_INDEXES["Right_Eyebrow"])
+    LEFT_EYEBROW = slice(*FACIAL_LANDMARKS_INDEXES["Left_Eyebrow"])
+    RIGHT_EYE = slice(*FACIAL_LANDMARKS_INDEXES["Right_Eye"])
+    LEFT_EYE = slice(*FACIAL_LANDMARKS_INDEXES["Left_Eye"])
+    NOSE = slice(*FACIAL_LANDMARKS_INDEXES["Nose"])
+    JAW = slice(*FACIAL_LANDMARKS_INDEXES["Jaw"])
+
+    def __init__(self, shape: np.array) -> None:
         """!
         Constructor for Face class instances
-        @param shape 'np.array' list of landmarks
-            detections in face shape
+        @param shape 'np.array' (68, 2) landmarks detections in face shape,
+            it's not copied if it's already an int32 array
         """
 
         # Face
-        self.shape = shape
-
-        # define a dictionary that maps the indexes of the facial
-        # landmarks to specific face regions
-        self.FACIAL_LANDMARKS_INDEXES = OrderedDict(
-            [
-                ("Mouth", (48, 68)),
-                ("Right_Eyebrow", (17, 22)),
-                ("Left_Eyebrow", (22, 27)),
-                ("Right_Eye", (36, 42)),
-                ("Left_Eye", (42, 48)),
-                ("Nose", (27, 35)),
-                ("Jaw", (0, 17)),
-            ]
-        )
+        self.shape = np.asarray(shape, dtype=np.int32)
 
     @property
-    def mouth(self) -> tuple:
-        (j, k) = self.FACIAL_LANDMARKS_INDEXES["Mouth"]
-        return tuple(self.shape[j:k])
+    def mouth(self) -> np.array:
+        return self.shape[Face.MOUTH]
 
     @property
-    def right_eyebrow(self) -> tuple:
-        (j, k) = self.FACIAL_LANDMARKS_INDEXES["Right_Eyebrow"]
-        return tuple(self.shape[j:k])
+    def right_eyebrow(self) -> np.array:
+        return self.shape[Face.RIGHT_EYEBROW]
 
     @property
-    def left_eyebrow(self) -> tuple:
-        (j, k) = self.FACIAL_LANDMARKS_INDEXES["Left_Eyebrow"]
-        return tuple(self.shape[j:k])
+    def left_eyebrow(self) -> np.array:
+        return self.shape[Face.LEFT_EYEBROW]
 
     @property
-    def right_eye(self) -> tuple:
-        (j, k) = self.FACIAL_LANDMARKS_INDEXES["Right_Eye"]
-        return tuple(self.shape[j:k])
+    def right_eye(self) -> np.array:
+        return self.shape[Face.RIGHT_EYE]
 
     @property
-    def left_eye(self) -> tuple:
-        (j, k) = self.FACIAL_LANDMARKS_INDEXES["Left_Eye"]
-        return tuple(self.shape[j:k])
+    def left_eye(self) -> np.array:
+        return self.shape[Face.LEFT_EYE]
 
     @property
-    def nose(self) -> tuple:
-        (j, k) = self.FACIAL_LANDMARKS_INDEXES["Nose"]
-        return tuple(self.shape[j:k])
+    def nose(self) -> np.array:
+        return self.shape[Face.NOSE]
 
     @property
-    def jaw(self) -> tuple:
-        (j, k) = self.FACIAL_LANDMARKS_INDEXES["Jaw"]
-        return tuple(self.shape[j:k])
+    def jaw(self) -> np.array:
+        return self.shape[Face.JAW]
 
 
 class FaceDetector:
-    def __init__(self, predictor_path: str) -> None:
+    # policies to take a face when more than one is detected
+    SELECTIONS = ("largest", "central", "score", "previous")
+
+    def __init__(
+        self,
+        predictor_path: str,
+        upsample_ladder: tuple = (1,),
+        detection_scale: float = 1.0,
+        tracking: bool = False,
+        tracking_padding: float = 0.5,
+        selection: str = "largest",
+        backend: str = "hog",
+        backend_model: str = "",
+        backend_config: str = "",
+    ) -> None:
         """!
         Constructor for FaceDetector class instances
         @param path 'string' absolute path to the landmarks weights
+        @param upsample_ladder 'tuple' upsample times to try in order with the
+            face detector, the next one is only tried if no face was found
+        @param detection_scale 'float' scale of the image given to the face
+            detector, landmarks are always predicted in the original image
+        @param tracking 'bool' look for the face first around the face found
+            in the previous image, and in the whole image if it's not there
+        @param tracking_padding 'float' padding of the tracking window around
+            the previous face jaw, relative to the jaw size
+        @param selection 'string' face taken when more than one is detected:
+            largest, central (closest to the image center), score (highest
+            detector score) or previous (closest to the previous face)
+        @param backend 'string' face detector: hog (dlib), haar (OpenCV Haar
+            cascades) or dnn (OpenCV DNN), all of them feed the same landmarks
+            predictor
+        @param backend_model 'string' absolute path to the Haar cascade or
+            the DNN weights, the haar backend uses the OpenCV one if empty
+        @param backend_config 'string' absolute path to the DNN model
+            description, if the model needs it
         """
 
-        self._detector = dlib.get_frontal_face_detector()
-        self._predictor = dlib.shape_predictor(predictor_path)
+        if selection not in FaceDetector.SELECTIONS:
+            raise ValueError(
+                f"invalid face selection {selection}, "
+                + f"options: {', '.join(FaceDetector.SELECTIONS)}"
+            )
 
-        self._graphics_colors = OrderedDict(
-            [
-                ("Mouth", (19, 199, 109)),
-                ("Right_Eyebrow", (79, 76, 240)),
-                ("Left_Eyebrow", (230, 159, 23)),
-                ("Right_Eye", (168, 100, 168)),
-                ("Left_Eye", (158, 163, 32)),
-                ("Nose", (163, 38, 32)),
-                ("Jaw", (180, 42, 220)),
-            ]
+        self.backend = backend
+        self._detector = get_detector_backend(
+            name=backend, model_path=backend_model, config_path=backend_config
         )
+        self._predictor = dlib.shape_predictor(predictor_path)
+
+        self.upsample_ladder = tuple(upsample_ladder)
+        self.detection_scale = detection_scale
+
+        # times that every upsample of the ladder was needed to find a face
+        self.ladder_count = OrderedDict([(upsample, 0) for upsample in upsample_ladder])
+        self.ladder_misses = 0
+        self.last_upsample = None
+        self.last_scores = []
+
+        # window to look for the face around the previous face found
+        self.tracking = tracking
+        self.tracking_padding = tracking_padding
+        self._tracking_box = None
+        self.tracking_hits = 0
+        self.tracking_misses = 0
+
+        # face taken when more than one is detected, the previous face center
+        # is normalized to the image size
+        self.selection = selection
+        self._previous_center = None
+        self.multiple_faces = 0
 
     def predict(self, img: np.array) -> Face:
         """!
-        Predicts faces in image, but only one is return
-        (the last one in being detected)
+        Predicts the face in the image, only one face is returned. Faces are
+        looked for around the previous face first if tracking is enabled,
+        then in the whole image going through the upsample ladder from
+        coarse to fine (detect). If more than one face is detected the one
+        taken depends on the selection policy (select_face)
         @param img 'np.array' image for prediction
         @return _ 'Face' Face class object associated with shape of prediction,
             if not face detected in image None is return
         """
 
         # detect faces in the grayscale image
-        img_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        rects = self._detector(img_gray, 1)
+        with profiler.measure("detection"):
+            img_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            rects = self.detect_tracked(img_gray=img_gray) if self.tracking else []
+            if not len(rects):
+                rects = self.detect(img_gray=img_gray)
 
         if not len(rects):
             printlog(
@@ -119,49 +193,219 @@ class FaceDetector:
                 msg_type="WARN",
             )
             return None
-        elif len(rects) == 1:
-            shape = self._predictor(img_gray, rects[0])
-            shape = self.shape_to_numpy_array(shape=shape)
-            return Face(shape=shape)
+
+        # Only the face taken gets its landmarks predicted
+        size = (img.shape[1], img.shape[0])
+        rect = rects[0] if len(rects) == 1 else self.select_face(rects, size)
+        with profiler.measure("shape_prediction"):
+            shape = self._predictor(img_gray, rect)
+            face = Face(shape=self.shape_to_numpy_array(shape=shape))
+
+        if self.follows_previous:
+            self.track(face=face, size=size)
+
+        return face
+
+    def select_face(self, rects: list, size: tuple):
+        """!
+        Takes a face of the faces detected with the selection policy, only
+        with the detector rectangles and scores
+        @param rects 'list' dlib.rectangle of faces found
+        @param size 'tuple' (width, height) of the image
+        @return _ 'dlib.rectangle' face taken
+        """
+
+        self.multiple_faces += 1
+        selection = self.selection
+        if selection == "previous" and self._previous_center is None:
+            selection = "largest"
+        printlog(
+            msg=lambda: f"{len(rects)} faces detected, taken the {selection} one",
+            msg_type="DEBUG",
+        )
+
+        boxes = np.float64(
+            [(rect.left(), rect.top(), rect.right(), rect.bottom()) for rect in rects]
+        )
+        centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+        if selection == "score":
+            cost = -np.float64(self.last_scores)
+        elif selection == "central":
+            cost = np.hypot(*(centers - np.float64(size) / 2).T)
+        elif selection == "previous":
+            cost = np.hypot(*(centers - self._previous_center * size).T)
         else:
-            printlog(
-                msg="more than two faces detected, taken the bigger one by default",
-                msg_type="WARN",
+            cost = -np.prod(boxes[:, 2:] - boxes[:, :2], axis=1)
+        return rects[int(np.argmin(cost))]
+
+    @property
+    def follows_previous(self) -> bool:
+        """!
+        @return _ 'bool' whether the face of an image depends on the previous
+            face, so track has to be called with every face
+        """
+        return self.tracking or self.selection == "previous"
+
+    def track(self, face: Face, size: tuple) -> None:
+        """!
+        Sets the window where the face is looked for in the next image, and
+        the previous face position for the face selection
+        @param face 'Face' face found in the current image
+        @param size 'tuple' (width, height) of the current image
+        """
+
+        jaw = face.jaw
+        x0, y0 = jaw.min(axis=0)
+        x1, y1 = jaw.max(axis=0)
+        self._previous_center = np.float64(
+            ((x0 + x1) / (2 * size[0]), (y0 + y1) / (2 * size[1]))
+        )
+        pad_x = int((x1 - x0) * self.tracking_padding)
+        pad_y = int((y1 - y0) * self.tracking_padding)
+
+        self._tracking_box = (
+            int(max(0, x0 - pad_x)),
+            int(max(0, y0 - pad_y)),
+            int(min(size[0], x1 + pad_x)),
+            int(min(size[1], y1 + pad_y)),
+        )
+
+        # A face out of the image can't be tracked
+        if (
+            self._tracking_box[2] <= self._tracking_box[0]
+            or self._tracking_box[3] <= self._tracking_box[1]
+        ):
+            self._tracking_box = None
+
+    def reset_tracking(self) -> None:
+        """!
+        Forgets the previous face, next image is searched completely
+        """
+        self._tracking_box = None
+        self._previous_center = None
+
+    def detect_tracked(self, img_gray: np.array) -> list:
+        """!
+        Detects faces rectangles only in the window around the previous
+        face found
+        @param img_gray 'np.array' gray scale image for detection
+        @return rects 'list' dlib.rectangle of faces found, in img_gray
+            coordinates, empty if there's no previous face or it moved
+            away from the window
+        """
+
+        if self._tracking_box is None:
+            return []
+
+        x0, y0, x1, y1 = self._tracking_box
+        rects = self.detect(img_gray=img_gray[y0:y1, x0:x1], count_misses=False)
+        if not len(rects):
+            self.tracking_misses += 1
+            return []
+
+        self.tracking_hits += 1
+        return [
+            dlib.rectangle(
+                rect.left() + x0,
+                rect.top() + y0,
+                rect.right() + x0,
+                rect.bottom() + y0,
             )
-            # loop over the face detections
-            max_arcLength = 0
-            idx_face = None
-            face = None
-            for rect in rects:
-                # determine the facial landmarks for the face region, then
-                # convert the landmark (x, y)-coordinates to a NumPy array
-                shape = self._predictor(img_gray, rect)
-                shape = self.shape_to_numpy_array(shape=shape)
-                idx_face = Face(shape=shape)
-                idx_arcLength = cv2.arcLength(np.float32([idx_face.jaw]), True)
-                if max_arcLength < idx_arcLength:
-                    face = idx_face
-                    max_arcLength = idx_arcLength
-
-            return face
+            for rect in rects
+        ]
 
-    def shape_to_numpy_array(self, shape) -> np.array:
+    def detect(self, img_gray: np.array, count_misses: bool = True) -> list:
         """!
-        Converts shape of detections in a numpy array
-        @param shape 'list' list of landmarks detections
-        @return _ 'np.array' numpy array of landmarks
+        Detects faces rectangles going from coarse to fine, first in the
+        image scaled by detection_scale with the lowest upsample of the
+        ladder, then with the next upsample only if no face was found
+        @param img_gray 'np.array' gray scale image for detection
+        @param count_misses 'bool' count in the report if no face is found
+        @return rects 'list' dlib.rectangle of faces found, in img_gray
+            coordinates. Their detector scores are kept in last_scores
         """
 
-        # initialize the list of (x, y)-coordinates
-        coordinates = np.zeros((68, 2), dtype="int")
+        img_det = (
+            img_gray
+            if self.detection_scale == 1.0
+            else cv2.resize(
+                img_gray,
+                None,
+                fx=self.detection_scale,
+                fy=self.detection_scale,
+                interpolation=cv2.INTER_AREA,
+            )
+        )
 
-        # loop over the 68 facial landmarks and convert them
-        # to a 2-tuple of (x, y)-coordinates
-        for i in range(0, 68):
-            coordinates[i] = (shape.part(i).x, shape.part(i).y)
+        for upsample in self.upsample_ladder:
+            # the detection scores are kept to select between faces
+            rects, self.last_scores = self._detector.detect(img_det, upsample)
+            if len(rects):
+                self.count_detection(upsample=upsample)
+                break
+        else:
+            if count_misses:
+                self.count_detection(upsample=None)
+            return []
+
+        if self.detection_scale == 1.0:
+            return list(rects)
+
+        # map rectangles back to the original image coordinates
+        return [
+            dlib.rectangle(
+                int(rect.left() / self.detection_scale),
+                int(rect.top() / self.detection_scale),
+                int(rect.right() / self.detection_scale),
+                int(rect.bottom() / self.detection_scale),
+            )
+            for rect in rects
+        ]
 
-        # return the list of (x, y)-coordinates
-        return coordinates
+    def count_detection(self, upsample: int = None) -> None:
+        """!
+        Counts a detection in the upsample ladder report
+        @param upsample 'int' upsample of the ladder where a face was
+            found, None if no face was found
+        """
+        self.last_upsample = upsample
+        if upsample is None:
+            self.ladder_misses += 1
+        else:
+            self.ladder_count[upsample] += 1
+
+    @property
+    def report(self) -> str:
+        """!
+        @return str_ 'string' times that every upsample of the ladder was
+            needed to find a face
+        """
+        str_ = f"face detection (scale: {self.detection_scale}):"
+        for upsample, count in self.ladder_count.items():
+            str_ += f" upsample {upsample}: {count},"
+        str_ += f" no face: {self.ladder_misses}"
+        str_ += f", multiple faces ({self.selection}): {self.multiple_faces}"
+        if self.tracking:
+            str_ += (
+                f", tracking window hits: {self.tracking_hits},"
+                + f" misses: {self.tracking_misses}"
+            )
+        return str_
+
+    def shape_to_numpy_array(self, shape) -> np.array:
+        """!
+        Converts shape of detections in a numpy array
+        @param shape 'dlib.full_object_detection' landmarks detections
+        @return _ 'np.array' (68, 2) int32 numpy array of landmarks
+        """
+
+        # coordinates are filled straight into the int32 array, without a
+        # tuple per point, and with a single call to get all the points
+        return np.fromiter(
+            (coord for point in shape.parts() for coord in (point.x, point.y)),
+            dtype=np.int32,
+            count=2 * shape.num_parts,
+        ).reshape(shape.num_parts, 2)
 
     def visualize_landmarks(
         self,
@@ -174,32 +418,40 @@ class FaceDetector:
         @param face 'Face' face with landmarks, and components
         @return img 'np.array' image with components drawn
         """
-
-        landmarks = OrderedDict(
-            [
-                ("Mouth", face.mouth),
-                ("Right_Eyebrow", face.right_eyebrow),
-                ("Left_Eyebrow", face.left_eyebrow),
-                ("Right_Eye", face.right_eye),
-                ("Left_Eye", face.left_eye),
-                ("Nose", face.nose),
-                ("Jaw", face.jaw),
-            ]
-        )
-
-        for shape_key, shape_values in landmarks.items():
-            pts = np.array(shape_values, np.int32)
-            pts = pts.reshape((-1, 1, 2))
-            cv2.polylines(img, [pts], False, self._graphics_colors[shape_key])
-            for cnt in shape_values:
-                cv2.circle(img, tuple(cnt), 1, (0, 0, 255), -1)
-
-        return img
+        return draw_landmarks(img=img, face=face)
 
 
 # =============================================================================
 # FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
 # =============================================================================
+def draw_landmarks(img: np.array, face: Face) -> np.array:
+    """!
+    Draw the face landmarks and components, it doesn't need a face detector
+    @param img 'np.array' image to draw landmarks and face components
+    @param face 'Face' face with landmarks, and components
+    @return img 'np.array' image with components drawn
+    """
+
+    landmarks = OrderedDict(
+        [
+            ("Mouth", face.mouth),
+            ("Right_Eyebrow", face.right_eyebrow),
+            ("Left_Eyebrow", face.left_eyebrow),
+            ("Right_Eye", face.right_eye),
+            ("Left_Eye", face.left_eye),
+            ("Nose", face.nose),
+            ("Jaw", face.jaw),
+        ]
+    )
+
+    for shape_key, shape_values in landmarks.items():
+        pts = shape_values.reshape((-1, 1, 2))
+        cv2.polylines(img, [pts], False, LANDMARKS_COLORS[shape_key])
+        for cnt in shape_values.tolist():
+            cv2.circle(img, tuple(cnt), 1, (0, 0, 255), -1)
+
+    return img
+
 
 # =============================================================================
 # MAIN FUNCTION - MAIN FUNCTION - MAIN FUNCTION - MA[-IN FUNCTION - MAIN FUNCTION
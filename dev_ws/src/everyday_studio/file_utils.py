@@ -6,11 +6,14 @@ Aka: @JohnBetaCode
 # =============================================================================
 # LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
 # =============================================================================
-from utils import printlog
+from utils import printlog, profiler
 import os
+import struct
 from datetime import datetime
+from stat import S_ISREG
 
 import cv2
+import numpy as np
 
 from utils import try_catch_log
 
@@ -20,15 +23,33 @@ from utils import try_catch_log
 
 
 class File(object):
-    def __init__(self, path: str) -> None:
+    __slots__ = ("path", "isfile", "_stat")
+
+    def __init__(self, path: str, isfile: bool = None, stat: tuple = None) -> None:
         """!
-        Constructor for File class instances
+        Constructor for File class instances. File properties come from a
+        single stat of the file, done here if they are not given
         @param path 'string' absolute path to the file
+        @param isfile 'bool' whether the file exists, if None it is checked
+        @param stat 'tuple' (size, modification date stamp, creation date
+            stamp) of the file, if None the file is stat
         constructor instance
         """
 
         self.path = path
-        self.isfile = os.path.isfile(self.path)
+        self.isfile = isfile
+        self._stat = stat
+
+        if self.isfile is None or (self.isfile and self._stat is None):
+            try:
+                stat_ = os.stat(self.path)
+                self.isfile = S_ISREG(stat_.st_mode)
+                self._stat = (stat_.st_size, stat_.st_mtime, stat_.st_ctime)
+            except OSError:
+                self.isfile = False
+
+        if not self.isfile:
+            self._stat = (0, 0.0, 0.0)
 
     @property
     def extension(self):
@@ -49,62 +70,117 @@ class File(object):
         """!
         @return _ 'date' file's creation date
         """
-        return (
-            datetime.fromtimestamp(os.path.getctime(self.path)) if self.isfile else None
-        )
+        return datetime.fromtimestamp(self._stat[2]) if self.isfile else None
 
     @property
     def created_date_stamp(self) -> float:
         """!
         @return _ 'float' timestamp of file's creation file
         """
-        return os.path.getctime(self.path) if self.isfile else 0.0
+        return self._stat[2]
 
     @property
     def modified_date(self):
         """!
         @return _ 'date' file's modification date
         """
-        return (
-            datetime.fromtimestamp(os.path.getmtime(self.path)) if self.isfile else None
-        )
+        return datetime.fromtimestamp(self._stat[1]) if self.isfile else None
 
     @property
     def modified_date_stamp(self) -> float:
         """!
         @return _ 'float' timestamp of file's modification date
         """
-        return os.path.getmtime(self.path) if self.isfile else 0.0
+        return self._stat[1]
+
+    @property
+    def size(self) -> int:
+        """!
+        @return _ 'int' file's size in bytes
+        """
+        return self._stat[0]
 
 
 class Image(File):
-    def __init__(self, path: str, load: bool = False) -> None:
+    __slots__ = ("image", "_header")
+
+    def __init__(
+        self,
+        path: str,
+        load: bool = False,
+        isfile: bool = None,
+        stat: tuple = None,
+        header: tuple = None,
+    ) -> None:
         """!
         Constructor for Image class instances
         @param path 'string' absolute path to the Image
         @param load 'bool' load or not image data from
+        @param isfile 'bool' whether the file exists, if None it is checked
+        @param stat 'tuple' (size, modification date stamp, creation date
+            stamp) of the file, if None the file is stat
+        @param header 'tuple' (width, height, capture date stamp) from the
+            file header, if None the header is read when it's needed
         constructor instance
         """
 
-        File.__init__(self, path=path)
+        File.__init__(self, path=path, isfile=isfile, stat=stat)
 
         self.image = None
+        self._header = header
 
         # If the file exist load the image
         if self.isfile and load:
             self.load(print_info=False)
 
     @try_catch_log
-    def load(self, print_info: bool = True) -> None:
+    def load(self, print_info: bool = True, size: tuple = ()) -> None:
         """!
         load image data from file's path
         @param print_info 'bool' print image information
         to the std output
+        @param size 'tuple' (width, height) the image data will be resized to,
+            JPEG images are decoded at the smallest scale (1/2, 1/4, 1/8) that
+            is still bigger than it, and other images are reduced by halves
+            right after decoding. Empty to load the original size
         """
-        self.image = cv2.imread(self.path)
+
+        with profiler.measure("decode"):
+            if len(size) and self.extension.lower() in (".jpg", ".jpeg"):
+                width, height, _ = self.header
+                self.image = cv2.imread(
+                    self.path, get_reduced_decode_flag(size=(width, height), dsize=size)
+                )
+            else:
+                self.image = cv2.imread(self.path)
+                if len(size) and self.image is not None:
+                    while (
+                        self.image.shape[1] // 2 >= max(size)
+                        and self.image.shape[0] // 2 >= max(size)
+                    ):
+                        self.image = cv2.pyrDown(self.image)
+
         if print_info:
             print(self)
 
+    @property
+    def header(self) -> tuple:
+        """!
+        @return _ 'tuple' (width, height, capture date stamp) from the file
+            header, 0 for the values that are not found in it
+        """
+        if self._header is None:
+            self._header = read_image_info(self.path) if self.isfile else (0, 0, 0.0)
+        return self._header
+
+    @property
+    def captured_date(self):
+        """!
+        @return _ 'date' image capture date from its EXIF data, None if the
+            image doesn't have it
+        """
+        return datetime.fromtimestamp(self.header[2]) if self.header[2] else None
+
     @property
     def width(self) -> int:
         """!
@@ -141,7 +217,8 @@ class Image(File):
         elif not len(size):
             return self.image
         else:
-            return cv2.resize(src=self.image, dsize=size)
+            with profiler.measure("resize"):
+                return cv2.resize(src=self.image, dsize=size)
 
     def __str__(self):
         """!
@@ -164,6 +241,105 @@ class Image(File):
         return str_
 
 
+class FileColumns(object):
+    __slots__ = ("paths", "sizes", "mtimes", "ctimes", "headers")
+
+    def __init__(
+        self,
+        paths: list = (),
+        sizes: list = (),
+        mtimes: list = (),
+        ctimes: list = (),
+        headers: list = None,
+    ) -> None:
+        """!
+        Constructor for FileColumns class instances. Files properties are
+        kept in arrays, one per property, instead of one object per file.
+        Indexing returns an Image view built from the columns, without
+        touching the file system
+        @param paths 'list' absolute paths of the files
+        @param sizes 'list' files sizes in bytes
+        @param mtimes 'list' files modification date stamps
+        @param ctimes 'list' files creation date stamps
+        @param headers 'list' (width, height, capture date stamp) of the
+            images from their file headers, None if they are not known
+        """
+
+        self.paths = np.array(paths, dtype=object)
+        self.sizes = np.array(sizes, dtype=np.int64)
+        self.mtimes = np.array(mtimes, dtype=np.float64)
+        self.ctimes = np.array(ctimes, dtype=np.float64)
+        self.headers = (
+            None
+            if headers is None
+            else np.array(headers, dtype=np.float64).reshape(len(self.paths), 3)
+        )
+
+    @classmethod
+    def from_folders(cls, folders: list, extensions: tuple) -> "FileColumns":
+        """!
+        Lists and stat once every file in the folders
+        @param folders 'list' absolute paths of the folders to list
+        @param extensions 'tuple' file extensions of the files to list
+        @return _ 'FileColumns' files in the folders
+        """
+
+        paths, sizes, mtimes, ctimes = [], [], [], []
+        for folder in folders:
+            for entry in os.scandir(folder):
+                if not entry.name.endswith(extensions) or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                paths.append(entry.path)
+                sizes.append(stat.st_size)
+                mtimes.append(stat.st_mtime)
+                ctimes.append(stat.st_ctime)
+
+        return cls(paths=paths, sizes=sizes, mtimes=mtimes, ctimes=ctimes)
+
+    def sorted_by_mtime(self) -> "FileColumns":
+        """!
+        @return _ 'FileColumns' files ordered by modification date stamp
+        """
+        order = np.argsort(self.mtimes, kind="stable")
+        return FileColumns(
+            paths=self.paths[order],
+            sizes=self.sizes[order],
+            mtimes=self.mtimes[order],
+            ctimes=self.ctimes[order],
+            headers=None if self.headers is None else self.headers[order],
+        )
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __getitem__(self, idx: int) -> Image:
+        """!
+        @param idx 'int' index of the file
+        @return _ 'Image' image view of the file, its data is not loaded
+        """
+        return Image(
+            path=self.paths[idx],
+            isfile=True,
+            stat=(
+                int(self.sizes[idx]),
+                float(self.mtimes[idx]),
+                float(self.ctimes[idx]),
+            ),
+            header=None
+            if self.headers is None
+            else (
+                int(self.headers[idx, 0]),
+                int(self.headers[idx, 1]),
+                float(self.headers[idx, 2]),
+            ),
+        )
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+
 # =============================================================================
 # FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
 # =============================================================================
@@ -184,6 +360,101 @@ def get_sub_folders(folder: str = "") -> list:
     return [f.path for f in os.scandir(folder) if f.is_dir()]
 
 
+def get_reduced_decode_flag(size: tuple, dsize: tuple) -> int:
+    """! Returns the imread flag to decode a JPEG image at the smallest
+    scale that is still bigger than a size. As the image could be rotated
+    by its EXIF orientation, both image sides are compared with the
+    biggest side of the size
+    @param size (tuple) (width, height) of the image in the file header
+    @param dsize (tuple) (width, height) the image data will be resized to
+    @return _ 'int' imread flag
+    """
+    for factor, flag in (
+        (8, cv2.IMREAD_REDUCED_COLOR_8),
+        (4, cv2.IMREAD_REDUCED_COLOR_4),
+        (2, cv2.IMREAD_REDUCED_COLOR_2),
+    ):
+        if min(size) // factor >= max(dsize):
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def read_image_info(path: str) -> tuple:
+    """! Reads the image size and capture date from a JPEG or PNG file
+    header, without decoding the image
+    @param path (str) absolute path to the image file
+    @return _ 'tuple' (width, height, capture date stamp), 0 for the
+        values that are not found in the file header
+    """
+    try:
+        with open(path, "rb") as file:
+            signature = file.read(8)
+            if signature == b"\x89PNG\r\n\x1a\n":
+                width, height = struct.unpack(">8xII", file.read(16))
+                return width, height, 0.0
+            elif signature[:2] == b"\xff\xd8":
+                file.seek(2)
+                return _read_jpeg_info(file)
+    except (OSError, struct.error) as e:
+        printlog(msg=f"no header read from {path}, error:{e}", msg_type="WARN")
+    return 0, 0, 0.0
+
+
+def _read_jpeg_info(file) -> tuple:
+    """! Walks the JPEG segments until the frame header, looking for the
+    image size and the EXIF capture date
+    @param file (file) binary file positioned after the JPEG start marker
+    @return _ 'tuple' (width, height, capture date stamp)
+    """
+    capture_date = 0.0
+    while True:
+        marker, length = struct.unpack(">2sH", file.read(4))
+        if marker[0] != 0xFF or marker[1] == 0xDA:  # no marker or start of scan
+            return 0, 0, capture_date
+        # Start of frame markers, except DHT, JPG and DAC
+        if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">xHH", file.read(5))
+            return width, height, capture_date
+        if marker[1] == 0xE1 and not capture_date:
+            capture_date = _read_exif_date(file.read(length - 2))
+        else:
+            file.seek(length - 2, os.SEEK_CUR)
+
+
+def _read_exif_date(data: bytes) -> float:
+    """! Gets the DateTimeOriginal tag from a EXIF segment
+    @param data (bytes) APP1 segment data
+    @return _ 'float' capture date stamp, 0.0 if it's not found
+    """
+    if data[:6] != b"Exif\x00\x00":
+        return 0.0
+    tiff = data[6:]
+    order = "<" if tiff[:2] == b"II" else ">"
+
+    def find_tag(ifd_offset: int, tag: int) -> tuple:
+        (entries,) = struct.unpack_from(order + "H", tiff, ifd_offset)
+        for idx in range(entries):
+            entry_tag, _, count, value = struct.unpack_from(
+                order + "HHII", tiff, ifd_offset + 2 + idx * 12
+            )
+            if entry_tag == tag:
+                return count, value
+        return 0, 0
+
+    try:
+        (ifd0,) = struct.unpack_from(order + "I", tiff, 4)
+        _, exif_ifd = find_tag(ifd0, 0x8769)
+        if not exif_ifd:
+            return 0.0
+        count, offset = find_tag(exif_ifd, 0x9003)
+        if count < 19:
+            return 0.0
+        date = tiff[offset : offset + 19].decode("ascii")
+        return datetime.strptime(date, "%Y:%m:%d %H:%M:%S").timestamp()
+    except (struct.error, UnicodeDecodeError, ValueError):
+        return 0.0
+
+
 # =============================================================================
 # MAIN FUNCTION - MAIN FUNCTION - MAIN FUNCTION - MA[-IN FUNCTION - MAIN FUNCTION
 # IMPLEMENTATION EXAMPLE - IMPLEMENTATION EXAMPLE - IMPLEMENTATION EXAMPLE - IM
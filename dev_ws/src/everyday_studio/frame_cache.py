@@ -0,0 +1,195 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import atexit
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from face import Face
+from file_utils import Image
+from utils import printlog
+
+# =============================================================================
+# CLASSES - CLASSES - CLASSES - CLASSES - CLASSES - CLASSES  - CLASSES - CLASSE
+# =============================================================================
+class Frame(object):
+    __slots__ = ("image", "img", "face")
+
+    def __init__(self, image: Image, img: np.array, face: Face) -> None:
+        """!
+        Constructor for Frame class instances, a dataset image ready
+        to be shown in the studio
+        @param image 'Image' dataset image with its data loaded
+        @param img 'np.array' image data resized to the working size,
+            None if the image could not be loaded
+        @param face 'Face' face detected in the image, None if there's no face
+        """
+        self.image = image
+        self.img = img
+        self.face = face
+
+    @property
+    def nbytes(self) -> int:
+        """!
+        @return _ 'int' memory used by the frame images data
+        """
+        return sum(
+            data.nbytes for data in (self.image.image, self.img) if data is not None
+        )
+
+
+class FrameCache:
+    def __init__(self, load, max_bytes: int, prefetch: int = 3) -> None:
+        """!
+        Constructor for FrameCache class instances. Keeps the last used
+        frames until max_bytes of memory is used, dropping the least
+        recently used first. A background thread loads the frames next to
+        the last one requested, in the direction of travel, before they
+        are requested.
+        @param load 'function' callable(idx) returning the Frame of a
+            dataset index
+        @param max_bytes 'int' maximum memory for frames data
+        @param prefetch 'int' frames to load ahead in the direction of travel
+        """
+
+        self._load = load
+        self.max_bytes = max_bytes
+        self.prefetch_count = prefetch
+
+        self._frames = OrderedDict()
+        self._bytes = 0
+        self._loading = None
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+        self.hits = 0
+        self.misses = 0
+
+        self._thread = threading.Thread(target=self._prefetch_loop, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def get(self, idx: int) -> Frame:
+        """!
+        Get the frame of a dataset index, loading it if it's not in cache.
+        If the background thread is loading it, waits for it
+        @param idx 'int' dataset index
+        @return _ 'Frame' frame of the dataset index
+        """
+
+        with self._condition:
+            while self._loading == idx:
+                self._condition.wait()
+            if idx in self._frames:
+                self.hits += 1
+                self._frames.move_to_end(idx)
+                return self._frames[idx]
+            self.misses += 1
+
+        frame = self._load(idx)
+        if frame is not None:
+            self._put(idx=idx, frame=frame)
+        return frame
+
+    def prefetch(self, idx: int, direction: int = 1) -> None:
+        """!
+        Replaces the frames waiting to be loaded in background with the ones
+        around a dataset index, prefetch frames ahead and one behind
+        @param idx 'int' dataset index of the current frame
+        @param direction 'int' direction of travel, 1 forward, -1 backward
+        """
+
+        with self._condition:
+            self._pending.clear()
+            for step in range(1, self.prefetch_count + 1):
+                self._pending.append(idx + step * direction)
+            self._pending.append(idx - direction)
+            self._condition.notify_all()
+
+    def clear(self) -> None:
+        """!
+        Drops every frame in the cache and pending to be loaded
+        """
+        with self._condition:
+            self._pending.clear()
+            self._frames.clear()
+            self._bytes = 0
+
+    def close(self) -> None:
+        """!
+        Stops the background thread once the frame being loaded is done,
+        a thread killed in the middle of a decoding aborts the process
+        """
+        with self._condition:
+            self._closed = True
+            self._pending.clear()
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _put(self, idx: int, frame: Frame) -> None:
+        """!
+        Adds a frame to the cache, dropping the least recently used ones
+        while the memory is over the limit
+        @param idx 'int' dataset index of the frame
+        @param frame 'Frame' frame to add
+        """
+
+        with self._condition:
+            if idx in self._frames:
+                self._bytes -= self._frames.pop(idx).nbytes
+            self._frames[idx] = frame
+            self._bytes += frame.nbytes
+            while self._bytes > self.max_bytes and len(self._frames) > 1:
+                _, dropped = self._frames.popitem(last=False)
+                self._bytes -= dropped.nbytes
+
+    def _prefetch_loop(self) -> None:
+        """!
+        Loads the pending frames in background
+        """
+
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                idx = self._pending.popleft()
+                if idx in self._frames:
+                    continue
+                self._loading = idx
+
+            try:
+                frame = self._load(idx)
+            except Exception as e:
+                frame = None
+                printlog(msg=f"no prefetch of idx {idx}, error:{e}", msg_type="WARN")
+
+            with self._condition:
+                if frame is not None:
+                    self._put(idx=idx, frame=frame)
+                self._loading = None
+                self._condition.notify_all()
+
+    def __str__(self):
+        """!
+        Get object instace string for printings
+        @return str_ 'string' string with object instance info
+        """
+        return (
+            f"frames cache: {len(self._frames)} frames, "
+            + f"{self._bytes / 2 ** 20:.1f}/{self.max_bytes / 2 ** 20:.1f} MB, "
+            + f"hits: {self.hits}, misses: {self.misses}"
+        )
+
+
+# =============================================================================
@@ -0,0 +1,622 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import multiprocessing
+import os
+
+from tqdm import tqdm
+
+from cache import LandmarksCache, denormalize_shape, normalize_shape
+from capture import FFmpegVideoWriter
+from face import Face, FaceDetector
+from file_utils import Image
+from render import apply_face_transform, get_aligned_face, get_face_img_corrected
+from utils import printlog, print_text_list, profiler
+
+# Worker process state, every worker loads the shape predictor only once
+_worker_face_detector = None
+_worker_settings = None
+
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def _init_worker(predictor_path: str, settings: dict) -> None:
+    """! Initializes a export worker process
+    @param predictor_path 'string' absolute path to the landmarks weights
+    @param settings 'dict' exportation settings (size, exp_gray, exp_visuals,
+        detector_args)
+    """
+    global _worker_face_detector, _worker_settings
+
+    _worker_face_detector = FaceDetector(
+        predictor_path=predictor_path, **settings["detector_args"]
+    )
+    _worker_settings = settings
+
+
+def _init_render_worker(settings: dict) -> None:
+    """! Initializes a worker process that renders images with their
+    transformations already computed, without face detector
+    @param settings 'dict' exportation settings (size, exp_gray)
+    """
+    global _worker_settings
+
+    _worker_settings = settings
+
+
+def _analyze_run(tasks: list) -> tuple:
+    """! Loads a run of consecutive dataset images and predicts their
+    landmarks in a worker process, without rendering them. The face detector
+    tracking starts again with every run, so the previous face of an image
+    is always the one of the previous image with a face
+    @param tasks 'list' (path, shape) path of every image and its normalized
+        landmarks from the cache, None if they have to be predicted
+    @return _ 'tuple' (results, samples) (shape, upsample, error) of every
+        image: normalized landmarks (None if no face was found or they came
+        from the cache), upsample of the detector ladder where the face was
+        found ("cache" if not predicted) and error message if any, and
+        stages timing measured
+    """
+
+    _worker_face_detector.reset_tracking()
+    size = _worker_settings["size"]
+    results = []
+    for path, cached_shape in tasks:
+        if cached_shape is not None:
+            if _worker_face_detector.follows_previous:
+                _worker_face_detector.track(
+                    face=Face(shape=denormalize_shape(cached_shape, size)), size=size
+                )
+            results.append((None, "cache", None))
+            continue
+
+        try:
+            image = Image(path=path)
+            image.load(print_info=False, size=size)
+            img = image.get_data(size=size)
+            if img is None:
+                results.append((None, "cache", f"no data loaded from {path}"))
+                continue
+            face = _worker_face_detector.predict(img=img)
+            shape = None if face is None else normalize_shape(face.shape, size)
+            results.append((shape, _worker_face_detector.last_upsample, None))
+        except Exception as e:
+            results.append((None, "cache", str(e)))
+
+    return results, profiler.pop_samples()
+
+
+def _render_transformed(task: tuple) -> tuple:
+    """! Loads a single dataset image and aligns it with its transformation
+    already computed, in a worker process
+    @param task 'tuple' (path, M_face, shape) path of the image, its (3, 3)
+        transformation and its (68, 2) landmarks in the aligned image to
+        draw visuals, None for no visuals
+    @return _ 'tuple' (frame, error, samples) aligned frame, error message
+        if any, and stages timing measured
+    """
+
+    path, M_face, shape = task
+    size = _worker_settings["size"]
+    try:
+        image = Image(path=path)
+        image.load(print_info=False, size=size)
+        if image.image is None:
+            return None, f"no data loaded from {path}", profiler.pop_samples()
+
+        frame = apply_face_transform(
+            img=image.image,
+            M_face=M_face,
+            size=size,
+            exp_gray=_worker_settings["exp_gray"],
+            face=None if shape is None else Face(shape=shape),
+        )
+        return frame, None, profiler.pop_samples()
+    except Exception as e:
+        return None, str(e), profiler.pop_samples()
+
+
+def _export_run(tasks: list) -> tuple:
+    """! Loads, detects and aligns a run of consecutive dataset images in a
+    worker process. The face detector tracking starts again with every run,
+    so the previous face of an image is always the one of the previous image
+    with a face
+    @param tasks 'list' (path, shape) path of every image and its normalized
+        landmarks from the cache, None if they have to be predicted
+    @return _ 'tuple' (results, samples) (frame, shape, upsample, error) of
+        every image: aligned frame or None if there's no face, normalized
+        landmarks predicted in the worker (None if they came from the cache
+        or no face was found), upsample of the detector ladder where the face
+        was found ("cache" if not predicted) and error message if any, and
+        stages timing measured
+    """
+
+    _worker_face_detector.reset_tracking()
+    results = [_export_frame_data(task=task) for task in tasks]
+    return results, profiler.pop_samples()
+
+
+def _export_frame_data(task: tuple) -> tuple:
+    """! Loads, detects and aligns a single dataset image in a worker process
+    @param task 'tuple' (path, shape) as in _export_run
+    @return _ 'tuple' (frame, shape, upsample, error) as in _export_run
+    """
+
+    path, cached_shape = task
+    size = _worker_settings["size"]
+    try:
+        image = Image(path=path)
+        image.load(print_info=False, size=size)
+        img = image.get_data(size=size)
+        if img is None:
+            return None, None, "cache", f"no data loaded from {path}"
+
+        if cached_shape is None:
+            face = _worker_face_detector.predict(img=img)
+            shape = None if face is None else normalize_shape(face.shape, size)
+            upsample = _worker_face_detector.last_upsample
+        else:
+            face = Face(shape=denormalize_shape(cached_shape, size))
+            shape = None
+            upsample = "cache"
+            if _worker_face_detector.follows_previous:
+                _worker_face_detector.track(face=face, size=size)
+
+        if face is None:
+            return None, None, upsample, None
+
+        frame = get_face_img_corrected(
+            img=image.image,
+            face=face,
+            face_detector=_worker_face_detector,
+            exp_gray=_worker_settings["exp_gray"],
+            visuals=_worker_settings["exp_visuals"],
+            size=size,
+        )
+        if _worker_settings.get("aligned"):
+            frame = (frame, get_aligned_face(face=face, size=size).shape)
+        return frame, shape, upsample, None
+    except Exception as e:
+        return None, None, "cache", str(e)
+
+
+def _export_segment(task: tuple) -> tuple:
+    """! Loads, detects, aligns and encodes a chunk of dataset images to a
+    video segment in a worker process
+    @param task 'tuple' (file_path, file_name, images) folder and name of
+        the segment video file, and the (path, shape, date) of every image,
+        as in _export_run with the date to overlay
+    @return _ 'tuple' (frames, results, samples) number of frames encoded,
+        (found, shape, upsample, error) of every image as in _export_run
+        with found instead of the frame, and stages timing measured
+    """
+
+    file_path, file_name, images = task
+    video_writer = FFmpegVideoWriter(
+        file_path=file_path, file_name=file_name, **_worker_settings["video"]
+    )
+
+    # The first image of the segment has no previous face to track
+    _worker_face_detector.reset_tracking()
+
+    frames, results = 0, []
+    try:
+        for path, cached_shape, date in images:
+            frame, shape, upsample, error = _export_frame_data(
+                task=(path, cached_shape)
+            )
+            results.append((frame is not None, shape, upsample, error))
+            if frame is None:
+                continue
+
+            if _worker_settings["exp_date"]:
+                with profiler.measure("overlay"):
+                    frame = print_text_list(
+                        img=frame,
+                        tex_list=[date],
+                        color=(255, 255, 255),
+                        orig=(10, 25),
+                        fontScale=0.5,
+                        y_jump=23,
+                    )
+            video_writer.write(img=frame)
+            frames += 1
+    except BaseException:
+        # ffmpeg is not left running, and the truncated segment is removed
+        try:
+            video_writer.close()
+        except Exception:
+            pass
+        if os.path.isfile(video_writer.file_dir):
+            os.remove(video_writer.file_dir)
+        raise
+    video_writer.close()
+
+    return frames, results, profiler.pop_samples()
+
+
+def _get_tasks(images: list, landmarks_cache: LandmarksCache = None) -> list:
+    """! Get the images to export with their landmarks from the cache,
+    missing files and files without a face in the cache are skipped
+    @param images 'list' dataset Image objects in timestamp order
+    @param landmarks_cache 'LandmarksCache' cache to look up landmarks,
+        None to always predict
+    @return _ 'list' (Image, shape) tuples, shape is None if it has to be
+        predicted
+    """
+
+    tasks = []
+    for image in images:
+        if not image.isfile:
+            printlog(
+                msg=f"skyping image {image.name}, file no found",
+                msg_type="WARN",
+            )
+            profiler.skip(reason="missing file")
+            continue
+
+        shape = None
+        if landmarks_cache is not None:
+            found, shape = landmarks_cache.get(
+                path=image.path, size=image.size, mtime=image.modified_date_stamp
+            )
+            # Files without a face are skipped without loading them
+            if found and shape is None:
+                profiler.skip(reason="no face")
+                continue
+        tasks.append((image, shape))
+
+    return tasks
+
+
+def _get_runs(tasks: list, workers: int) -> list:
+    """! Splits the tasks in runs of consecutive images for the workers,
+    small enough to share the work between them
+    @param tasks 'list' tasks in timestamp order
+    @param workers 'int' number of worker processes
+    @return _ 'list' lists of consecutive tasks
+    """
+    length = max(1, min(8, len(tasks) // (workers * 4)))
+    return [tasks[idx : idx + length] for idx in range(0, len(tasks), length)]
+
+
+def _put_result(
+    image: Image,
+    found: bool,
+    shape,
+    upsample,
+    error: str,
+    landmarks_cache: LandmarksCache = None,
+    face_detector: FaceDetector = None,
+) -> bool:
+    """! Saves in this process the result of a worker for an image: the
+    landmarks in the cache, the detection in the detector report and the
+    skipped images in the profiler
+    @param image 'Image' dataset image
+    @param found 'bool' whether the worker got a frame of the image
+    @param shape 'np.array' normalized landmarks predicted by the worker
+    @param upsample 'int' upsample the face was found with, as in
+        _export_run
+    @param error 'string' error message of the worker, if any
+    @param landmarks_cache 'LandmarksCache' cache to save the landmarks in
+    @param face_detector 'FaceDetector' detector to count the detection in
+    @return _ 'bool' whether the image has a frame
+    """
+
+    if face_detector is not None and upsample != "cache":
+        face_detector.count_detection(upsample=upsample)
+    if error is not None:
+        printlog(
+            msg=f"skyping image {image.name}, error:{error}",
+            msg_type="ERROR",
+        )
+        profiler.skip(reason="exception")
+        return False
+
+    if landmarks_cache is not None and (shape is not None or not found):
+        landmarks_cache.put(
+            path=image.path,
+            size=image.size,
+            mtime=image.modified_date_stamp,
+            value=shape,
+        )
+
+    if not found:
+        profiler.skip(reason="no face")
+    return found
+
+
+def export_frames_parallel(
+    images: list,
+    predictor_path: str,
+    settings: dict,
+    workers: int,
+    landmarks_cache: LandmarksCache = None,
+    face_detector: FaceDetector = None,
+    progress: bool = False,
+):
+    """! Generator that distributes the exportation of dataset images
+    across a pool of worker processes. Frames are yielded in the same
+    order of the images list
+    @param images 'list' dataset Image objects in timestamp order
+    @param predictor_path 'string' absolute path to the landmarks weights
+    @param settings 'dict' exportation settings (size, exp_gray, exp_visuals,
+        detector_args, and aligned to get (frame, landmarks) frames with the
+        landmarks in the aligned frame)
+    @param workers 'int' number of worker processes
+    @param landmarks_cache 'LandmarksCache' cache to look up and to save
+        landmarks, None to always predict
+    @param face_detector 'FaceDetector' detector to count in its report the
+        detections done by the workers
+    @param progress 'bool' show a progress bar
+    @return _ 'generator' of (Image, frame) tuples
+    """
+
+    # Look up in the cache in this process, so workers don't write it
+    tasks = _get_tasks(images=images, landmarks_cache=landmarks_cache)
+
+    printlog(
+        msg=f"exporting {len(tasks)} images with {workers} workers",
+        msg_type="INFO",
+    )
+
+    # spawn instead of fork, forking a process with GUI threads is not safe
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(
+        processes=workers,
+        initializer=_init_worker,
+        initargs=(predictor_path, settings),
+    ) as pool:
+        # Every worker gets runs of consecutive images, so the tracking and
+        # the previous face selection follow the previous image
+        runs = _get_runs(tasks=tasks, workers=workers)
+        results = pool.imap(
+            _export_run, [[(image.path, shape) for image, shape in run] for run in runs]
+        )
+        progress_bar = tqdm(total=len(tasks)) if progress else None
+
+        for run, (run_results, samples) in zip(runs, results):
+            profiler.merge(samples=samples)
+            if progress_bar is not None:
+                progress_bar.update(len(run))
+            for (image, _), (frame, shape, upsample, error) in zip(run, run_results):
+                if _put_result(
+                    image=image,
+                    found=frame is not None,
+                    shape=shape,
+                    upsample=upsample,
+                    error=error,
+                    landmarks_cache=landmarks_cache,
+                    face_detector=face_detector,
+                ):
+                    yield image, frame
+
+        if progress_bar is not None:
+            progress_bar.close()
+
+
+def export_segments_parallel(
+    segments: list,
+    predictor_path: str,
+    settings: dict,
+    workers: int,
+    landmarks_cache: LandmarksCache = None,
+    face_detector: FaceDetector = None,
+    progress: bool = False,
+) -> list:
+    """! Distributes the exportation of chunks of dataset images across a
+    pool of worker processes, every worker renders and encodes the images
+    of a chunk to its own video segment, so the encoding scales with the
+    workers too
+    @param segments 'list' (file_path, file_name, images) folder and name
+        of the segment video file and its dataset Image objects, in
+        timestamp order
+    @param predictor_path 'string' absolute path to the landmarks weights
+    @param settings 'dict' exportation settings (size, exp_gray, exp_visuals,
+        exp_date, detector_args, and video with the FFmpegVideoWriter
+        rate, codec, crf and preset)
+    @param workers 'int' number of worker processes
+    @param landmarks_cache 'LandmarksCache' cache to look up and to save
+        landmarks, None to always predict
+    @param face_detector 'FaceDetector' detector to count in its report the
+        detections done by the workers
+    @param progress 'bool' show a progress bar
+    @return _ 'list' number of frames of every segment, segments without
+        frames have no video file
+    """
+
+    # Look up in the cache in this process, so workers don't write it
+    segments = [
+        (
+            file_path,
+            file_name,
+            _get_tasks(images=images, landmarks_cache=landmarks_cache),
+        )
+        for file_path, file_name, images in segments
+    ]
+
+    printlog(
+        msg=f"exporting {len(segments)} video segments with {workers} workers",
+        msg_type="INFO",
+    )
+
+    # spawn instead of fork, forking a process with GUI threads is not safe
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(
+        processes=min(workers, max(1, len(segments))),
+        initializer=_init_worker,
+        initargs=(predictor_path, settings),
+    ) as pool:
+        results = pool.imap(
+            _export_segment,
+            [
+                (
+                    file_path,
+                    file_name,
+                    [
+                        (image.path, shape, str(image.modified_date))
+                        for image, shape in tasks
+                    ],
+                )
+                for file_path, file_name, tasks in segments
+            ],
+        )
+        if progress:
+            results = tqdm(results, total=len(segments))
+
+        frames = []
+        for (_, _, tasks), (segment_frames, segment_results, samples) in zip(
+            segments, results
+        ):
+            profiler.merge(samples=samples)
+            for (image, _), (found, shape, upsample, error) in zip(
+                tasks, segment_results
+            ):
+                _put_result(
+                    image=image,
+                    found=found,
+                    shape=shape,
+                    upsample=upsample,
+                    error=error,
+                    landmarks_cache=landmarks_cache,
+                    face_detector=face_detector,
+                )
+            frames.append(segment_frames)
+
+    return frames
+
+
+def analyze_parallel(
+    images: list,
+    predictor_path: str,
+    settings: dict,
+    workers: int,
+    landmarks_cache: LandmarksCache = None,
+    face_detector: FaceDetector = None,
+    progress: bool = False,
+):
+    """! Generator that distributes the landmarks prediction of dataset
+    images across a pool of worker processes, images are not rendered.
+    Landmarks in the cache are not predicted again
+    @param images 'list' dataset Image objects
+    @param predictor_path 'string' absolute path to the landmarks weights
+    @param settings 'dict' exportation settings (size, detector_args)
+    @param workers 'int' number of worker processes
+    @param landmarks_cache 'LandmarksCache' cache to look up and to save
+        landmarks, None to always predict
+    @param face_detector 'FaceDetector' detector to count in its report the
+        detections done by the workers
+    @param progress 'bool' show a progress bar
+    @return _ 'generator' of (Image, shape) tuples with the normalized
+        landmarks of the images with a face, in timestamp order
+    """
+
+    # Look up in the cache in this process, so workers don't write it
+    tasks = _get_tasks(images=images, landmarks_cache=landmarks_cache)
+    misses = sum(shape is None for _, shape in tasks)
+
+    printlog(
+        msg=f"analyzing {misses} images with {workers} workers",
+        msg_type="INFO",
+    )
+    if not misses:
+        for image, shape in tasks:
+            yield image, shape
+        return
+
+    # spawn instead of fork, forking a process with GUI threads is not safe
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(
+        processes=workers,
+        initializer=_init_worker,
+        initargs=(predictor_path, settings),
+    ) as pool:
+        # Images with cached landmarks go to the workers too, without
+        # loading them, so the tracking and the previous face selection
+        # follow the previous image
+        runs = _get_runs(tasks=tasks, workers=workers)
+        results = pool.imap(
+            _analyze_run,
+            [[(image.path, shape) for image, shape in run] for run in runs],
+        )
+        if progress:
+            results = tqdm(results, total=len(runs))
+
+        for run, (run_results, samples) in zip(runs, results):
+            profiler.merge(samples=samples)
+            for (image, cached_shape), (shape, upsample, error) in zip(
+                run, run_results
+            ):
+                if cached_shape is not None:
+                    yield image, cached_shape
+                elif _put_result(
+                    image=image,
+                    found=shape is not None,
+                    shape=shape,
+                    upsample=upsample,
+                    error=error,
+                    landmarks_cache=landmarks_cache,
+                    face_detector=face_detector,
+                ):
+                    yield image, shape
+
+
+def export_frames_transformed(
+    tasks: list,
+    settings: dict,
+    workers: int,
+    progress: bool = False,
+):
+    """! Generator that distributes the rendering of dataset images with
+    their transformations already computed across a pool of worker
+    processes. Workers don't load the face detector. Frames are yielded in
+    the same order of the tasks list
+    @param tasks 'list' (Image, M_face, shape) dataset images in timestamp
+        order with their (3, 3) transformations, and their (68, 2) aligned
+        landmarks to draw visuals, None for no visuals
+    @param settings 'dict' exportation settings (size, exp_gray)
+    @param workers 'int' number of worker processes
+    @param progress 'bool' show a progress bar
+    @return _ 'generator' of (Image, frame) tuples
+    """
+
+    printlog(
+        msg=f"rendering {len(tasks)} images with {workers} workers",
+        msg_type="INFO",
+    )
+
+    # spawn instead of fork, forking a process with GUI threads is not safe
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(
+        processes=workers,
+        initializer=_init_render_worker,
+        initargs=(settings,),
+    ) as pool:
+        results = pool.imap(
+            _render_transformed,
+            [(image.path, M_face, shape) for image, M_face, shape in tasks],
+            chunksize=max(1, min(8, len(tasks) // (workers * 4))),
+        )
+        if progress:
+            results = tqdm(results, total=len(tasks))
+
+        for (image, _, _), (frame, error, samples) in zip(tasks, results):
+            profiler.merge(samples=samples)
+            if error is not None:
+                printlog(
+                    msg=f"skyping image {image.name}, error:{error}",
+                    msg_type="ERROR",
+                )
+                profiler.skip(reason="exception")
+                continue
+            yield image, frame
+
+
+# =============================================================================
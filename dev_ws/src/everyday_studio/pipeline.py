@@ -0,0 +1,178 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import queue
+import threading
+
+from tqdm import tqdm
+
+from file_utils import Image
+from utils import printlog, profiler
+
+# Item to let the next stage know that there's no more data
+_END = object()
+
+# =============================================================================
+# CLASSES - CLASSES - CLASSES - CLASSES - CLASSES - CLASSES  - CLASSES - CLASSE
+# =============================================================================
+class ExportPipeline:
+    def __init__(
+        self,
+        images: list,
+        size: tuple,
+        process,
+        queue_size: int = 8,
+        progress: bool = False,
+        resize: bool = True,
+    ) -> None:
+        """!
+        Constructor for ExportPipeline class instances. The pipeline runs
+        the decoding and the face detection/alignment of dataset images in
+        their own threads, connected by bounded queues, so disk reads,
+        inference and the consumer (video encoding) overlap. A full queue
+        blocks the stage feeding it, so memory is bounded by the queues
+        size and not by the dataset size.
+        @param images 'list' dataset Image objects in timestamp order
+        @param size 'tuple' (width, height) to resize images when decoded
+        @param process 'function' callable(image, img) returning the aligned
+            frame for a decoded image, or None to skip it
+        @param queue_size 'int' maximum number of images waiting between stages
+        @param progress 'bool' show a progress bar
+        @param resize 'bool' give process the image resized to size, False
+            if process only samples the loaded image
+        """
+
+        self.images = images
+        self.size = size
+        self.process = process
+        self.progress = progress
+        self.resize = resize
+
+        self._decoded = queue.Queue(maxsize=queue_size)
+        self._processed = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._decode_stage, daemon=True),
+            threading.Thread(target=self._process_stage, daemon=True),
+        ]
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """!
+        Puts an item in a queue, waiting while the queue is full
+        @param q 'queue.Queue' queue to put the item in
+        @param item '_' item to put in the queue
+        @return _ 'bool' False if the pipeline was stopped while waiting
+        """
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode_stage(self) -> None:
+        """!
+        Reads and resizes dataset images, feeding the process stage
+        """
+
+        iterator = tqdm(self.images) if self.progress else self.images
+        for image in iterator:
+            if self._stop.is_set():
+                return
+            if not image.isfile:
+                printlog(
+                    msg=f"skyping image {image.name}, file no found",
+                    msg_type="WARN",
+                )
+                profiler.skip(reason="missing file")
+                continue
+
+            # A new Image is created to not keep the original size data in
+            # the dataset, it's passed to the process stage to sample the
+            # aligned frame straight from it
+            try:
+                image = Image(path=image.path)
+                image.load(print_info=False, size=self.size)
+                img = image.get_data(size=self.size if self.resize else ())
+            except Exception as e:
+                printlog(
+                    msg=f"skyping image {image.name}, error:{e}",
+                    msg_type="ERROR",
+                )
+                profiler.skip(reason="exception")
+                continue
+            if img is None:
+                profiler.skip(reason="no data")
+                continue
+            if not self._put(self._decoded, (image, img)):
+                return
+
+        self._put(self._decoded, _END)
+
+    def _process_stage(self) -> None:
+        """!
+        Detects and aligns decoded images, feeding the pipeline output
+        """
+
+        while not self._stop.is_set():
+            try:
+                item = self._decoded.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _END:
+                break
+
+            image, img = item
+            try:
+                frame = self.process(image, img)
+            except Exception as e:
+                printlog(
+                    msg=f"skyping image {image.name}, error:{e}",
+                    msg_type="ERROR",
+                )
+                profiler.skip(reason="exception")
+                continue
+            if frame is None:
+                profiler.skip(reason="no face")
+
+            if frame is not None and not self._put(self._processed, (image, frame)):
+                return
+
+        self._put(self._processed, _END)
+
+    def __iter__(self):
+        """!
+        Starts the pipeline stages and yields its results
+        @return _ 'generator' of (Image, frame) tuples in timestamp order
+        """
+
+        for thread in self._threads:
+            thread.start()
+
+        try:
+            while True:
+                item = self._processed.get()
+                if item is _END:
+                    break
+                yield item
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """!
+        Stops the pipeline stages
+        """
+        self._stop.set()
+        for thread in self._threads:
+            if thread.is_alive():
+                thread.join()
+
+
+# =============================================================================
@@ -0,0 +1,196 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from cache import QualityCache
+from file_utils import read_image_info
+from utils import printlog, profiler
+
+# =============================================================================
+# CLASSES - CLASSES - CLASSES - CLASSES - CLASSES - CLASSES  - CLASSES - CLASSE
+# =============================================================================
+class QualityGate:
+    # width of the thumbnail the images are measured in, so the sharpness
+    # doesn't depend on the image size
+    THUMBNAIL_WIDTH = 160
+
+    def __init__(
+        self,
+        cache: QualityCache = None,
+        min_sharpness: float = 15.0,
+        min_luminance: float = 30.0,
+        max_luminance: float = 225.0,
+        max_clipping: float = 0.6,
+    ) -> None:
+        """!
+        Constructor for QualityGate class instances. The gate measures the
+        images in a gray scale thumbnail, decoded at the smallest JPEG scale,
+        to skip the blurry, dark or blown-out images before decoding them in
+        full size and looking for their faces
+        @param cache 'QualityCache' cache for the images measures, None to
+            measure the images every time
+        @param min_sharpness 'float' minimum variance of the thumbnail
+            Laplacian, 0 to accept blurry images
+        @param min_luminance 'float' minimum mean luminance [0-255]
+        @param max_luminance 'float' maximum mean luminance [0-255]
+        @param max_clipping 'float' maximum fraction of pixels in the
+            darkest and brightest histogram bins, 1 to accept any
+        """
+
+        self.cache = cache
+        self.min_sharpness = min_sharpness
+        self.min_luminance = min_luminance
+        self.max_luminance = max_luminance
+        self.max_clipping = max_clipping
+
+    def check(self, measures: tuple) -> str:
+        """!
+        Get the verdict of the measures of an image
+        @param measures 'tuple' (sharpness, luminance, clipping) measures
+        @return _ 'string' reason to skip the image: blurry, dark, bright or
+            clipped, None if the image passes the gate
+        """
+
+        sharpness, luminance, clipping = measures
+        if luminance < self.min_luminance:
+            return "dark"
+        elif luminance > self.max_luminance:
+            return "bright"
+        elif clipping > self.max_clipping:
+            return "clipped"
+        elif sharpness < self.min_sharpness:
+            return "blurry"
+        return None
+
+    def get_measures(self, image) -> tuple:
+        """!
+        Get the quality measures of an image, from the cache if it's there
+        @param image 'Image' dataset image
+        @return _ 'tuple' (sharpness, luminance, clipping) measures, None if
+            the image can't be decoded
+        """
+
+        if self.cache is not None:
+            found, measures = self.cache.get(
+                path=image.path, size=image.size, mtime=image.modified_date_stamp
+            )
+            if found:
+                return measures
+
+        with profiler.measure("quality"):
+            measures = measure_quality(
+                img_gray=load_thumbnail(path=image.path, width=self.THUMBNAIL_WIDTH)
+            )
+        if measures is not None and self.cache is not None:
+            self.cache.put(
+                path=image.path,
+                size=image.size,
+                mtime=image.modified_date_stamp,
+                value=measures,
+            )
+        return measures
+
+    def filter(self, images: list) -> list:
+        """!
+        Skips the images that don't pass the gate, missing files and images
+        that can't be decoded are kept for the exportation to report them
+        @param images 'list' dataset Image objects in timestamp order
+        @return _ 'list' Image objects that pass the gate, in the same order
+        """
+
+        passed = []
+        skipped = Counter()
+        for idx in range(len(images)):
+            image = images[idx]
+            measures = self.get_measures(image=image) if image.isfile else None
+            reason = None if measures is None else self.check(measures=measures)
+            if reason is None:
+                passed.append(image)
+            else:
+                skipped[reason] += 1
+                profiler.skip(reason=reason)
+
+        if self.cache is not None:
+            self.cache.commit()
+            printlog(msg=self.cache, msg_type="INFO")
+        printlog(
+            msg=f"quality gate skipped {sum(skipped.values())} of {len(images)} "
+            + "images"
+            + (f" ({dict(skipped)})" if skipped else ""),
+            msg_type="INFO",
+        )
+        return passed
+
+    def __str__(self):
+        """!
+        Get object instace string for printings
+        @return str_ 'string' string with object instance info
+        """
+        return (
+            f"quality gate, sharpness>={self.min_sharpness}, luminance "
+            + f"{self.min_luminance}-{self.max_luminance}, "
+            + f"clipping<={self.max_clipping}"
+        )
+
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def load_thumbnail(path: str, width: int) -> np.array:
+    """! Decodes a gray scale thumbnail of an image, JPEG images are decoded
+    at the smallest scale (1/2, 1/4, 1/8) that is still bigger than it
+    @param path 'string' absolute path to the image file
+    @param width 'int' thumbnail width, the height keeps the image aspect
+        ratio
+    @return _ 'np.array' gray scale thumbnail, None if the image can't be
+        decoded
+    """
+
+    flag = cv2.IMREAD_GRAYSCALE
+    if path.lower().endswith((".jpg", ".jpeg")):
+        size = read_image_info(path)[:2]
+        for factor, reduced_flag in (
+            (8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+            (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+            (2, cv2.IMREAD_REDUCED_GRAYSCALE_2),
+        ):
+            if min(size) // factor >= width:
+                flag = reduced_flag
+                break
+
+    img = cv2.imread(path, flag)
+    if img is None:
+        return None
+    height = max(1, round(img.shape[0] * width / img.shape[1]))
+    return cv2.resize(img, (width, height), interpolation=cv2.INTER_AREA)
+
+
+def measure_quality(img_gray: np.array) -> tuple:
+    """! Measures the quality of an image
+    @param img_gray 'np.array' gray scale image, a thumbnail
+    @return _ 'tuple' (sharpness, luminance, clipping): variance of the
+        Laplacian, mean luminance, and fraction of pixels in the darkest and
+        brightest histogram bins. None if there's no image
+    """
+
+    if img_gray is None:
+        return None
+    hist = cv2.calcHist([img_gray], [0], None, [256], [0, 256]).ravel()
+    return (
+        float(cv2.Laplacian(img_gray, cv2.CV_64F).var()),
+        float(img_gray.mean()),
+        float((hist[:6].sum() + hist[250:].sum()) / img_gray.size),
+    )
+
+
+# =============================================================================
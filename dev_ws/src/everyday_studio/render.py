@@ -0,0 +1,322 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import math
+
+import cv2
+import numpy as np
+
+from face import Face, FaceDetector, draw_landmarks
+from utils import profiler
+
+# Distance in pixels between the eyes outer corners that keeps the face size
+# in the aligned images, for images EYES_REFERENCE_WIDTH pixels wide. It's
+# scaled to the width of the image aligned, so the zoom doesn't depend on
+# the image resolution
+EYES_REFERENCE = 150.0
+EYES_REFERENCE_WIDTH = 640
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def get_face_transform(face: Face, size: tuple) -> np.array:
+    """!
+    Get the transformation to center and align a image respect to a face
+    components: a translation of the nose to the image center, then a
+    rotation and scaling to level and size the eyes
+    @param face 'Face' face components to align image
+    @param size 'tuple' (width, height) of the image where face was found,
+        also the size of the aligned image
+    @return M '(3, 3) np.array' homogeneous affine transformation matrix
+    """
+
+    # ------------------------------------------------------------------
+    # Center image
+    nose = face.nose[2]
+    dx = size[0] // 2 - int(nose[0])
+    dy = size[1] // 2 - int(nose[1])
+    cnt_pt = (size[0] // 2, size[1] // 2)
+    T = np.float64(
+        [
+            [1, 0, dx],
+            [0, 1, dy],
+            [0, 0, 1],
+        ]
+    )
+
+    # ------------------------------------------------------------------
+    # Calculate angle to rate, from the right eye outer corner to the left
+    # eye outer corner
+    eyes_x, eyes_y = (face.left_eye[3] - face.right_eye[0]).tolist()
+    angle = math.degrees(math.atan2(eyes_y, eyes_x))
+
+    # Calculate resizing factor
+    len_scale = math.hypot(eyes_x, eyes_y)
+    reference = EYES_REFERENCE * size[0] / EYES_REFERENCE_WIDTH
+    scale = 1.0 + (1.0 - len_scale / reference)
+
+    # Find trans formation matrix
+    R = np.vstack(
+        [cv2.getRotationMatrix2D(center=cnt_pt, angle=angle, scale=scale), [0, 0, 1]]
+    )
+
+    return R @ T
+
+
+def get_face_img_corrected(
+    img: np.array,
+    face: Face,
+    face_detector: FaceDetector,
+    exp_gray: bool = False,
+    visuals: bool = False,
+    size: tuple = None,
+) -> np.array:
+    """!
+    Center and align a image respect to a face components. Resizing,
+    centering, rotation and scaling are composed in a single affine
+    transformation, so the result is sampled only once from img
+    @param img 'np.array' image to center and align, it can be the
+        original size image data
+    @param face 'Face' face components to align image
+    @param face_detector 'FaceDetector' detector to draw face visuals
+    @param exp_gray 'bool' export result in gray scale
+    @param visuals 'bool' print visuals in image result
+    @param size 'tuple' (width, height) of the image where face was found,
+        also the size of the result. If None img size is used
+    @return img 'np.array' image centered and aligned respect with face
+    """
+
+    size = (img.shape[1], img.shape[0]) if size is None else tuple(size)
+    M_face = get_face_transform(face=face, size=size)
+
+    return apply_face_transform(
+        img=img,
+        M_face=M_face,
+        size=size,
+        exp_gray=exp_gray,
+        face=get_aligned_face(face=face, size=size, M_face=M_face)
+        if visuals
+        else None,
+        face_detector=face_detector,
+    )
+
+
+def apply_face_transform(
+    img: np.array,
+    M_face: np.array,
+    size: tuple,
+    exp_gray: bool = False,
+    face: Face = None,
+    face_detector: FaceDetector = None,
+) -> np.array:
+    """!
+    Center and align a image with a transformation already computed.
+    Resizing, centering, rotation and scaling are composed in a single
+    affine transformation, so the result is sampled only once from img
+    @param img 'np.array' image to center and align, it can be the
+        original size image data
+    @param M_face '(3, 3) np.array' transformation from get_face_transform
+        or get_face_transforms, for images of the given size
+    @param size 'tuple' (width, height) of the result
+    @param exp_gray 'bool' export result in gray scale
+    @param face 'Face' face components in the aligned image, to print
+        visuals in image result, None for no visuals
+    @param face_detector 'FaceDetector' detector to draw face visuals, if
+        None they are drawn without it
+    @return img 'np.array' image centered and aligned
+    """
+
+    src_size = (img.shape[1], img.shape[0])
+    size = tuple(size)
+
+    # ------------------------------------------------------------------
+    # Resize (keeping pixel centers as cv2.resize does), center and align image
+    sx, sy = size[0] / src_size[0], size[1] / src_size[1]
+    M_size = np.float64(
+        [
+            [sx, 0, 0.5 * (sx - 1.0)],
+            [0, sy, 0.5 * (sy - 1.0)],
+            [0, 0, 1],
+        ]
+    )
+    with profiler.measure("alignment"):
+        img = cv2.warpAffine(img, (M_face @ M_size)[:2], size)
+
+        # --------------------------------------------------------------
+        img = (
+            img
+            if not exp_gray
+            else cv2.cvtColor(
+                cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR
+            )
+        )
+
+    if face is None:
+        return img
+
+    # Draw visuals after warping, with the landmarks transformed
+    return draw_face_visuals(img=img, face=face, face_detector=face_detector)
+
+
+def get_face_transforms(
+    shapes: np.array, size: tuple, eyes_distance: float = None, normalized: bool = False
+) -> tuple:
+    """!
+    Get the transformations to center and align images respect to their
+    faces, for many faces at once: a translation of the nose to the image
+    center, then a rotation and scaling to level the eyes and size them to
+    the same distance
+    @param shapes '(N, 68, 2) np.array' landmarks of the faces, in pixels
+        of images of the given size. NaN for images without face
+    @param size 'tuple' (width, height) of the images, also the size of the
+        aligned images
+    @param eyes_distance 'float' distance in pixels between the eyes outer
+        corners in the aligned images, None for the median of the faces
+    @param normalized 'bool' landmarks are in [0, 1] coordinates instead of
+        pixels, as in the landmarks cache
+    @return _ 'tuple' (M, eyes_distance) (N, 3, 3) homogeneous affine
+        transformation matrices, NaN for images without face, and the eyes
+        distance used
+    """
+
+    # only the landmarks of the nose and eyes are read, shapes can be a
+    # memory-mapped file
+    shapes = np.asanyarray(shapes)
+    scale = np.float64(size) if normalized else 1.0
+    nose = np.asarray(shapes[:, Face.NOSE.start + 2], dtype=np.float64) * scale
+    eyes = (
+        np.asarray(shapes[:, Face.LEFT_EYE.start + 3], dtype=np.float64)
+        - np.asarray(shapes[:, Face.RIGHT_EYE.start], dtype=np.float64)
+    ) * scale
+    distances = np.hypot(eyes[:, 0], eyes[:, 1])
+    if eyes_distance is None:
+        eyes_distance = (
+            float(np.nanmedian(distances)) if np.isfinite(distances).any() else 1.0
+        )
+
+    # Rotation and scaling around the image center, as cv2.getRotationMatrix2D
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scales = eyes_distance / distances
+    angles = np.arctan2(eyes[:, 1], eyes[:, 0])
+    alpha = scales * np.cos(angles)
+    beta = scales * np.sin(angles)
+    cx, cy = size[0] // 2, size[1] // 2
+
+    # Composed with the translation of the nose to the center
+    dx = cx - nose[:, 0]
+    dy = cy - nose[:, 1]
+    M = np.zeros((len(shapes), 3, 3))
+    M[:, 0, 0] = alpha
+    M[:, 0, 1] = beta
+    M[:, 1, 0] = -beta
+    M[:, 1, 1] = alpha
+    M[:, 0, 2] = alpha * dx + beta * dy + (1 - alpha) * cx - beta * cy
+    M[:, 1, 2] = -beta * dx + alpha * dy + beta * cx + (1 - alpha) * cy
+    M[:, 2, 2] = 1.0
+
+    return M, eyes_distance
+
+
+def get_aligned_face(face: Face, size: tuple, M_face: np.array = None) -> Face:
+    """!
+    Get the face landmarks in the image centered and aligned respect to it
+    @param face 'Face' face components in the image of the given size
+    @param size 'tuple' (width, height) of the image where face was found
+    @param M_face '(3, 3) np.array' transformation from get_face_transform,
+        computed if None
+    @return _ 'Face' face components in the aligned image
+    """
+
+    M_face = get_face_transform(face=face, size=size) if M_face is None else M_face
+    shape = cv2.transform(np.float64([face.shape]), M_face[:2])[0]
+    return Face(shape=np.rint(shape).astype(int))
+
+
+def draw_face_visuals(
+    img: np.array, face: Face, face_detector: FaceDetector = None
+) -> np.array:
+    """!
+    Draws the face landmarks, eyes line and image center in an aligned image
+    @param img 'np.array' aligned image to draw in
+    @param face 'Face' face components in the aligned image
+    @param face_detector 'FaceDetector' detector to draw face landmarks, if
+        None they are drawn without it
+    @return img 'np.array' image with the visuals
+    """
+
+    with profiler.measure("overlay"):
+        img = (
+            draw_landmarks(img=img, face=face)
+            if face_detector is None
+            else face_detector.visualize_landmarks(img=img, face=face)
+        )
+        cv2.line(
+            img,
+            tuple(face.left_eye[3].tolist()),
+            tuple(face.right_eye[0].tolist()),
+            (255, 255, 255),
+            1,
+        )
+        cv2.circle(img, (img.shape[1] // 2, img.shape[0] // 2), 1, (0, 0, 255), -1)
+
+    return img
+
+
+def get_rendition_img(
+    img: np.array,
+    face: Face,
+    face_detector: FaceDetector,
+    size: tuple,
+    exp_gray: bool = False,
+    visuals: bool = False,
+) -> np.array:
+    """!
+    Get a rendition of an aligned image, the biggest centered crop with the
+    aspect ratio of the rendition is resized to its size. The rendition is
+    always a new image, the aligned image is shared by all renditions
+    @param img 'np.array' aligned image in color and without visuals
+    @param face 'Face' face components in the aligned image
+    @param face_detector 'FaceDetector' detector to draw face visuals
+    @param size 'tuple' (width, height) of the rendition
+    @param exp_gray 'bool' rendition in gray scale
+    @param visuals 'bool' print visuals in the rendition
+    @return img 'np.array' rendition image
+    """
+
+    src_size = (img.shape[1], img.shape[0])
+    size = tuple(size)
+    with profiler.measure("rendition"):
+        scale = min(src_size[0] / size[0], src_size[1] / size[1])
+        x0 = (src_size[0] - round(size[0] * scale)) // 2
+        y0 = (src_size[1] - round(size[1] * scale)) // 2
+        if size != src_size:
+            img = cv2.resize(
+                img[y0 : src_size[1] - y0, x0 : src_size[0] - x0],
+                size,
+                interpolation=cv2.INTER_AREA,
+            )
+        elif not exp_gray:
+            img = img.copy()
+        if exp_gray:
+            img = cv2.cvtColor(
+                cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR
+            )
+
+    if not visuals:
+        return img
+
+    shape = (face.shape - (x0, y0)) / scale
+    return draw_face_visuals(
+        img=img,
+        face=Face(shape=np.rint(shape).astype(int)),
+        face_detector=face_detector,
+    )
+
+
+# =============================================================================
@@ -0,0 +1,144 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import math
+
+from capture import FFmpegVideoWriter
+
+# =============================================================================
+# CLASSES - CLASSES - CLASSES - CLASSES - CLASSES - CLASSES  - CLASSES - CLASSE
+# =============================================================================
+class Rendition:
+    def __init__(
+        self,
+        name: str,
+        size: tuple,
+        codec: str = "h264",
+        crf: int = 23,
+        gray: bool = False,
+        visuals: bool = False,
+        date: bool = False,
+    ) -> None:
+        """!
+        Constructor for Rendition class instances, an output video of the
+        exportation with its own size, encoder and rendering settings
+        @param name 'string' rendition name, added to the video file name
+        @param size 'tuple' (width, height) of the video
+        @param codec 'string' ffmpeg video codec, h264 or h265
+        @param crf 'int' encoder constant rate factor
+        @param gray 'bool' video in gray scale
+        @param visuals 'bool' print face visuals in the video
+        @param date 'bool' print the images date in the video
+        """
+
+        self.name = name
+        self.size = tuple(size)
+        self.codec = codec
+        self.crf = crf
+        self.gray = gray
+        self.visuals = visuals
+        self.date = date
+
+    def get_video_writer(
+        self, file_path: str, file_name: str, rate: int, preset: str
+    ) -> FFmpegVideoWriter:
+        """!
+        Creates the video writer of the rendition
+        @param file_path 'string' path to write the video
+        @param file_name 'string' exportation video name, the rendition
+            name is added to it
+        @param rate 'int' video rate
+        @param preset 'string' ffmpeg encoder preset
+        @return _ 'FFmpegVideoWriter' video writer
+        """
+        return FFmpegVideoWriter(
+            file_path=file_path,
+            file_name=f"{file_name}_{self.name}",
+            rate=rate,
+            codec={"h264": "libx264", "h265": "libx265"}.get(self.codec, self.codec),
+            crf=self.crf,
+            preset=preset,
+        )
+
+    def __str__(self):
+        """!
+        Get object instace string for printings
+        @return str_ 'string' string with object instance info
+        """
+        return (
+            f"{self.name}: {self.size[0]}X{self.size[1]}, codec:{self.codec}, "
+            + f"crf:{self.crf}, gray:{self.gray}, visuals:{self.visuals}, "
+            + f"date:{self.date}"
+        )
+
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def parse_renditions(value: str, defaults: dict) -> list:
+    """! Get the renditions of a renditions list, renditions are separated
+    by spaces and their fields by colons: name, size and the options to
+    change, as in "1080p:1920x1080 preview:320x180:gray=1:codec=h265"
+    @param value 'string' renditions list
+    @param defaults 'dict' codec, crf, gray, visuals and date of the
+        renditions that don't set them
+    @return _ 'list' Rendition objects, empty if value is empty
+    """
+
+    renditions = []
+    for item in value.split():
+        fields = item.split(":")
+        if len(fields) < 2:
+            raise ValueError(f"rendition {item} has no size, use name:WIDTHxHEIGHT")
+
+        settings = dict(defaults)
+        for option in fields[2:]:
+            key, _, option_value = option.partition("=")
+            if key not in defaults or not option_value:
+                raise ValueError(
+                    f"invalid rendition option {option} in {item}, "
+                    + f"options: {', '.join(defaults)}"
+                )
+            settings[key] = option_value if key == "codec" else int(option_value)
+
+        renditions.append(
+            Rendition(
+                name=fields[0],
+                size=tuple(int(side) for side in fields[1].lower().split("x")),
+                **settings,
+            )
+        )
+
+    names = [rendition.name for rendition in renditions]
+    if len(set(names)) != len(names):
+        raise ValueError(f"renditions names are repeated: {value}")
+
+    return renditions
+
+
+
+def get_aligned_size(renditions: list) -> tuple:
+    """! Get the size images are aligned at to render the renditions: the
+    width of the widest rendition, and the height that gives every
+    rendition a crop of the whole width. As the face zoom is relative to
+    the image width, faces are sized and centered in every rendition as in
+    an exportation at its size
+    @param renditions 'list' Rendition objects
+    @return _ 'tuple' (width, height) of the aligned images
+    """
+
+    width = max(rendition.size[0] for rendition in renditions)
+    height = max(
+        math.ceil(width * rendition.size[1] / rendition.size[0])
+        for rendition in renditions
+    )
+    return width, height
+
+
+# =============================================================================
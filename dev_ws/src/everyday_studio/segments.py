@@ -0,0 +1,192 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+
+from utils import printlog
+
+
+# =============================================================================
+# CLASSES - CLASSES - CLASSES - CLASSES - CLASSES - CLASSES  - CLASSES - CLASSE
+# =============================================================================
+class SegmentsIndex:
+    def __init__(self, path: str) -> None:
+        """!
+        Constructor for SegmentsIndex class instances. The index keeps the
+        video segments of previous exportations in a folder, a segment file
+        per key with a JSON manifest of the frames of every segment, so
+        only the segments whose images or settings changed are rendered
+        @param path 'string' absolute path to the segments folder
+        """
+
+        self.path = path
+        self._manifest_path = os.path.join(self.path, "segments.json")
+
+        # Check that the segments folder exits
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+            printlog(msg=f"path {self.path} created", msg_type="WARN")
+
+        self._segments = {}
+        if os.path.isfile(self._manifest_path):
+            try:
+                with open(self._manifest_path) as file:
+                    self._segments = json.load(file)
+            except (OSError, ValueError) as e:
+                printlog(msg=f"segments manifest discarded, error:{e}", msg_type="WARN")
+
+        # keys of the current exportation, the others are removed on save
+        self._used = set()
+        self.rendered = 0
+
+    def get_file(self, key: str) -> str:
+        """!
+        @param key 'string' segment key
+        @return _ 'string' absolute path to the segment video file
+        """
+        return os.path.join(self.path, f"{key}.mp4")
+
+    def get(self, key: str) -> int:
+        """!
+        Look for a segment of previous exportations
+        @param key 'string' segment key
+        @return _ 'int' number of frames of the segment, None if there is
+            no segment for the key or its file is missing
+        """
+        self._used.add(key)
+        frames = self._segments.get(key)
+        if frames is None or (frames and not os.path.isfile(self.get_file(key))):
+            return None
+        return frames
+
+    def put(self, key: str, frames: int) -> None:
+        """!
+        Adds a segment just rendered
+        @param key 'string' segment key
+        @param frames 'int' number of frames of the segment, segments
+            without frames have no file
+        """
+        self._used.add(key)
+        self._segments[key] = frames
+        self.rendered += 1
+
+    def remove(self, key: str) -> None:
+        """!
+        Drops a segment and its file, for segments not finished
+        @param key 'string' segment key
+        """
+        self._segments.pop(key, None)
+        if os.path.isfile(self.get_file(key)):
+            os.remove(self.get_file(key))
+
+    def save(self) -> None:
+        """!
+        Removes the segments not used by the current exportation and
+        writes the manifest
+        """
+        for key in set(self._segments) - self._used:
+            self.remove(key=key)
+        with open(self._manifest_path, "w") as file:
+            json.dump(self._segments, file, indent=4)
+
+    def __len__(self) -> int:
+        return len(self._used)
+
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def split_segments(images: list) -> list:
+    """! Splits the dataset images in runs of images of the same subfolder,
+    so adding days to the last subfolder, or a new one, keeps the previous
+    segments the same
+    @param images 'list' dataset Image objects in timestamp order
+    @return _ 'list' lists of Image objects, in timestamp order
+    """
+
+    segments = []
+    folder = None
+    for image in images:
+        if not segments or os.path.dirname(image.path) != folder:
+            folder = os.path.dirname(image.path)
+            segments.append([])
+        segments[-1].append(image)
+    return segments
+
+
+def split_chunks(images: list, chunks: int) -> list:
+    """! Splits the dataset images in contiguous chunks of the same length
+    @param images 'list' dataset Image objects in timestamp order
+    @param chunks 'int' number of chunks
+    @return _ 'list' lists of Image objects, in timestamp order
+    """
+
+    length = max(1, -(-len(images) // max(1, chunks)))
+    return [
+        [images[idx] for idx in range(start, min(start + length, len(images)))]
+        for start in range(0, len(images), length)
+    ]
+
+
+def get_segment_key(images: list, settings: dict) -> str:
+    """! Get the key of a segment, it changes if any image of the segment
+    or any setting the frames depend on changes
+    @param images 'list' dataset Image objects of the segment
+    @param settings 'dict' video and rendering settings, JSON serializable
+    @return _ 'string' segment key
+    """
+
+    key = hashlib.sha1(json.dumps(settings, sort_keys=True).encode())
+    for image in images:
+        key.update(f"{image.path}|{image.size}|{image.modified_date_stamp}\n".encode())
+    return key.hexdigest()
+
+
+def concat_segments(files: list, file_dir: str, audio_path: str = None) -> None:
+    """! Concatenates video segments without encoding them again, and adds
+    the audio track
+    @param files 'list' absolute paths to the segments, in order
+    @param file_dir 'string' absolute path to the video file
+    @param audio_path 'string' absolute path to the audio track, None for
+        a video without audio
+    """
+
+    with tempfile.NamedTemporaryFile(
+        mode="w", suffix=".txt", dir=os.path.dirname(file_dir), delete=False
+    ) as file:
+        for segment in files:
+            file.write("file '{}'\n".format(segment.replace("'", "'\\''")))
+
+    command = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y"]
+    command += ["-f", "concat", "-safe", "0", "-i", file.name]
+    if audio_path is not None:
+        command += ["-i", audio_path, "-map", "0:v", "-map", "1:a"]
+        command += ["-af", "apad", "-c:a", "aac", "-shortest"]
+    command += ["-c:v", "copy", "-movflags", "+faststart", file_dir]
+
+    try:
+        result = subprocess.run(command, stderr=subprocess.PIPE)
+    finally:
+        os.remove(file.name)
+    if result.returncode:
+        raise RuntimeError(
+            f"ffmpeg failed with code {result.returncode}: "
+            + result.stderr.decode(errors="replace").strip()
+        )
+    printlog(
+        msg=f"{len(files)} video segments concatenated in {file_dir}",
+        msg_type="INFO",
+    )
+
+
+# =============================================================================
@@ -0,0 +1,24 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import os
+import sys
+import types
+
+# the studio modules are imported flat, as the studio scripts do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# dlib is only used when faces are detected or landmarks predicted, an empty
+# module lets the tests of the helpers import the studio modules without it
+try:
+    import dlib  # noqa: F401
+except ImportError:
+    sys.modules["dlib"] = types.ModuleType("dlib")
+
+# =============================================================================
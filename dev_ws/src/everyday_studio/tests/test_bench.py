@@ -0,0 +1,54 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+from benchmark.bench import compare_results
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def report(**stages) -> dict:
+    """! Get a benchmark section report
+    @param stages 'dict' p50 time of every stage, in seconds
+    @return _ 'dict' section report with the stages statistics
+    """
+    return {"stages": {stage: {"p50": p50} for stage, p50 in stages.items()}}
+
+
+# =============================================================================
+# TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS
+# =============================================================================
+def test_compare_results_regression():
+    regressions = compare_results(
+        results={"export": report(decode=0.013, detect=0.050)},
+        baseline={"export": report(decode=0.010, detect=0.048)},
+        tolerance=0.2,
+    )
+    assert regressions == ["export/decode: p50 10.00ms -> 13.00ms (+30%)"]
+
+
+def test_compare_results_within_tolerance():
+    assert not compare_results(
+        results={"export": report(decode=0.011)},
+        baseline={"export": report(decode=0.010)},
+        tolerance=0.2,
+    )
+
+
+def test_compare_results_without_baseline():
+    assert not compare_results(
+        results={
+            "export": report(decode=0.010, encode=0.020),
+            "load": report(scan=0.5),
+            "images": 200,
+        },
+        baseline={"export": report(decode=0.0)},
+    )
+
+
+# =============================================================================
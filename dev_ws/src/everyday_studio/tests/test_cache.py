@@ -0,0 +1,153 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import os
+
+import cv2
+import numpy as np
+
+from cache import DataSetIndex, LandmarksCache, denormalize_shape, normalize_shape
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def make_dataset(path) -> list:
+    """! Writes a dataset with two subfolders of images, with fixed dates
+    @param path 'pathlib.Path' dataset folder
+    @return _ 'list' absolute paths of the subfolders
+    """
+    folders = []
+    for folder in ("2020", "2021"):
+        (path / folder).mkdir(parents=True)
+        for idx in range(2):
+            file = path / folder / f"{idx}.jpg"
+            cv2.imwrite(str(file), np.zeros((30, 40, 3), np.uint8))
+            os.utime(file, (100.0 + idx, 100.0 + idx))
+        os.utime(path / folder, (100.0, 100.0))
+        folders.append(str(path / folder))
+    return folders
+
+
+# =============================================================================
+# TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS
+# =============================================================================
+def test_normalize_shape():
+    shape = np.array([[0, 0], [320, 180], [640, 360]])
+    normalized = normalize_shape(shape, (640, 360))
+    assert normalized.dtype == np.float32
+    assert np.allclose(normalized, [[0, 0], [0.5, 0.5], [1, 1]])
+
+
+def test_denormalize_shape_round_trip():
+    shape = np.random.default_rng(0).integers(0, 640, size=(68, 2))
+    normalized = normalize_shape(shape, (640, 480))
+    assert np.array_equal(denormalize_shape(normalized, (640, 480)), shape)
+
+
+def test_denormalize_shape_other_size():
+    normalized = normalize_shape(np.array([[100, 50], [639, 359]]), (640, 360))
+    assert np.array_equal(
+        denormalize_shape(normalized, (1280, 720)), [[200, 100], [1278, 718]]
+    )
+
+
+def test_dataset_index(tmp_path):
+    folders = make_dataset(tmp_path / "ds")
+    index = DataSetIndex(path=str(tmp_path / "cache" / "dataset.db"))
+
+    files = index.scan(folders=folders, extensions=(".jpg",))
+    assert index.scanned_folders == 2
+    assert sorted(row[0] for row in files[folders[0]]) == [
+        os.path.join(folders[0], "0.jpg"),
+        os.path.join(folders[0], "1.jpg"),
+    ]
+    assert files[folders[0]][0][4:] == (0.0, 40, 30)
+
+    # unchanged subfolders are not listed again, even after reopening it
+    index.close()
+    index = DataSetIndex(path=str(tmp_path / "cache" / "dataset.db"))
+    assert index.scan(folders=folders, extensions=(".jpg",)) == files
+    assert index.scanned_folders == 0
+
+    # a new file changes its subfolder date, and a missing subfolder is
+    # forgotten
+    cv2.imwrite(os.path.join(folders[1], "2.jpg"), np.zeros((30, 40, 3), np.uint8))
+    files = index.scan(folders=folders[1:], extensions=(".jpg",))
+    assert index.scanned_folders == 1
+    assert list(files) == [folders[1]] and len(files[folders[1]]) == 3
+    index.close()
+
+
+def test_dataset_index_strict(tmp_path):
+    folders = make_dataset(tmp_path / "ds")
+    path = os.path.join(folders[0], "0.jpg")
+    DataSetIndex(path=str(tmp_path / "dataset.db")).scan(folders, (".jpg",))
+
+    # a file edited in place doesn't change its subfolder date
+    cv2.imwrite(path, np.zeros((60, 80, 3), np.uint8))
+    os.utime(folders[0], (100.0, 100.0))
+
+    index = DataSetIndex(path=str(tmp_path / "dataset.db"))
+    index.scan(folders, (".jpg",))
+    assert index.scanned_folders == 0
+
+    index = DataSetIndex(path=str(tmp_path / "dataset.db"), strict=True)
+    files = index.scan(folders, (".jpg",))
+    assert index.scanned_folders == 1
+    assert [row[5:] for row in files[folders[0]] if row[0] == path] == [(80, 60)]
+    index.scan(folders, (".jpg",))
+    assert index.scanned_folders == 0
+
+
+def test_landmarks_cache_round_trip(tmp_path):
+    cache = LandmarksCache(path=str(tmp_path / "cache" / "landmarks.db"))
+    shape = np.random.default_rng(0).random((68, 2)).astype(np.float32)
+    cache.put(path="/images/0.jpg", size=1000, mtime=100.0, value=shape)
+
+    found, value = cache.get(path="/images/0.jpg", size=1000, mtime=100.0)
+    assert found and value.dtype == np.float32
+    assert np.array_equal(value, shape)
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_landmarks_cache_changed_file(tmp_path):
+    cache = LandmarksCache(path=str(tmp_path / "landmarks.db"))
+    cache.put(path="/images/0.jpg", size=1000, mtime=100.0, value=np.zeros((68, 2)))
+
+    # a file with another size or date is another image
+    assert cache.get(path="/images/0.jpg", size=1001, mtime=100.0) == (False, None)
+    assert cache.get(path="/images/0.jpg", size=1000, mtime=101.0) == (False, None)
+    assert cache.get(path="/images/1.jpg", size=1000, mtime=100.0) == (False, None)
+    assert (cache.hits, cache.misses) == (0, 3)
+
+
+def test_landmarks_cache_without_face(tmp_path):
+    cache = LandmarksCache(path=str(tmp_path / "landmarks.db"))
+    cache.put(path="/images/0.jpg", size=1000, mtime=100.0, value=None)
+
+    # an image without face is found, it's not detected again
+    assert cache.get(path="/images/0.jpg", size=1000, mtime=100.0) == (True, None)
+
+
+def test_landmarks_cache_reopen(tmp_path):
+    path = str(tmp_path / "landmarks.db")
+    shape = np.random.default_rng(1).random((68, 2)).astype(np.float32)
+    cache = LandmarksCache(path=path)
+    cache.put(path="/images/0.jpg", size=1000, mtime=100.0, value=shape)
+    cache.put(path="/images/1.jpg", size=2000, mtime=200.0, value=None)
+    cache.close()
+
+    cache = LandmarksCache(path=path)
+    found, value = cache.get(path="/images/0.jpg", size=1000, mtime=100.0)
+    assert found and np.array_equal(value, shape)
+    assert cache.get(path="/images/1.jpg", size=2000, mtime=200.0) == (True, None)
+    cache.close()
+
+
+# =============================================================================
@@ -0,0 +1,97 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+from capture import FFmpegVideoWriter
+
+# ffmpeg of the tests, it saves its arguments and the size of the images
+# streamed to it in the video file, or fails without reading them
+FFMPEG = f"""#!{sys.executable}
+import json, os, sys
+if os.getenv("FFMPEG_FAIL"):
+    sys.stderr.write("Unknown encoder 'libx265'\\n")
+    sys.exit(1)
+size = len(sys.stdin.buffer.read())
+with open(sys.argv[-1], "w") as file:
+    json.dump({{"args": sys.argv[1:], "size": size}}, file)
+"""
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+@pytest.fixture
+def ffmpeg(tmp_path, monkeypatch):
+    """! Puts the ffmpeg of the tests first in the PATH"""
+    path = tmp_path / "bin"
+    path.mkdir()
+    (path / "ffmpeg").write_text(FFMPEG)
+    (path / "ffmpeg").chmod(0o755)
+    monkeypatch.setenv("PATH", f"{path}{os.pathsep}{os.environ['PATH']}")
+
+
+def write_video(video_writer: FFmpegVideoWriter, frames: int) -> None:
+    """! Writes gray frames of 64x48 pixels and finishes the video
+    @param video_writer 'FFmpegVideoWriter' video writer
+    @param frames 'int' number of frames
+    """
+    for _ in range(frames):
+        video_writer.write(img=np.full((48, 64, 3), 128, np.uint8))
+    video_writer.close()
+
+
+# =============================================================================
+# TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS
+# =============================================================================
+def test_ffmpeg_video_writer(tmp_path, ffmpeg):
+    video_writer = FFmpegVideoWriter(
+        file_path=str(tmp_path / "export"),
+        file_name="everyday",
+        rate=24,
+        codec="libx265",
+        crf=28,
+        audio_path=str(tmp_path / "audio.mp3"),
+    )
+    write_video(video_writer=video_writer, frames=5)
+
+    # frames are streamed raw, and encoded with the audio in the same pass
+    with open(tmp_path / "export" / "everyday.mp4") as file:
+        video = json.load(file)
+    assert video["size"] == 5 * 48 * 64 * 3
+    args = " ".join(video["args"])
+    assert "-f rawvideo -pix_fmt bgr24 -s 64x48 -r 24 -i -" in args
+    assert f"-i {tmp_path / 'audio.mp3'} -map 0:v -map 1:a" in args
+    assert "-c:v libx265 -crf 28" in args
+
+
+def test_ffmpeg_video_writer_without_audio(tmp_path, ffmpeg):
+    video_writer = FFmpegVideoWriter(file_path=str(tmp_path), file_name="everyday")
+    write_video(video_writer=video_writer, frames=2)
+
+    with open(tmp_path / "everyday.mp4") as file:
+        video = json.load(file)
+    assert video["size"] == 2 * 48 * 64 * 3
+    assert "-map" not in video["args"]
+
+
+def test_ffmpeg_video_writer_error(tmp_path, ffmpeg, monkeypatch):
+    monkeypatch.setenv("FFMPEG_FAIL", "1")
+    video_writer = FFmpegVideoWriter(file_path=str(tmp_path), file_name="everyday")
+
+    # the error has the ffmpeg log, when writing or finishing the video
+    with pytest.raises(RuntimeError, match="Unknown encoder 'libx265'"):
+        write_video(video_writer=video_writer, frames=50)
+
+
+# =============================================================================
@@ -0,0 +1,105 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import os
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from cache import HashCache
+from dedupe import DuplicatesFilter, get_dhash
+from file_utils import Image
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def make_img(seed: int) -> np.array:
+    """! Get a gray scale image of smooth random blobs
+    @param seed 'int' random generator seed, the same seed gives the same image
+    @return _ 'np.array' (240, 320) image
+    """
+    img = np.random.default_rng(seed).integers(0, 255, (6, 8), np.uint8)
+    return cv2.resize(img, (320, 240), interpolation=cv2.INTER_CUBIC)
+
+
+def write_image(path, img: np.array, date: datetime) -> Image:
+    """! Writes an image file with a modification date
+    @param path 'pathlib.Path' image file path
+    @param img 'np.array' image to write
+    @param date 'datetime' modification date of the file
+    @return _ 'Image' dataset image of the file
+    """
+    cv2.imwrite(str(path), img)
+    os.utime(path, (date.timestamp(), date.timestamp()))
+    return Image(path=str(path))
+
+
+# =============================================================================
+# TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS
+# =============================================================================
+def test_get_dhash():
+    img = make_img(seed=0)
+    image_hash = get_dhash(img)
+
+    assert 0 <= image_hash < 2**64
+    assert get_dhash(img) == image_hash
+    assert get_dhash(cv2.resize(img, (160, 120))) == image_hash
+    assert bin(get_dhash(make_img(seed=1)) ^ image_hash).count("1") > 6
+    assert get_dhash(None) is None
+
+
+def test_duplicates_filter(tmp_path):
+    img = make_img(seed=0)
+    noisy = cv2.add(img, np.full_like(img, 3))
+    images = [
+        write_image(tmp_path / "a.png", img, datetime(2021, 5, 1, 12, 0, 0)),
+        write_image(tmp_path / "b.png", noisy, datetime(2021, 5, 1, 12, 1, 0)),
+        write_image(tmp_path / "c.png", make_img(1), datetime(2021, 5, 1, 12, 2, 0)),
+        write_image(tmp_path / "d.png", img, datetime(2021, 5, 1, 12, 30, 0)),
+        write_image(tmp_path / "e.png", img, datetime(2021, 5, 2, 12, 0, 0)),
+        Image(path=str(tmp_path / "missing.png")),
+    ]
+
+    passed = DuplicatesFilter(distance=6, window=600.0).filter(images)
+
+    # b is a duplicate of a, d is out of the window, e is from another day
+    assert [os.path.basename(image.path) for image in passed] == [
+        "a.png",
+        "c.png",
+        "d.png",
+        "e.png",
+        "missing.png",
+    ]
+
+
+def test_duplicates_filter_day_boundary(tmp_path):
+    img = make_img(seed=0)
+    images = [
+        write_image(tmp_path / "a.png", img, datetime(2021, 5, 1, 23, 59, 0)),
+        write_image(tmp_path / "b.png", img, datetime(2021, 5, 2, 0, 1, 0)),
+    ]
+    assert len(DuplicatesFilter(window=600.0).filter(images)) == 2
+
+
+def test_duplicates_filter_cache(tmp_path):
+    images = [
+        write_image(tmp_path / "a.png", make_img(0), datetime(2021, 5, 1, 12)),
+        write_image(tmp_path / "b.png", make_img(0), datetime(2021, 5, 1, 12, 1)),
+    ]
+    cache = HashCache(path=str(tmp_path / "cache" / "hashes.db"))
+    duplicates_filter = DuplicatesFilter(cache=cache)
+
+    assert len(duplicates_filter.filter(images)) == 1
+    assert len(duplicates_filter.filter(images)) == 1
+    assert (cache.hits, cache.misses) == (2, 2)
+    cache.close()
+
+
+# =============================================================================
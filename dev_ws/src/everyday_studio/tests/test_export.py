@@ -0,0 +1,71 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import os
+from types import SimpleNamespace
+
+import export
+from every_day_maker import Studio
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def make_studio(export_path: str, audio_path: str, exported: int) -> SimpleNamespace:
+    """! Get a studio that writes a video without any frame
+    @param export_path 'string' folder of the video, it doesn't exist
+    @param audio_path 'string' path of the audio track
+    @param exported 'int' frames the studio writes
+    @return studio 'SimpleNamespace' with the settings and methods used by
+        Studio.export
+    """
+    studio = SimpleNamespace(
+        _VIDEO_EXPORT_PREVISUALIZATION=0,
+        _VIDEO_EXPORT_INCREMENTAL=0,
+        _VIDEO_EXPORT_SEGMENTED=0,
+        _VIDEO_EXPORT_TWO_PASS=0,
+        _VIDEO_ENCODER="opencv",
+        _EXPORT_PATH=export_path,
+        _EXPORT_VIDEO_NAME="everyday",
+        _video_renditions=[],
+        _quality_gate=None,
+        _duplicates_filter=None,
+        _landmarks_cache=None,
+        _face_detector=SimpleNamespace(reset_tracking=lambda: None),
+        _video_capture=SimpleNamespace(
+            file_dir=os.path.join(export_path, "everyday.avi")
+        ),
+        _get_audio_path=lambda: audio_path,
+        _get_frames=lambda images: iter(()),
+        _write_frames=lambda frames, video_capture: exported,
+        dataset=SimpleNamespace(idx=3, data_values=[], goto_idx=lambda idx: None),
+    )
+    studio.export = lambda record_audio=True: Studio.export(studio, record_audio)
+    return studio
+
+
+# =============================================================================
+# TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS
+# =============================================================================
+def test_export_without_frames(tmp_path, monkeypatch):
+    export_path = str(tmp_path / "export")
+    audio_path = str(tmp_path / "audio.mp3")
+    studio = make_studio(export_path=export_path, audio_path=audio_path, exported=0)
+    monkeypatch.setattr(export, "Studio", lambda headless: studio)
+
+    # no report is saved and there's no video to add the audio to
+    assert export.export(record_audio=True) == 2
+    assert not os.path.exists(export_path)
+
+
+def test_export_canceled(tmp_path):
+    export_path = str(tmp_path / "export")
+    studio = make_studio(export_path=export_path, audio_path=None, exported=None)
+
+    assert studio.export(record_audio=False) is None
+    assert not os.path.exists(export_path)
@@ -0,0 +1,185 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import face
+from face import Face, FaceDetector
+
+# =============================================================================
+# CLASSES - CLASSES - CLASSES - CLASSES - CLASSES - CLASSES  - CLASSES - CLASSE
+# =============================================================================
+class Shape:
+    """!
+    Landmarks of a face, as the dlib predictor returns them
+    """
+
+    def __init__(self, shape: np.array) -> None:
+        self.num_parts = len(shape)
+        self._parts = [SimpleNamespace(x=int(x), y=int(y)) for x, y in shape]
+
+    def parts(self) -> list:
+        return self._parts
+
+
+class Rectangle:
+    """!
+    Face rectangle, as the dlib detectors return them
+    """
+
+    def __init__(self, left: int, top: int, right: int, bottom: int) -> None:
+        self.box = (left, top, right, bottom)
+
+    def left(self) -> int:
+        return self.box[0]
+
+    def top(self) -> int:
+        return self.box[1]
+
+    def right(self) -> int:
+        return self.box[2]
+
+    def bottom(self) -> int:
+        return self.box[3]
+
+
+class Backend:
+    """!
+    Face detector backend that finds a face with the upsamples given, and
+    keeps the size of the images and the upsample of every detection
+    """
+
+    def __init__(self, box: tuple, upsamples: tuple) -> None:
+        self.box = box
+        self.upsamples = upsamples
+        self.calls = []
+
+    def detect(self, img: np.array, upsample: int) -> tuple:
+        self.calls.append((img.shape[1], img.shape[0], upsample))
+        if upsample not in self.upsamples:
+            return [], []
+        return [Rectangle(*self.box)], [1.0]
+
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+@pytest.fixture
+def make_detector(monkeypatch):
+    """! Get face detectors with a backend and predictor without models
+    @return _ 'function' gets a FaceDetector with the backend given and
+        the FaceDetector arguments
+    """
+
+    def predictor(img: np.array, rect: Rectangle) -> Shape:
+        # a face whose jaw spans the rectangle
+        x0, y0, x1, y1 = rect.box
+        shape = np.full((68, 2), ((x0 + x1) // 2, (y0 + y1) // 2))
+        shape[Face.JAW.start] = (x0, y0)
+        shape[Face.JAW.stop - 1] = (x1, y1)
+        return Shape(shape)
+
+    monkeypatch.setattr(
+        face,
+        "dlib",
+        SimpleNamespace(shape_predictor=lambda path: predictor, rectangle=Rectangle),
+    )
+
+    def make_detector(backend: Backend, **kwargs) -> FaceDetector:
+        monkeypatch.setattr(face, "get_detector_backend", lambda **_: backend)
+        return FaceDetector(predictor_path="", **kwargs)
+
+    return make_detector
+
+
+# =============================================================================
+# TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS
+# =============================================================================
+def test_shape_to_numpy_array():
+    landmarks = np.stack([np.arange(68) * 3, np.arange(68) * 5 + 1], axis=1)
+    shape = FaceDetector.shape_to_numpy_array(None, shape=Shape(landmarks))
+
+    assert shape.dtype == np.int32 and shape.shape == (68, 2)
+    assert np.array_equal(shape, landmarks)
+
+    # Face keeps the array as it is
+    assert Face(shape=shape).shape is shape
+
+
+def test_upsample_ladder(make_detector):
+    backend = Backend(box=(100, 50, 200, 150), upsamples=(1,))
+    detector = make_detector(backend=backend, upsample_ladder=(0, 1))
+    img = np.zeros((300, 400, 3), np.uint8)
+
+    # the next upsample is only tried when no face is found
+    face_found = detector.predict(img=img)
+    assert [call[2] for call in backend.calls] == [0, 1]
+    assert detector.last_upsample == 1
+    assert face_found.jaw.min(axis=0).tolist() == [100, 50]
+
+    backend.upsamples = (0, 1)
+    backend.calls = []
+    detector.predict(img=img)
+    assert [call[2] for call in backend.calls] == [0]
+
+    backend.upsamples = ()
+    assert detector.predict(img=img) is None
+    assert list(detector.ladder_count.items()) == [(0, 1), (1, 1)]
+    assert detector.ladder_misses == 1
+
+
+def test_detection_scale(make_detector):
+    backend = Backend(box=(50, 25, 100, 75), upsamples=(1,))
+    detector = make_detector(backend=backend, detection_scale=0.5)
+
+    # faces are detected in the scaled image, and given in the original one
+    face_found = detector.predict(img=np.zeros((300, 400, 3), np.uint8))
+    assert backend.calls == [(200, 150, 1)]
+    assert face_found.jaw.min(axis=0).tolist() == [100, 50]
+    assert face_found.jaw.max(axis=0).tolist() == [200, 150]
+
+
+def test_tracking(make_detector):
+    backend = Backend(box=(100, 50, 200, 150), upsamples=(1,))
+    detector = make_detector(backend=backend, tracking=True, tracking_padding=0.5)
+    img = np.zeros((300, 400, 3), np.uint8)
+
+    # the first face is looked for in the whole image
+    detector.predict(img=img)
+    assert backend.calls == [(400, 300, 1)]
+
+    # then in the previous face window, and given in image coordinates
+    backend.calls = []
+    face_found = detector.predict(img=img)
+    assert backend.calls == [(200, 200, 1)]
+    assert face_found.jaw.min(axis=0).tolist() == [150, 50]
+    assert face_found.jaw.max(axis=0).tolist() == [250, 150]
+
+    # a face out of the window is looked for in the whole image
+    detect = backend.detect
+    backend.detect = lambda img, upsample: (
+        detect(img, upsample) if img.shape[1] == 400 else ([], [])
+    )
+    backend.calls = []
+    face_found = detector.predict(img=img)
+    assert backend.calls == [(400, 300, 1)]
+    assert face_found.jaw.min(axis=0).tolist() == [100, 50]
+    assert (detector.tracking_hits, detector.tracking_misses) == (1, 1)
+
+    # and a new exportation starts without window
+    detector.reset_tracking()
+    backend.calls = []
+    detector.predict(img=img)
+    assert backend.calls == [(400, 300, 1)]
+
+
+# =============================================================================
@@ -0,0 +1,156 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import os
+import struct
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from file_utils import FileColumns, Image, get_reduced_decode_flag, read_image_info
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def encode_image(extension: str, width: int = 64, height: int = 48) -> bytes:
+    """! Encodes a random image
+    @param extension 'string' image file extension, as .png
+    @param width 'int' image width
+    @param height 'int' image height
+    @return _ 'bytes' encoded image
+    """
+    img = np.random.default_rng(0).integers(0, 255, (height, width, 3), np.uint8)
+    return cv2.imencode(extension, img)[1].tobytes()
+
+
+def exif_segment(date: str) -> bytes:
+    """! Builds a JPEG APP1 segment with an EXIF DateTimeOriginal tag
+    @param date 'string' capture date, as 2021:03:04 05:06:07
+    @return _ 'bytes' APP1 segment, marker included
+    """
+    # little endian TIFF: IFD0 with the EXIF IFD pointer, then the EXIF IFD
+    # with the date, then the date itself
+    tiff = b"II*\x00" + struct.pack("<I", 8)
+    tiff += struct.pack("<HHHII", 1, 0x8769, 4, 1, 26) + struct.pack("<I", 0)
+    tiff += struct.pack("<HHHII", 1, 0x9003, 2, 20, 44) + struct.pack("<I", 0)
+    tiff += date.encode("ascii") + b"\x00"
+    data = b"Exif\x00\x00" + tiff
+    return b"\xff\xe1" + struct.pack(">H", len(data) + 2) + data
+
+
+# =============================================================================
+# TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS
+# =============================================================================
+def test_read_image_info_png(tmp_path):
+    path = tmp_path / "image.png"
+    path.write_bytes(encode_image(".png"))
+    assert read_image_info(str(path)) == (64, 48, 0.0)
+
+
+def test_read_image_info_jpeg(tmp_path):
+    path = tmp_path / "image.jpg"
+    path.write_bytes(encode_image(".jpg", width=80, height=30))
+    assert read_image_info(str(path)) == (80, 30, 0.0)
+
+
+def test_read_image_info_jpeg_capture_date(tmp_path):
+    data = encode_image(".jpg")
+    path = tmp_path / "image.jpg"
+    path.write_bytes(data[:2] + exif_segment("2021:03:04 05:06:07") + data[2:])
+    assert read_image_info(str(path)) == (
+        64,
+        48,
+        datetime(2021, 3, 4, 5, 6, 7).timestamp(),
+    )
+    assert Image(path=str(path)).captured_date == datetime(2021, 3, 4, 5, 6, 7)
+
+
+def test_read_image_info_not_an_image(tmp_path):
+    path = tmp_path / "image.jpg"
+    path.write_bytes(b"not an image")
+    assert read_image_info(str(path)) == (0, 0, 0.0)
+    assert read_image_info(str(tmp_path / "missing.jpg")) == (0, 0, 0.0)
+
+
+def test_get_reduced_decode_flag():
+    assert get_reduced_decode_flag((4000, 3000), (640, 360)) == (
+        cv2.IMREAD_REDUCED_COLOR_4
+    )
+    assert get_reduced_decode_flag((2560, 1440), (640, 360)) == (
+        cv2.IMREAD_REDUCED_COLOR_2
+    )
+    assert get_reduced_decode_flag((1920, 1080), (640, 360)) == cv2.IMREAD_COLOR
+    # the image could be rotated, both sides have to cover the biggest one
+    assert get_reduced_decode_flag((4000, 1000), (640, 360)) == cv2.IMREAD_COLOR
+
+
+def test_image_load_reduced(tmp_path):
+    path = tmp_path / "image.jpg"
+    path.write_bytes(encode_image(".jpg", width=1600, height=1200))
+
+    image = Image(path=str(path))
+    image.load(print_info=False, size=(320, 180))
+    assert image.image.shape == (600, 800, 3)
+    image.load(print_info=False)
+    assert image.image.shape == (1200, 1600, 3)
+
+    # the size in the header given by the dataset index is not read again
+    image = Image(path=str(path), header=(3200, 2400, 0.0))
+    image.load(print_info=False, size=(320, 180))
+    assert image.image.shape == (300, 400, 3)
+
+
+def test_image_load_reduced_png(tmp_path):
+    path = tmp_path / "image.png"
+    path.write_bytes(encode_image(".png", width=1600, height=1200))
+    image = Image(path=str(path))
+    image.load(print_info=False, size=(320, 180))
+    assert image.image.shape == (600, 800, 3)
+    image.load(print_info=False, size=(160, 90))
+    assert image.image.shape == (300, 400, 3)
+
+
+def test_file_columns():
+    files = FileColumns(
+        paths=["/ds/c.jpg", "/ds/a.jpg", "/ds/b.jpg"],
+        sizes=[3, 1, 2],
+        mtimes=[30.0, 10.0, 20.0],
+        ctimes=[3.0, 1.0, 2.0],
+        headers=[(300, 30, 0.0), (100, 10, 5.0), (200, 20, 0.0)],
+    ).sorted_by_mtime()
+
+    assert len(files) == 3
+    assert [image.path for image in files] == ["/ds/a.jpg", "/ds/b.jpg", "/ds/c.jpg"]
+    image = files[0]
+    assert (image.size, image.modified_date_stamp, image.created_date_stamp) == (
+        1,
+        10.0,
+        1.0,
+    )
+    assert image.header == (100, 10, 5.0) and image.image is None
+    assert files[-1].path == "/ds/c.jpg"
+
+
+def test_file_columns_from_folders(tmp_path):
+    for folder, name, mtime in (("2021", "b.jpg", 20), ("2020", "a.png", 10)):
+        (tmp_path / folder).mkdir()
+        (tmp_path / folder / name).write_bytes(encode_image(name[-4:]))
+        os.utime(tmp_path / folder / name, (mtime, mtime))
+    (tmp_path / "2020" / "notes.txt").write_text("not an image")
+
+    files = FileColumns.from_folders(
+        folders=[str(tmp_path / "2021"), str(tmp_path / "2020")],
+        extensions=(".jpg", ".png"),
+    ).sorted_by_mtime()
+    assert [os.path.basename(image.path) for image in files] == ["a.png", "b.jpg"]
+    assert files[0].header == (64, 48, 0.0)
+
+
+# =============================================================================
@@ -0,0 +1,124 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import cv2
+import numpy as np
+import pytest
+
+from capture import ThreadedVideoWriter
+from file_utils import Image
+from pipeline import ExportPipeline
+from utils import profiler
+
+# =============================================================================
+# CLASSES - CLASSES - CLASSES - CLASSES - CLASSES - CLASSES  - CLASSES - CLASSE
+# =============================================================================
+class VideoWriter:
+    """!
+    Video writer that keeps the images written to it, and fails with the
+    image of the value given
+    """
+
+    def __init__(self, fail_value: int = None) -> None:
+        self.imgs = []
+        self.fail_value = fail_value
+
+    def write(self, img: np.array) -> None:
+        if img[0, 0, 0] == self.fail_value:
+            raise RuntimeError("encoding failed")
+        self.imgs.append(img)
+
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def make_images(path, count: int) -> list:
+    """! Writes images filled with 10 times their index
+    @param path 'pathlib.Path' folder of the images
+    @param count 'int' number of images
+    @return _ 'list' Image objects of the images
+    """
+    images = []
+    for idx in range(count):
+        file = str(path / f"{idx}.png")
+        cv2.imwrite(file, np.full((60, 80, 3), idx * 10, np.uint8))
+        images.append(Image(path=file))
+    return images
+
+
+def process(image: Image, img: np.array) -> np.array:
+    """! Face alignment of the tests, image 2 has no face and image 3 fails
+    @param image 'Image' dataset image
+    @param img 'np.array' decoded image
+    @return _ 'np.array' the decoded image, None if it has no face
+    """
+    if image.name == "2":
+        return None
+    if image.name == "3":
+        raise ValueError("alignment failed")
+    return img
+
+
+# =============================================================================
+# TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS
+# =============================================================================
+def test_export_pipeline(tmp_path):
+    images = make_images(path=tmp_path, count=6)
+    (tmp_path / "1.png").unlink()
+    images[1] = Image(path=str(tmp_path / "1.png"))
+    profiler.reset()
+
+    # images are resized and kept in order, skipped ones are counted
+    frames = list(
+        ExportPipeline(images=images, size=(40, 30), process=process, queue_size=1)
+    )
+    assert [image.name for image, _ in frames] == ["0", "4", "5"]
+    for image, frame in frames:
+        assert frame.shape == (30, 40, 3)
+        assert (frame == int(image.name) * 10).all()
+    assert profiler.pop_samples()["skips"] == {
+        "missing file": 1,
+        "no face": 1,
+        "exception": 1,
+    }
+
+
+def test_export_pipeline_stop(tmp_path):
+    images = make_images(path=tmp_path, count=20)
+    pipeline = ExportPipeline(
+        images=images, size=(40, 30), process=lambda image, img: img, queue_size=1
+    )
+
+    # stopping the consumer stops the stages waiting on the full queues
+    frames = iter(pipeline)
+    next(frames)
+    frames.close()
+    assert not any(thread.is_alive() for thread in pipeline._threads)
+
+
+def test_threaded_video_writer():
+    video_writer = VideoWriter()
+    threaded_writer = ThreadedVideoWriter(video_writer=video_writer, queue_size=2)
+    for value in range(10):
+        threaded_writer.write(img=np.full((2, 2, 3), value, np.uint8))
+    threaded_writer.join()
+    assert [img[0, 0, 0] for img in video_writer.imgs] == list(range(10))
+
+
+def test_threaded_video_writer_error():
+    video_writer = VideoWriter(fail_value=3)
+    threaded_writer = ThreadedVideoWriter(video_writer=video_writer, queue_size=2)
+
+    # the encoding error is raised by the next write, or when the video is
+    # finished, and the next images are not encoded
+    with pytest.raises(RuntimeError, match="encoding failed"):
+        for value in range(6):
+            threaded_writer.write(img=np.full((2, 2, 3), value, np.uint8))
+        threaded_writer.join()
+    assert len(video_writer.imgs) == 3
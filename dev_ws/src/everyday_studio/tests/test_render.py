@@ -0,0 +1,103 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+import numpy as np
+from face import Face
+from render import get_face_transforms
+
+SIZE = (640, 360)
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def make_shape(nose: tuple, right_eye: tuple, left_eye: tuple) -> np.array:
+    """! Get face landmarks with the points the faces are aligned with
+    @param nose 'tuple' (x, y) of the nose point
+    @param right_eye 'tuple' (x, y) of the right eye outer corner
+    @param left_eye 'tuple' (x, y) of the left eye outer corner
+    @return _ '(68, 2) np.array' landmarks in pixels
+    """
+    shape = np.full((68, 2), 100.0)
+    shape[Face.NOSE.start + 2] = nose
+    shape[Face.RIGHT_EYE.start] = right_eye
+    shape[Face.LEFT_EYE.start + 3] = left_eye
+    return shape
+
+
+def transform(M: np.array, point: np.array) -> np.array:
+    """! Applies a homogeneous transformation to a point
+    @param M '(3, 3) np.array' transformation
+    @param point 'np.array' (x, y) point
+    @return _ 'np.array' (x, y) transformed point
+    """
+    return M[:2, :2] @ point + M[:2, 2]
+
+
+# =============================================================================
+# TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS
+# =============================================================================
+def test_get_face_transforms():
+    shapes = np.array(
+        [
+            make_shape(nose=(300, 200), right_eye=(260, 150), left_eye=(340, 170)),
+            make_shape(nose=(100, 80), right_eye=(80, 60), left_eye=(120, 60)),
+        ]
+    )
+    M, eyes_distance = get_face_transforms(shapes, SIZE, eyes_distance=50.0)
+
+    assert M.shape == (2, 3, 3) and eyes_distance == 50.0
+    for M_face, shape in zip(M, shapes):
+        nose = transform(M_face, shape[Face.NOSE.start + 2])
+        eyes = transform(M_face, shape[Face.LEFT_EYE.start + 3]) - transform(
+            M_face, shape[Face.RIGHT_EYE.start]
+        )
+        assert np.allclose(nose, (SIZE[0] // 2, SIZE[1] // 2))
+        assert np.allclose(eyes, (50.0, 0.0))
+
+
+def test_get_face_transforms_median_distance():
+    shapes = np.array(
+        [
+            make_shape(nose=(300, 200), right_eye=(260, 150), left_eye=(300, 150)),
+            make_shape(nose=(300, 200), right_eye=(260, 150), left_eye=(320, 150)),
+            make_shape(nose=(300, 200), right_eye=(260, 150), left_eye=(340, 150)),
+        ]
+    )
+    M, eyes_distance = get_face_transforms(shapes, SIZE)
+    assert eyes_distance == 60.0
+    assert np.allclose(M[1, :2, :2], np.eye(2))
+
+
+def test_get_face_transforms_without_face():
+    shapes = np.array(
+        [
+            make_shape(nose=(300, 200), right_eye=(260, 150), left_eye=(340, 170)),
+            np.full((68, 2), np.nan),
+        ]
+    )
+    M, _ = get_face_transforms(shapes, SIZE)
+    assert np.isfinite(M[0]).all()
+    assert np.isnan(M[1, :2]).all()
+
+
+def test_get_face_transforms_normalized():
+    shapes = np.array(
+        [make_shape(nose=(300, 200), right_eye=(260, 150), left_eye=(340, 170))]
+    )
+    M, eyes_distance = get_face_transforms(shapes, SIZE, eyes_distance=50.0)
+    M_normalized, _ = get_face_transforms(
+        (shapes / np.float32(SIZE)).astype(np.float32),
+        SIZE,
+        eyes_distance=50.0,
+        normalized=True,
+    )
+    assert np.allclose(M, M_normalized, atol=1e-3)
+
+
+# =============================================================================
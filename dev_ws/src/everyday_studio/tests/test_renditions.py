@@ -0,0 +1,123 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from every_day_maker import Studio
+from file_utils import Image
+from render import get_rendition_img
+from renditions import Rendition, get_aligned_size, parse_renditions
+
+DEFAULTS = {"codec": "h264", "crf": 23, "gray": 0, "visuals": 1, "date": 0}
+
+# =============================================================================
+# CLASSES - CLASSES - CLASSES - CLASSES - CLASSES - CLASSES  - CLASSES - CLASSE
+# =============================================================================
+class VideoWriter:
+    """!
+    Video writer that keeps the images written to it
+    """
+
+    def __init__(self) -> None:
+        self.imgs = []
+
+    def write(self, img: np.array) -> None:
+        self.imgs.append(img)
+
+
+# =============================================================================
+# TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS
+# =============================================================================
+def test_parse_renditions():
+    renditions = parse_renditions(
+        "720p:1280x720 preview:320X180:gray=1:visuals=0:codec=h265", DEFAULTS
+    )
+
+    assert [rendition.name for rendition in renditions] == ["720p", "preview"]
+    assert renditions[0].size == (1280, 720)
+    assert (renditions[0].codec, renditions[0].crf) == ("h264", 23)
+    assert (renditions[0].gray, renditions[0].visuals) == (0, 1)
+    assert renditions[1].size == (320, 180)
+    assert (renditions[1].codec, renditions[1].crf) == ("h265", 23)
+    assert (renditions[1].gray, renditions[1].visuals) == (1, 0)
+
+
+def test_parse_renditions_empty():
+    assert parse_renditions("", DEFAULTS) == []
+    assert parse_renditions("   ", DEFAULTS) == []
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "720p",  # no size
+        "720p:1280x720:fps=30",  # unknown option
+        "720p:1280x720:crf=",  # option without value
+        "720p:1280x720 720p:640x360",  # repeated names
+    ],
+)
+def test_parse_renditions_invalid(value):
+    with pytest.raises(ValueError):
+        parse_renditions(value, DEFAULTS)
+
+
+def test_get_aligned_size():
+    renditions = parse_renditions("720p:1280x720 preview:320x180", DEFAULTS)
+    assert get_aligned_size(renditions) == (1280, 720)
+
+    # every rendition is cropped from the whole width
+    renditions = parse_renditions("wide:1280x720 square:640x640", DEFAULTS)
+    assert get_aligned_size(renditions) == (1280, 1280)
+    renditions = parse_renditions("wide:640x360 portrait:360x640", DEFAULTS)
+    assert get_aligned_size(renditions) == (640, 1138)
+
+
+def test_get_rendition_img():
+    img = np.zeros((1280, 1280, 3), np.uint8)
+    img[:, :, 2] = np.arange(1280)[:, None] // 5
+    face = SimpleNamespace(shape=np.zeros((68, 2), np.int32))
+
+    # the crop takes the whole width, centered
+    rendition = get_rendition_img(img, face, None, size=(640, 360))
+    assert rendition.shape == (360, 640, 3)
+    assert abs(int(rendition[180, 320, 2]) - 128) <= 1
+    assert abs(int(rendition[0, 0, 2]) - 56) <= 1
+
+    # the rendition is a new image even if it has the aligned image size
+    rendition = get_rendition_img(img, face, None, size=(1280, 1280))
+    assert np.array_equal(rendition, img) and rendition is not img
+
+
+def test_write_frame_date_of_one_rendition():
+    frame = (np.zeros((360, 640, 3), np.uint8), np.zeros((68, 2), np.int32))
+    renditions = [
+        Rendition(name="dated", size=(640, 360), date=True),
+        Rendition(name="preview", size=(320, 180), date=False),
+    ]
+    writers = [VideoWriter() for _ in renditions]
+    studio = SimpleNamespace(_face_detector=None, _VIDEO_EXPORT_PREVISUALIZATION=0)
+
+    canceled = Studio._write_frame(
+        studio,
+        image=Image(path="/ds/2021/a.jpg", isfile=True, stat=(1, 1.0, 1.0)),
+        frame=frame,
+        video_writers=writers,
+        renditions=renditions,
+    )
+
+    assert not canceled
+    assert writers[0].imgs[0].any()
+    assert not writers[1].imgs[0].any()
+    assert not frame[0].any()
+
+
+# =============================================================================
@@ -0,0 +1,70 @@
+# =============================================================================
+"""
+Author: John Betacourt Gonzalez
+Aka: @JohnBetaCode
+"""
+
+# =============================================================================
+# LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPENDENCIES - LIBRARIES AND DEPEN
+# =============================================================================
+from file_utils import Image
+from segments import get_segment_key, split_chunks, split_segments
+
+# =============================================================================
+# FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS - FUNCTIONS  - FUNCTIONS - FUNC
+# =============================================================================
+def make_image(path: str, size: int = 100, mtime: float = 1.0) -> Image:
+    """! Get an image view of a dataset file, without the file
+    @param path 'string' absolute path to the file
+    @param size 'int' file size in bytes
+    @param mtime 'float' file modification date stamp
+    @return _ 'Image' image view
+    """
+    return Image(path=path, isfile=True, stat=(size, mtime, mtime))
+
+
+# =============================================================================
+# TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS - TESTS
+# =============================================================================
+def test_split_segments():
+    images = [
+        make_image("/ds/2020/a.jpg"),
+        make_image("/ds/2020/b.jpg"),
+        make_image("/ds/2021/a.jpg"),
+        make_image("/ds/2020/c.jpg"),
+    ]
+    segments = split_segments(images)
+    assert [[image.path for image in segment] for segment in segments] == [
+        ["/ds/2020/a.jpg", "/ds/2020/b.jpg"],
+        ["/ds/2021/a.jpg"],
+        ["/ds/2020/c.jpg"],
+    ]
+    assert split_segments([]) == []
+
+
+def test_get_segment_key():
+    images = [make_image("/ds/2020/a.jpg"), make_image("/ds/2020/b.jpg")]
+    settings = {"size": [640, 360], "gray": 0}
+    key = get_segment_key(images, settings)
+
+    assert key == get_segment_key(list(images), {"gray": 0, "size": [640, 360]})
+    assert key != get_segment_key(images, {"size": [640, 360], "gray": 1})
+    assert key != get_segment_key(images[:1], settings)
+    assert key != get_segment_key(
+        [images[0], make_image("/ds/2020/b.jpg", mtime=2.0)], settings
+    )
+    assert key != get_segment_key(
+        [images[0], make_image("/ds/2020/b.jpg", size=101)], settings
+    )
+
+
+def test_split_chunks():
+    images = list(range(10))
+    assert split_chunks(images, 3) == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    assert split_chunks(images, 1) == [images]
+    assert split_chunks(images[:2], 4) == [[0], [1]]
+    assert split_chunks(images, 0) == [images]
+    assert split_chunks([], 4) == []
+
+
+# =============================================================================
@@ -1,3 +1,4 @@
 from .errors import try_catch_log
 from .utils import printlog
 from .utils import print_text_list
+from .profiler import profiler
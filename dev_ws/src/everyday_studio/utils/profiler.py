@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# =============================================================================
+"""
+Code Information:
+    Programmer: Eng. John Alberto Betancourt G
+"""
+
+# =============================================================================
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# =============================================================================
+# PROFILING - PROFILING - PROFILING - PROFILING - PROFILING - PROFILING - PROFI
+
+
+class Profiler:
+    """!
+    Class for timing the processing stages and counting the skipped images
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """!
+        Drops every measurement and starts counting the elapsed time again
+        """
+        with self._lock:
+            self._samples = {}
+            self._skips = {}
+            self._start = time.perf_counter()
+
+    @contextmanager
+    def measure(self, stage: str):
+        """!
+        Context manager timing the code inside it as a stage sample
+        @param stage 'string' name of the stage
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage=stage, seconds=time.perf_counter() - start)
+
+    def record(self, stage: str, seconds: float) -> None:
+        """!
+        Adds a sample to a stage
+        @param stage 'string' name of the stage
+        @param seconds 'float' time the stage took
+        """
+        with self._lock:
+            self._samples.setdefault(stage, []).append(seconds)
+
+    def skip(self, reason: str) -> None:
+        """!
+        Counts an image skipped
+        @param reason 'string' why the image was skipped (no face,
+            missing file, exception ...)
+        """
+        with self._lock:
+            self._skips[reason] = self._skips.get(reason, 0) + 1
+
+    def pop_samples(self) -> dict:
+        """!
+        Get and drop the samples and skips measured, used to send the
+        measurements of a worker process to the main one
+        @return _ 'dict' with samples (stage to list of seconds) and skips
+        """
+        with self._lock:
+            samples = {"samples": self._samples, "skips": self._skips}
+            self._samples = {}
+            self._skips = {}
+        return samples
+
+    def merge(self, samples: dict) -> None:
+        """!
+        Adds measurements taken in other profiler
+        @param samples 'dict' measurements from pop_samples
+        """
+        with self._lock:
+            for stage, seconds in samples["samples"].items():
+                self._samples.setdefault(stage, []).extend(seconds)
+            for reason, count in samples["skips"].items():
+                self._skips[reason] = self._skips.get(reason, 0) + count
+
+    @property
+    def report(self) -> dict:
+        """!
+        @return _ 'dict' elapsed time, stages stats (count, total, p50, p95,
+            max in seconds, and fps as count by total) and skips by reason
+        """
+        with self._lock:
+            samples = {stage: list(seconds) for stage, seconds in self._samples.items()}
+            skips = dict(self._skips)
+            elapsed = time.perf_counter() - self._start
+
+        stages = {}
+        for stage, seconds in samples.items():
+            seconds = np.array(seconds)
+            total = float(seconds.sum())
+            stages[stage] = {
+                "count": len(seconds),
+                "total": total,
+                "p50": float(np.percentile(seconds, 50)),
+                "p95": float(np.percentile(seconds, 95)),
+                "max": float(seconds.max()),
+                "fps": len(seconds) / total if total > 0 else 0.0,
+            }
+
+        return {"elapsed": elapsed, "stages": stages, "skips": skips}
+
+    def dump(self, path: str, extra: dict = None) -> None:
+        """!
+        Writes the report in a JSON file
+        @param path 'string' absolute path to the JSON file
+        @param extra 'dict' other data to add to the report
+        """
+        report = self.report
+        if extra is not None:
+            report.update(extra)
+        with open(path, "w") as file:
+            json.dump(report, file, indent=4)
+
+    def __str__(self):
+        """!
+        Get object instace string for printings
+        @return str_ 'string' string with object instance info
+        """
+        report = self.report
+        str_ = f"elapsed: {report['elapsed']:.2f}s\n"
+        for stage, stats in report["stages"].items():
+            str_ += (
+                f"\t{stage}: {stats['count']} in {stats['total']:.2f}s, "
+                + f"p50: {stats['p50'] * 1000:.1f}ms, "
+                + f"p95: {stats['p95'] * 1000:.1f}ms, "
+                + f"max: {stats['max'] * 1000:.1f}ms, "
+                + f"{stats['fps']:.1f} fps\n"
+            )
+        for reason, count in report["skips"].items():
+            str_ += f"\tskipped, {reason}: {count}\n"
+        return str_
+
+
+# Process wide profiler shared by all the processing stages
+profiler = Profiler()
+
+
+# =============================================================================
@@ -6,9 +6,12 @@ Code Information:
 """
 
 # =============================================================================
-import inspect
+import atexit
 import math
 import os
+import queue
+import sys
+import threading
 
 import cv2
 
@@ -31,6 +34,15 @@ class bcolors:
         "DEBUG": ["\033[35m", "INFO"],
         "INFO": ["\033[0m", "INFO"],  # ['\033[94m', "INFO"],
     }
+    # Minimum DEBUG_LEVEL that hides every message type, OKGREEN always prints
+    LEVEL = {
+        "DEBUG": 1,
+        "INFO": 2,
+        "WARN": 3,
+        "ERROR": 4,
+        "FATAL": 5,
+        "OKGREEN": math.inf,
+    }
     BOLD = "\033[1m"
     ENDC = "\033[0m"
     HEADER = "\033[95m"
@@ -39,6 +51,52 @@ class bcolors:
     UNDERLINE = "\033[4m"
 
     DEBUG_LEVEL = int(os.getenv("DEBUG_LEVEL", default=4))
+    LOG_THREAD = int(os.getenv("LOG_THREAD", default=0))
+
+
+class LogWriter:
+    """!
+    Background thread writing the printlog records, so the threads
+    logging never wait for the standard output
+    """
+
+    def __init__(self) -> None:
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, record: str) -> None:
+        """!
+        Queues a record to be written
+        @param record 'string' line to write
+        """
+        self._queue.put(record)
+
+    def close(self) -> None:
+        """!
+        Writes the queued records and stops the writer thread
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _write_loop(self) -> None:
+        """!
+        Writes the queued records, flushing when there are no more waiting
+        """
+        while True:
+            record = self._queue.get()
+            if record is None:
+                break
+            sys.stdout.write(record + "\n")
+            if self._queue.empty():
+                sys.stdout.flush()
+        sys.stdout.flush()
+
+
+_log_writer = LogWriter() if bcolors.LOG_THREAD else None
+_file_names = {}
 
 
 def printlog(
@@ -47,50 +105,51 @@ def printlog(
     flush: bool = True,
     file: str = None,
     caller: str = None,
+    args: tuple = (),
 ):
-    """! General print functionality that traces back the caller.
-    @param msg (str) message to print
+    """! General print functionality that traces back the caller. The
+    level is checked first, so messages that are not printed cost almost
+    nothing.
+    @param msg (str) message to print, or callable returning it, called
+        only if the message is printed
     @param msg_type (str, optional) message type. Defaults to "INFO".
     @param flush (bool, optional) sure that any output is buffered and go
         to the destination. Defaults to True.
     @param file (str, optional) file where the function is. Defaults to None.
-        If none it inspects the stack trace to get the name.
+        If none it inspects the caller frame to get the name.
     @param caller (str, optional) Caller of the function. Defaults to None.
-        If none it inspects the stack trace to get the name.
+        If none it inspects the caller frame to get the name.
+    @param args (tuple, optional) arguments to format msg with, formatted
+        only if the message is printed. Defaults to ().
     """
-    if not flush:
+    if not flush or bcolors.DEBUG_LEVEL >= bcolors.LEVEL.get(msg_type, math.inf):
         return
 
-    file = (
-        os.path.splitext(os.path.basename(inspect.stack()[1][1]))[0].upper()
-        if file is None
-        else file
-    )
-    caller = inspect.stack()[1][3].upper() if caller is None else caller
-    _str = "[{}][{}][{}]: {}".format(bcolors.LOG[msg_type][1], file, caller, msg)
+    if file is None or caller is None:
+        code = sys._getframe(1).f_code
+        if file is None:
+            file = _file_names.get(code.co_filename)
+            if file is None:
+                file = os.path.splitext(os.path.basename(code.co_filename))[0].upper()
+                _file_names[code.co_filename] = file
+        if caller is None:
+            caller = code.co_name.upper()
+
+    if callable(msg):
+        msg = msg()
+    if args:
+        msg = msg.format(*args)
+
+    if msg_type in bcolors.LOG:
+        color, label = bcolors.LOG[msg_type]
+        _str = f"{color}[{label}][{file}][{caller}]: {msg}{bcolors.ENDC}"
+    else:
+        _str = f"[{msg_type}][{file}][{caller}]: {msg}"
 
-    if not msg_type in bcolors.LOG.keys():
-        print(_str, flush=True)
-    elif msg_type == "OKGREEN":
-        print(bcolors.LOG[msg_type][0] + _str + bcolors.ENDC, flush=True)
+    if _log_writer is not None:
+        _log_writer.write(_str)
     else:
-        if bcolors.DEBUG_LEVEL >= 4 and msg_type != "FATAL":
-            return
-        elif bcolors.DEBUG_LEVEL >= 3 and (msg_type != "FATAL" or msg_type != "ERROR"):
-            return
-        elif bcolors.DEBUG_LEVEL >= 2 and (
-            msg_type != "FATAL" or msg_type != "ERROR" or msg_type != "WARN"
-        ):
-            return
-        elif bcolors.DEBUG_LEVEL >= 1 and (
-            msg_type != "FATAL"
-            or msg_type != "ERROR"
-            or msg_type != "WARN"
-            or msg_type != "INFO"
-        ):
-            return
-        else:
-            print(bcolors.LOG[msg_type][0] + _str + bcolors.ENDC, flush=True)
+        print(_str, flush=True)
 
 
 def print_text_list(